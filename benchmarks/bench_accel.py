@@ -0,0 +1,86 @@
+"""
+Microbenchmark: C batch decoder (charger_gui.accel) vs numpy vs scalar CANDecoder.
+
+Build the library first (python -m charger_gui.accel --build) or pass --build.
+Usage (from the repository root):
+    python -m benchmarks.bench_accel [--frames N] [--scalar-frames M] [--repeat R] [--build]
+"""
+
+import argparse
+import sys
+import timeit
+
+import numpy as np
+
+from charger_gui import accel
+from charger_gui.batch import decode_batch
+from charger_gui.can_decoder import CANDecoder
+
+
+MESSAGES = {
+    'ACT1': CANDecoder.CAN_ID_ACT1,
+    'TEMP': CANDecoder.CAN_ID_TEMP,
+    'TST1': CANDecoder.CAN_ID_TST1,
+    'FLTA': CANDecoder.CAN_ID_FLTA,
+    'TST2': CANDecoder.CAN_ID_TST2,
+}
+
+
+def run(frames: int, scalar_frames: int, repeat: int) -> dict:
+    rng = np.random.default_rng(1)
+    payloads = rng.integers(0, 256, (frames, 8), dtype=np.uint8)
+    rows = [payloads[i].tobytes() for i in range(min(scalar_frames, frames))]
+
+    result = {'frames': frames}
+    for name, can_id in MESSAGES.items():
+        t_c = min(timeit.repeat(lambda: accel.decode_batch(can_id, payloads), number=1, repeat=repeat))
+        t_struct = min(timeit.repeat(lambda: accel.decode_packets(can_id, payloads), number=1, repeat=repeat))
+        t_numpy = min(timeit.repeat(lambda: decode_batch(can_id, payloads), number=1, repeat=repeat))
+        decoder = CANDecoder.decode_message
+
+        def scalar():
+            for row in rows:
+                try:
+                    decoder(can_id, row)
+                except ValueError:
+                    pass    # enum non valido
+        t_scalar = min(timeit.repeat(scalar, number=1, repeat=repeat))
+        result[name] = {
+            'c_ms': t_c * 1e3,
+            'c_structs_ms': t_struct * 1e3,
+            'numpy_ms': t_numpy * 1e3,
+            'scalar_ms_estimated': t_scalar / len(rows) * frames * 1e3,
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--frames', type=int, default=1000000)
+    parser.add_argument('--scalar-frames', type=int, default=100000, help="scalar time is extrapolated")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--build', action='store_true', help="compile the C library first")
+    args = parser.parse_args()
+
+    if args.build:
+        accel.build()
+    if not accel.available():
+        print(f"Libreria C non disponibile ({accel.load_error()}): python -m charger_gui.accel --build")
+        sys.exit(1)
+    failed = [name for name, columns in accel.verify(20000).items()
+              if any(r['mismatches'] for r in columns.values())]
+    if failed:
+        print(f"C e Python non coincidono: {failed} (python -m charger_gui.accel --verify)")
+        sys.exit(1)
+
+    result = run(args.frames, args.scalar_frames, args.repeat)
+    print(f"frames: {result['frames']}")
+    for name in MESSAGES:
+        r = result[name]
+        print(f"{name:<5} C {r['c_ms']:7.1f} ms (struct {r['c_structs_ms']:6.1f})   "
+              f"numpy {r['numpy_ms']:7.1f} ms   scalar {r['scalar_ms_estimated']:7.0f} ms   "
+              f"x{r['numpy_ms'] / r['c_ms']:.1f} vs numpy, x{r['scalar_ms_estimated'] / r['c_ms']:.0f} vs scalar")
+
+
+if __name__ == '__main__':
+    main()
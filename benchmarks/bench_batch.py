@@ -0,0 +1,66 @@
+"""
+Microbenchmark: numpy batch decoding vs. scalar CANDecoder per frame.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_batch [--frames N] [--scalar-frames M] [--repeat R]
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+
+from charger_gui.batch import decode_batch
+from charger_gui.can_decoder import CANDecoder
+
+
+MESSAGES = {
+    'ACT1': CANDecoder.CAN_ID_ACT1,
+    'TEMP': CANDecoder.CAN_ID_TEMP,
+    'TST1': CANDecoder.CAN_ID_TST1,
+}
+
+
+def check_equivalence(payloads: np.ndarray):
+    """Batch columns equal the scalar decoder fields (ACT1)"""
+    columns = decode_batch(CANDecoder.CAN_ID_ACT1, payloads)
+    for i in range(len(payloads)):
+        packet = CANDecoder.decode_act1(payloads[i].tobytes())
+        assert packet.vout_V == columns['vout_V'][i] and packet.temp_C == columns['temp_C'][i], i
+
+
+def run(frames: int, scalar_frames: int, repeat: int) -> dict:
+    rng = np.random.default_rng(1)
+    payloads = rng.integers(0, 256, (frames, 8), dtype=np.uint8)
+    rows = [payloads[i].tobytes() for i in range(min(scalar_frames, frames))]
+    check_equivalence(payloads[:1000])
+
+    result = {'frames': frames}
+    for name, can_id in MESSAGES.items():
+        t_batch = min(timeit.repeat(lambda: decode_batch(can_id, payloads), number=1, repeat=repeat))
+        decoder = CANDecoder.decode_message
+        t_scalar = min(timeit.repeat(lambda: [decoder(can_id, row) for row in rows], number=1, repeat=repeat))
+        result[name] = {
+            'batch_ms': t_batch * 1e3,
+            'scalar_ms_estimated': t_scalar / len(rows) * frames * 1e3,
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--frames', type=int, default=1000000)
+    parser.add_argument('--scalar-frames', type=int, default=100000, help="scalar time is extrapolated")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    result = run(args.frames, args.scalar_frames, args.repeat)
+    print(f"frames: {result['frames']}")
+    for name in MESSAGES:
+        batch = result[name]['batch_ms']
+        scalar = result[name]['scalar_ms_estimated']
+        print(f"{name:<5} batch {batch:8.1f} ms   scalar {scalar:9.0f} ms   x{scalar / batch:.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Microbenchmark: fast bytes parser vs. original regex parser.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_parser [--lines N] [--repeat R]
+"""
+
+import argparse
+import timeit
+
+from charger_gui.parser import parse_can_line, parse_can_line_regex
+
+
+# Realistic gateway traffic mix (ACT1/TST1 at 100 ms dominate)
+SAMPLE_LINES = [
+    b"CanBus Rx 0x611 00 A0 30 F7 0E 10 00 AA",
+    b"CanBus Rx 0x615 E0 00 18 20 A8 00 01 2C",
+    b"CanBus Rx 0x611 00 A1 30 F8 0E 10 00 AB",
+    b"CanBus Rx 0x615 E0 00 18 20 A8 00 01 2C",
+    b"CanBus Rx 0x712 00 78 00 64 00 64 00 64",
+    b"CanBus Rx 0x713 30 F7 31 02 30 FA 30 F0",
+    b"CanBus Rx 0x715 04 00 00 00",
+    b"CanBus Rx 0x610 80",
+    b"CanBus Rx 0x614 30 F7 01 90 00 A0 00 A0",
+    b"CanBus Tx 0x618 80 00 A0 0E 10 00 AA 00",
+    b"canbus rx 61d 41 01 A8 17 00 1E 00 78",
+]
+
+# Lines both parsers must reject
+MALFORMED_LINES = [
+    b"CanBus Rx 0x611",
+    b"CanBus Rxx 611 12",
+    b"CanBusRx 611 12",
+    b"CanBus Rx 0x 12",
+    b"CanBus Rx 611 g1",
+    b"Boot OK",
+    b"",
+]
+
+
+def check_equivalence():
+    """Both parsers agree on the sample and malformed lines"""
+    for line in SAMPLE_LINES:
+        fast = parse_can_line(line)
+        ref = parse_can_line_regex(line)
+        assert fast is not None and ref is not None, line
+        assert (fast[0], fast[1], list(fast[2])) == ref, line
+    for line in MALFORMED_LINES:
+        assert parse_can_line(line) is None, line
+        assert parse_can_line_regex(line) is None, line
+
+
+def run(lines: int, repeat: int) -> dict:
+    data = (SAMPLE_LINES * (lines // len(SAMPLE_LINES) + 1))[:lines]
+
+    def fast():
+        for line in data:
+            parse_can_line(line)
+
+    def regex():
+        for line in data:
+            parse_can_line_regex(line)
+
+    t_fast = min(timeit.repeat(fast, number=1, repeat=repeat))
+    t_regex = min(timeit.repeat(regex, number=1, repeat=repeat))
+    return {
+        'lines': lines,
+        'fast_ns_per_line': t_fast / lines * 1e9,
+        'regex_ns_per_line': t_regex / lines * 1e9,
+        'speedup': t_regex / t_fast,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    check_equivalence()
+    result = run(args.lines, args.repeat)
+    print(f"lines:  {result['lines']}")
+    print(f"regex:  {result['regex_ns_per_line']:8.0f} ns/line")
+    print(f"fast:   {result['fast_ns_per_line']:8.0f} ns/line")
+    print(f"speedup: x{result['speedup']:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+"""
+End-to-end pipeline benchmark: frames/s and ns/frame for every ingest stage.
+
+Stages: framing (ASCII/binary), parse_message, CANDecoder.decode_message,
+IngestEngine.feed, MainWindow dispatch per tab (offscreen Qt), full path
+engine -> MainWindow with repaint, and optionally real serial I/O through the
+pty simulator. Traffic is the simulator mix (manual periods, fault requests).
+
+Usage (from the repository root):
+    python -m benchmarks.bench_pipeline [--seconds 60] [--repeat 5] [--json out.json]
+    python -m benchmarks.bench_pipeline --baseline benchmarks/baseline.json [--tolerance 0.5]
+    python -m benchmarks.bench_pipeline --save-baseline benchmarks/baseline.json
+
+Exit status 1 when a stage is slower than the baseline by more than the tolerance.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from charger_gui.can_decoder import CANDecoder
+from charger_gui.framing import StreamFramer
+from charger_gui.ingest import IngestEngine, SerialMessage
+from charger_gui.simulator import GatewaySimulator
+
+
+READ_CHUNK = 256    # bytes per serial read (typical in_waiting at 115200 baud)
+BATCH_SIZE = 8      # frames per GUI batch
+
+# Tab that renders each ID (MainWindow.render_message routing)
+TAB_OF_ID = {
+    CANDecoder.CAN_ID_CTL: 'level1', CANDecoder.CAN_ID_ACT1: 'level1',
+    CANDecoder.CAN_ID_STAT: 'level1', CANDecoder.CAN_ID_ACT2: 'level1',
+    CANDecoder.CAN_ID_TST1: 'level1',
+    CANDecoder.CAN_ID_FLTA: 'level2', CANDecoder.CAN_ID_FLTP: 'level2',
+    CANDecoder.CAN_ID_SW: 'level2', CANDecoder.CAN_ID_SN: 'level2',
+    CANDecoder.CAN_ID_ACT3: 'level3', CANDecoder.CAN_ID_TEMP: 'level3',
+    CANDecoder.CAN_ID_STST1: 'level3', CANDecoder.CAN_ID_ACT4: 'level3',
+    CANDecoder.CAN_ID_TST2: 'level4',
+}
+
+
+def make_traffic(seconds: float, seed: int = 1) -> List[tuple]:
+    """Simulator traffic: periodic frames, CTL echo, SW/SN and multi-frame fault replies"""
+    commands = []
+    t = 0.5
+    while t < seconds:
+        commands.append((t, b"CanBus Tx 0x61B 80 00 06 1D"))
+        commands.append((t + 0.01, b"CanBus Tx 0x61B 80 00 06 1E"))
+        commands.append((t + 0.02, b"CanBus Tx 0x618 80 00 A0 0E 10 00 AA 00"))
+        t += 5.0
+    return GatewaySimulator(seed=seed).generate(seconds, commands=commands)
+
+
+def chunks(data: bytes, size: int = READ_CHUNK) -> List[bytes]:
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def measure(func: Callable[[], object], frames: int, repeat: int,
+            setup: Optional[Callable[[], object]] = None) -> dict:
+    """Best of `repeat` runs -> ns/frame and frames/s"""
+    best = float('inf')
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter_ns()
+        func()
+        best = min(best, time.perf_counter_ns() - start)
+    ns = best / max(frames, 1)
+    return {'frames': frames, 'ns_per_frame': round(ns, 1),
+            'frames_per_s': round(1e9 / ns) if ns else 0}
+
+
+# ============================================================================
+# Stages without Qt
+# ============================================================================
+
+def bench_core(traffic: List[tuple], repeat: int) -> Dict[str, dict]:
+    results = {}
+    frames = len(traffic)
+    ascii_stream = GatewaySimulator().encode_stream(traffic)
+    binary_stream = GatewaySimulator(binary=True).encode_stream(traffic)
+    ascii_chunks = chunks(ascii_stream)
+    binary_chunks = chunks(binary_stream)
+
+    for name, stream_chunks in (('framing_ascii', ascii_chunks), ('framing_binary', binary_chunks)):
+        def framing():
+            framer = StreamFramer()
+            for chunk in stream_chunks:
+                framer.feed(chunk)
+        results[name] = measure(framing, frames, repeat)
+
+    lines = ascii_stream.splitlines()
+    parse = IngestEngine.parse_message
+
+    def parsing():
+        for line in lines:
+            parse(line)
+    results['parse_message'] = measure(parsing, frames, repeat)
+
+    payloads = [(can_id, payload) for _, can_id, payload, _ in traffic]
+    decode = CANDecoder.decode_message
+
+    def decoding():
+        for can_id, payload in payloads:
+            decode(can_id, payload)
+    results['decode_message'] = measure(decoding, frames, repeat)
+
+    for name, stream_chunks in (('ingest_ascii', ascii_chunks), ('ingest_binary', binary_chunks)):
+        def ingest():
+            engine = IngestEngine()
+            for chunk in stream_chunks:
+                engine.feed(chunk)
+        results[name] = measure(ingest, frames, repeat)
+
+    return results
+
+
+# ============================================================================
+# Stages with Qt (offscreen)
+# ============================================================================
+
+def bench_gui(traffic: List[tuple], repeat: int) -> Dict[str, dict]:
+    from PyQt6.QtWidgets import QApplication
+    from charger_gui.main import MainWindow
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = MainWindow()
+    window.show()
+    app.processEvents()
+    results = {}
+
+    messages = [SerialMessage(can_id, payload, direction) for _, can_id, payload, direction in traffic]
+    for msg in messages:
+        msg.decode()    # dispatch stages measure routing + widget updates only
+
+    by_tab: Dict[str, List[SerialMessage]] = {}
+    for msg in messages:
+        by_tab.setdefault(TAB_OF_ID.get(msg.can_id, 'unknown'), []).append(msg)
+
+    for tab, tab_messages in sorted(by_tab.items()):
+        def dispatch():
+            for msg in tab_messages:
+                window.render_message(msg, msg.changes)
+        results[f'dispatch_{tab}'] = measure(dispatch, len(tab_messages), repeat)
+
+    batches = [messages[i:i + BATCH_SIZE] for i in range(0, len(messages), BATCH_SIZE)]
+
+    def dispatch_batches():
+        # Rendering is capped by RenderScheduler: one flush for the whole burst
+        for batch in batches:
+            window.on_messages_received(batch)
+        window.renderer.flush()
+    results['dispatch_all'] = measure(dispatch_batches, len(messages), repeat)
+
+    # Bytes -> engine -> MainWindow -> repaint, one serial read per cycle
+    stream_chunks = chunks(GatewaySimulator().encode_stream(traffic))
+    engine = IngestEngine()
+    engine.subscribe(window.on_messages_received)
+
+    def end_to_end():
+        for chunk in stream_chunks:
+            engine.feed(chunk)
+            app.processEvents()
+    results['end_to_end'] = measure(end_to_end, len(traffic), repeat,
+                                    setup=window.decode_latency.reset)
+    results['end_to_end']['latency'] = window.decode_latency.summary()
+
+    window.close()
+    return results
+
+
+# ============================================================================
+# Real serial I/O through the pty simulator
+# ============================================================================
+
+def bench_serial(seconds: float, overdrive: float) -> Dict[str, dict]:
+    sim = GatewaySimulator(overdrive=overdrive, seed=1)
+    port = sim.open()
+    engine = IngestEngine()
+    engine.open(port)
+    received = [0]
+    engine.subscribe(lambda batch: received.__setitem__(0, received[0] + len(batch)))
+
+    reader = threading.Thread(target=engine.run)
+    reader.start()
+    start = time.perf_counter()
+    sim.run(seconds)
+    time.sleep(0.2)     # drain
+    engine.stop()
+    reader.join()
+    engine.close()
+    sim.close()
+
+    elapsed = time.perf_counter() - start
+    stats = sim.get_statistics()
+    return {'serial_pty': {
+        'frames': received[0],
+        'frames_per_s': round(received[0] / elapsed),
+        'frames_sent': stats['frames_sent'],
+        'bytes_dropped': stats['bytes_dropped'],
+        'read_wakeups': engine.read_wakeups,
+    }}
+
+
+# ============================================================================
+# Baseline comparison
+# ============================================================================
+
+def calibrate(repeat: int) -> float:
+    """ns for a fixed pure-Python workload: normalises machine/CPU-clock differences"""
+    table = {i: i * 3 for i in range(256)}
+
+    def workload():
+        total = 0
+        for i in range(200000):
+            total += table[i & 0xFF] ^ (i >> 3)
+        return total
+    return measure(workload, 1, max(repeat, 5))['ns_per_frame']
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Stages slower than baseline * (1 + tolerance), after calibration scaling"""
+    regressions = []
+    scale = 1.0
+    if baseline.get('meta', {}).get('calibration_ns'):
+        scale = results['meta']['calibration_ns'] / baseline['meta']['calibration_ns']
+    for name, stage in baseline.get('stages', {}).items():
+        current = results['stages'].get(name)
+        if current is None or 'ns_per_frame' not in stage or 'ns_per_frame' not in current:
+            continue
+        ratio = current['ns_per_frame'] / stage['ns_per_frame'] / scale
+        current['vs_baseline'] = round(ratio, 3)
+        if ratio > 1.0 + tolerance:
+            regressions.append(f"{name}: {current['ns_per_frame']:.0f} ns/frame "
+                               f"vs {stage['ns_per_frame']:.0f} (x{ratio:.2f})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=60.0, help="simulated traffic duration")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--no-gui', action='store_true', help="skip the Qt stages")
+    parser.add_argument('--serial', type=float, default=0.0, metavar='SECONDS',
+                        help="also run real pty I/O for SECONDS")
+    parser.add_argument('--overdrive', type=float, default=20.0, help="simulator overdrive for --serial")
+    parser.add_argument('--json', help="write results to this file")
+    parser.add_argument('--baseline', help="compare with this results file")
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help="allowed slowdown (0.5 = +50%%) after calibration scaling")
+    parser.add_argument('--save-baseline', help="write results as the new baseline")
+    args = parser.parse_args()
+
+    traffic = make_traffic(args.seconds)
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+            'traffic_seconds': args.seconds,
+            'frames': len(traffic),
+            'repeat': args.repeat,
+            'calibration_ns': calibrate(args.repeat),
+        },
+        'stages': bench_core(traffic, args.repeat),
+    }
+
+    if not args.no_gui:
+        try:
+            results['stages'].update(bench_gui(traffic, args.repeat))
+        except ImportError as e:
+            results['meta']['gui_skipped'] = str(e)
+    if args.serial > 0:
+        results['stages'].update(bench_serial(args.serial, args.overdrive))
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        results['regressions'] = regressions
+
+    for name, stage in results['stages'].items():
+        ns = f"{stage['ns_per_frame']:10.0f} ns/frame" if 'ns_per_frame' in stage else " " * 19
+        extra = f"  x{stage['vs_baseline']:.2f}" if 'vs_baseline' in stage else ""
+        print(f"{name:<18} {ns} {stage['frames_per_s']:>10} frames/s{extra}")
+    if 'latency' in results['stages'].get('end_to_end', {}):
+        print(f"latency (receipt -> dispatch): {results['stages']['end_to_end']['latency']}")
+
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(results, f, indent=2)
+
+    if regressions:
+        print("REGRESSIONS:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,14 @@
 __version__ = "1.0.0"
 __author__ = "Alessandro Zingaretti"
 
-from .main import main
-
 __all__ = ['main']
+
+
+def __getattr__(name):
+    # Import the GUI (PyQt6) only when requested, so the headless ingest core
+    # (charger_gui.ingest) works without Qt installed
+    if name == 'main':
+        from .main import main
+        globals()['main'] = main
+        return main
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
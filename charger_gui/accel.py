@@ -0,0 +1,260 @@
+"""
+Optional C accelerator for bulk decoding, built from utils_c_functions.
+
+utils_c_functions/evo_batch.c includes the level files (CanBus_DecodePacket_*)
+and adds EVO_DecodeBatch(), which decodes an array of frames of one CAN ID
+in a single call. The shared library is loaded with ctypes; without it
+(or for IDs without a C decoder: CTL, REQ) decode_batch() falls back to the
+numpy decoder in batch.py, with the same columns.
+
+    python -m charger_gui.accel --build      # cc -O2 -shared (CC to change compiler)
+    python -m charger_gui.accel --verify     # C vs Python on random payloads
+
+The C decoders compute in float32, as on the STM32: physical values agree
+with the Python decoder to float32 precision, everything else (flags,
+integers, enums, text) bit for bit. See verify().
+"""
+
+import argparse
+import ctypes
+import os
+import subprocess
+import sys
+from typing import Dict, Optional, Union, Sequence
+
+import numpy as np
+
+from . import batch
+from .batch import Columns, payload_matrix
+from .can_decoder import CANDecoder, SIGNAL_DB
+
+
+SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      'utils_c_functions', 'evo_batch.c')
+LIBRARY = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                       '_evo_batch' + ('.dll' if os.name == 'nt' else '.dylib' if sys.platform == 'darwin' else '.so'))
+
+
+class _Field(ctypes.Structure):
+    _fields_ = [('name', ctypes.c_char_p), ('offset', ctypes.c_uint32),
+                ('size', ctypes.c_uint32), ('kind', ctypes.c_char)]
+
+
+# EVO_Field_t.kind -> numpy type (by size)
+_KINDS = {b'b': 'b1', b'u': 'u', b'e': 'i', b'f': 'f', b's': 'S'}
+
+_library = None
+_load_error = ""
+_dtypes: Dict[int, Optional[np.dtype]] = {}
+
+
+def build(cc: Optional[str] = None, output: str = LIBRARY) -> str:
+    """Compile evo_batch.c into a shared library (raises CalledProcessError)"""
+    cc = cc or os.environ.get('CC', 'cc')
+    command = [cc, '-O2', '-shared', '-o', output, SOURCE]
+    if os.name != 'nt':
+        command.insert(2, '-fPIC')
+    subprocess.run(command, check=True)
+    unload()
+    return output
+
+
+def load(path: str = LIBRARY) -> Optional[ctypes.CDLL]:
+    """The C library, or None if not built / not loadable (reason in load_error())"""
+    global _library, _load_error
+    if _library is not None:
+        return _library
+    try:
+        library = ctypes.CDLL(path)
+    except OSError as e:
+        _load_error = str(e)
+        return None
+    library.EVO_PacketLayout.restype = ctypes.POINTER(_Field)
+    library.EVO_PacketLayout.argtypes = [ctypes.c_uint16, ctypes.POINTER(ctypes.c_uint32),
+                                         ctypes.POINTER(ctypes.c_uint32)]
+    library.EVO_DecodeBatch.restype = ctypes.c_long
+    library.EVO_DecodeBatch.argtypes = [ctypes.c_uint16, ctypes.c_void_p, ctypes.c_size_t,
+                                        ctypes.c_size_t, ctypes.c_void_p]
+    _library = library
+    _load_error = ""
+    return library
+
+
+def unload():
+    """Forget the loaded library (next load() opens the file again)"""
+    global _library
+    _library = None
+    _dtypes.clear()
+
+
+def load_error() -> str:
+    return _load_error
+
+
+def available() -> bool:
+    return load() is not None
+
+
+def packet_dtype(can_id: int) -> Optional[np.dtype]:
+    """numpy dtype of the C packet struct (layout read from the library), None without C decoder"""
+    if can_id not in _dtypes:
+        library = load()
+        dtype = None
+        if library is not None:
+            size, count = ctypes.c_uint32(), ctypes.c_uint32()
+            fields = library.EVO_PacketLayout(can_id, ctypes.byref(size), ctypes.byref(count))
+            if fields:
+                items = [fields[i] for i in range(count.value)]
+                dtype = np.dtype({
+                    'names': [field.name.decode() for field in items],
+                    'formats': [_KINDS[field.kind] if field.kind == b'b' else f'{_KINDS[field.kind]}{field.size}'
+                                for field in items],
+                    'offsets': [field.offset for field in items],
+                    'itemsize': size.value,
+                })
+        _dtypes[can_id] = dtype
+    return _dtypes[can_id]
+
+
+def supports(can_id: int) -> bool:
+    return packet_dtype(can_id) is not None
+
+
+def decode_packets(can_id: int, payloads: np.ndarray) -> np.ndarray:
+    """EVO_DecodeBatch: (N, >=8) uint8 -> structured array of C packets"""
+    dtype = packet_dtype(can_id)
+    if dtype is None:
+        raise ValueError(f"Nessun decoder C per 0x{can_id:03X}")
+    payloads = np.ascontiguousarray(payloads, dtype=np.uint8)
+    if payloads.ndim != 2 or payloads.shape[1] < 8:
+        raise ValueError(f"servono payload (N, 8), ricevuto {payloads.shape}")
+    packets = np.empty(len(payloads), dtype=dtype)
+    _library.EVO_DecodeBatch(can_id, payloads.ctypes.data, payloads.strides[0],
+                             len(payloads), packets.ctypes.data)
+    return packets
+
+
+def _enum_column(message, signal, values: np.ndarray) -> np.ndarray:
+    """C enum value -> member value, -1 for values without a member (as batch.py)"""
+    lookup = np.full(257, -1, dtype=np.int16)      # C enums come from bit fields: 0..255
+    for member in SIGNAL_DB.enum_table(message.can_id, signal.name).values():
+        lookup[member.value] = member.value
+    return lookup.take(values, mode='clip')
+
+
+def decode_batch(can_id: int, payloads: Union[np.ndarray, Sequence[bytes]]) -> Columns:
+    """
+    Same columns as batch.decode_batch, decoded in C when possible.
+
+    Values are the C ones: floats stay float32 and integers keep the C
+    width (views on the packet array, no copies).
+    """
+    if not isinstance(payloads, np.ndarray):
+        payloads = payload_matrix(payloads)
+    payloads = np.ascontiguousarray(payloads, dtype=np.uint8)
+    if not supports(can_id) or payloads.ndim != 2 or payloads.shape[1] < 8:
+        return batch.decode_batch(can_id, payloads)
+
+    message = SIGNAL_DB.messages[can_id]
+    packets = decode_packets(can_id, payloads)
+    columns = {}
+    for signal in message.signals:
+        if signal.flags:
+            # packed flag byte: the raw byte is the payload byte, the flags come from C
+            columns[signal.name] = payloads[:, signal.byte]
+            for flag, _ in signal.flags:
+                columns[flag] = packets[flag]
+        elif signal.enum is not None:
+            columns[signal.name] = _enum_column(message, signal, packets[signal.name])
+        elif signal.text:
+            columns[signal.name] = packets[signal.name].astype(f'S{signal.width // 8}')
+        else:
+            columns[signal.name] = packets[signal.name]
+    if message.empty is not None:
+        columns['empty'] = batch.empty_column(message, payloads)
+    return columns
+
+
+def _compare(got: np.ndarray, expected: np.ndarray, offset: float = 0.0) -> dict:
+    """Mismatch count and max |got - expected| for one column"""
+    if got is None or got.shape != expected.shape:
+        return {'mismatches': len(expected), 'max_abs_diff': None}
+    if expected.dtype.kind != 'f':
+        return {'mismatches': int((got != expected).sum()), 'max_abs_diff': 0.0}
+    # float32 tolerance: 2 ulp of raw * scale and of the result (offset, e.g. -40 °C)
+    diff = np.abs(got - expected)
+    unshifted = np.abs(expected - offset).astype(np.float32)
+    tolerance = 2 * (np.spacing(unshifted).astype(np.float64) +
+                     np.spacing(np.abs(expected).astype(np.float32)).astype(np.float64))
+    return {'mismatches': int((diff > tolerance).sum()), 'max_abs_diff': float(diff.max()) if len(diff) else 0.0}
+
+
+def verify(frames: int = 100000, seed: int = 1) -> Dict[str, dict]:
+    """
+    C vs Python (batch.decode_batch == CANDecoder) on random payloads, for every ID with a C decoder.
+
+    Per column: 'mismatches' (floats: differences beyond float32 rounding,
+    2 ulp of raw * scale and of the result), 'max_abs_diff'. Half of the rows are
+    biased (0x00 / 0xFF bytes) to hit flags, empty frames and limits.
+    'ACT1_scalar' compares the C columns of the first 1000 frames with
+    CANDecoder.decode_act1() directly (the reference for batch.py).
+    """
+    if not available():
+        raise RuntimeError(f"Libreria C non disponibile: {load_error()}")
+    rng = np.random.default_rng(seed)
+    payloads = rng.integers(0, 256, (frames, 8), dtype=np.uint8)
+    biased = rng.random((frames // 2, 8))
+    payloads[:frames // 2][biased < 0.3] = 0x00
+    payloads[:frames // 2][biased > 0.7] = 0xFF
+
+    report = {}
+    for can_id, message in SIGNAL_DB.messages.items():
+        if not supports(can_id):
+            continue
+        c_columns = decode_batch(can_id, payloads)
+        py_columns = batch.decode_batch(can_id, payloads)
+        offsets = {signal.name: signal.offset for signal in message.signals}
+        report[message.name] = {name: _compare(c_columns.get(name), expected, offsets.get(name, 0.0))
+                                 for name, expected in py_columns.items()}
+
+    # Spot check against the scalar decoder (the reference for batch.py)
+    spot = payloads[:1000]
+    act1 = decode_batch(CANDecoder.CAN_ID_ACT1, spot)
+    packets = [CANDecoder.decode_act1(payload.tobytes()) for payload in spot]
+    report['ACT1_scalar'] = {
+        signal.name: _compare(act1.get(signal.name),
+                              np.array([getattr(p, signal.name) for p in packets], dtype=np.float32),
+                              signal.offset)
+        for signal in SIGNAL_DB.messages[CANDecoder.CAN_ID_ACT1].signals}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optional C batch decoder (build / verify)")
+    parser.add_argument('--build', action='store_true', help="compile utils_c_functions/evo_batch.c")
+    parser.add_argument('--cc', default=None, help="C compiler (default: $CC or cc)")
+    parser.add_argument('--verify', action='store_true', help="compare C and Python decoders")
+    parser.add_argument('--frames', type=int, default=100000)
+    args = parser.parse_args()
+
+    if args.build:
+        print(f"Libreria: {build(args.cc)}")
+    if not available():
+        print(f"Libreria C non disponibile ({load_error()}): si usa il decoder numpy")
+        sys.exit(1)
+    print(f"Decoder C: {', '.join(m.name for i, m in SIGNAL_DB.messages.items() if supports(i))}")
+
+    if args.verify:
+        failed = False
+        for name, columns in verify(args.frames).items():
+            bad = {column: r for column, r in columns.items() if r['mismatches']}
+            worst = max((r['max_abs_diff'] or 0.0) for r in columns.values())
+            print(f"{name:<11} {'OK' if not bad else 'DIFF'}  {len(columns)} colonne, max |C - Python| = {worst:.2e}")
+            for column, r in bad.items():
+                print(f"    {column}: {r['mismatches']} differenze")
+            failed |= bool(bad)
+        sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
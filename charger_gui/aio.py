@@ -0,0 +1,259 @@
+"""
+asyncio transport for the serial gateway.
+
+One event loop can serve several gateways (plus sockets, periodic senders...)
+without a thread per port. Incoming bytes go through the same IngestEngine
+(framing, parsing, decoding) used by the GUI and come out as SerialMessage.
+
+    gateway = await open_gateway("/dev/ttyUSB0")
+    async for msg in gateway:
+        print(msg, msg.decode())
+    await gateway.send("CanBus Tx 0x618 80 00 A0 0E 10 00 AA 00")
+
+Uses pyserial-asyncio when installed, otherwise loop.add_reader() /
+add_writer() on the port file descriptor (POSIX only). Writes never block the
+loop: what the port does not take is buffered, and send() waits (drain)
+while the buffer is above the high-water mark, so a stalled adapter holds up
+only its own senders.
+
+Headless usage (from the repository root):
+    python -m charger_gui.aio --port /dev/ttyUSB0 [--port /dev/ttyUSB1]
+"""
+
+import argparse
+import asyncio
+import os
+from typing import List, Optional
+
+import serial
+
+try:
+    import serial_asyncio
+except ImportError:
+    serial_asyncio = None
+
+from .ingest import IngestEngine, SerialMessage
+from .can_decoder import CANDecoder
+
+
+_EOF = object()
+
+
+class GatewayProtocol(asyncio.Protocol):
+    """asyncio Protocol: data_received() -> IngestEngine -> async iterator of SerialMessage"""
+
+    def __init__(self, engine: Optional[IngestEngine] = None, max_queue: int = 10000):
+        self.engine = engine if engine is not None else IngestEngine()
+        self.engine.subscribe(self._on_batch)
+        self.transport: Optional[asyncio.Transport] = None
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._closed = asyncio.get_running_loop().create_future()
+        self._can_write = asyncio.Event()   # cleared by pause_writing()
+        self._can_write.set()
+        self.dropped = 0    # messages dropped because nobody consumed the queue
+
+    # -- asyncio.Protocol --------------------------------------------------
+    def connection_made(self, transport):
+        self.transport = transport
+        self.engine.framer.reset()
+
+    def data_received(self, data: bytes):
+        self.engine.feed(data)
+
+    def pause_writing(self):
+        self._can_write.clear()
+
+    def resume_writing(self):
+        self._can_write.set()
+
+    def connection_lost(self, exc: Optional[Exception]):
+        self.transport = None
+        self._can_write.set()   # wake the senders waiting for drain
+        self._put(_EOF)
+        if not self._closed.done():
+            self._closed.set_result(exc)
+
+    # -- Queue ------------------------------------------------------------
+    def _put(self, item):
+        if self._queue.full():
+            # Keep the newest data: drop the oldest message
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(item)
+
+    def _on_batch(self, batch: List[SerialMessage]):
+        for msg in batch:
+            self._put(msg)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> SerialMessage:
+        msg = await self._queue.get()
+        if msg is _EOF:
+            self._queue.put_nowait(_EOF)   # other consumers stop too
+            raise StopAsyncIteration
+        return msg
+
+    # -- Commands ---------------------------------------------------------
+    async def send(self, message: str):
+        """Send one ASCII command line to the gateway (waits while the write buffer is full)"""
+        await self._can_write.wait()
+        if self.transport is None or self.transport.is_closing():
+            raise ConnectionError("Gateway non connesso")
+        self.transport.write(f"{message}\n".encode())
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+
+    async def wait_closed(self) -> Optional[Exception]:
+        """Wait for the connection to close; return the error, if any"""
+        return await self._closed
+
+
+WRITE_HIGH_WATER = 4096     # bytes buffered before pause_writing() (~100 CTL lines)
+WRITE_LOW_WATER = 1024
+
+
+class SerialFdTransport(asyncio.Transport):
+    """Minimal serial transport on loop.add_reader()/add_writer() (fallback without pyserial-asyncio)"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, port: serial.Serial,
+                 protocol: asyncio.Protocol):
+        super().__init__()
+        self._loop = loop
+        self._port = port
+        self._fd = port.fileno()
+        self._protocol = protocol
+        self._closing = False
+        self._buffer = bytearray()      # written by _write_ready() when the port accepts it
+        self._paused = False
+        self._high_water = WRITE_HIGH_WATER
+        self._low_water = WRITE_LOW_WATER
+        loop.add_reader(self._fd, self._read_ready)
+        loop.call_soon(protocol.connection_made, self)
+
+    def _read_ready(self):
+        try:
+            data = self._port.read(self._port.in_waiting or 1)
+        except serial.SerialException as e:
+            self._close(e)
+            return
+        if data:
+            self._protocol.data_received(data)
+
+    def _write_some(self, data) -> int:
+        """Non-blocking write on the port fd; return the bytes taken (-1: port closed on error)"""
+        # os.write, not Serial.write: with write_timeout=0 pyserial spins on EAGAIN
+        try:
+            return os.write(self._fd, data)
+        except (BlockingIOError, InterruptedError):
+            return 0
+        except OSError as e:
+            self._close(serial.SerialException(f"write failed: {e}"))
+            return -1
+
+    def write(self, data: bytes):
+        if self._closing or not data:
+            return
+        if not self._buffer:
+            n = self._write_some(data)
+            if n < 0 or n == len(data):
+                return
+            data = data[n:]
+            self._loop.add_writer(self._fd, self._write_ready)
+        self._buffer.extend(data)
+        if not self._paused and len(self._buffer) > self._high_water:
+            self._paused = True
+            self._protocol.pause_writing()
+
+    def _write_ready(self):
+        n = self._write_some(self._buffer)
+        if n < 0:
+            return
+        del self._buffer[:n]
+        if not self._buffer:
+            self._loop.remove_writer(self._fd)
+        if self._paused and len(self._buffer) <= self._low_water:
+            self._paused = False
+            self._protocol.resume_writing()
+
+    def get_write_buffer_size(self) -> int:
+        return len(self._buffer)
+
+    def get_write_buffer_limits(self):
+        return self._low_water, self._high_water
+
+    def set_write_buffer_limits(self, high: Optional[int] = None, low: Optional[int] = None):
+        self._high_water = WRITE_HIGH_WATER if high is None else high
+        self._low_water = self._high_water // 4 if low is None else low
+
+    def is_closing(self) -> bool:
+        return self._closing
+
+    def close(self):
+        self._close(None)
+
+    def _close(self, exc: Optional[Exception]):
+        if self._closing:
+            return
+        self._closing = True
+        self._loop.remove_reader(self._fd)
+        if self._buffer:
+            self._loop.remove_writer(self._fd)
+            self._buffer.clear()
+        self._port.close()
+        self._loop.call_soon(self._protocol.connection_lost, exc)
+
+    def get_extra_info(self, name, default=None):
+        return self._port if name == 'serial' else default
+
+
+async def open_gateway(port_name: str, baudrate: int = 115200,
+                       engine: Optional[IngestEngine] = None) -> GatewayProtocol:
+    """Open a gateway port on the running loop (raises serial.SerialException)"""
+    loop = asyncio.get_running_loop()
+
+    if serial_asyncio is not None:
+        _, protocol = await serial_asyncio.create_serial_connection(
+            loop, lambda: GatewayProtocol(engine), port_name, baudrate=baudrate)
+        return protocol
+
+    if not hasattr(loop, 'add_reader'):
+        raise RuntimeError("Event loop senza add_reader(): installare pyserial-asyncio")
+    port = serial.Serial(port=port_name, baudrate=baudrate, timeout=0, write_timeout=0)
+    protocol = GatewayProtocol(engine)
+    try:
+        SerialFdTransport(loop, port, protocol)
+    except (NotImplementedError, OSError, ValueError):
+        port.close()
+        raise RuntimeError("add_reader() non supportato su questa porta: installare pyserial-asyncio")
+    await asyncio.sleep(0)  # connection_made() (call_soon) runs first, as with pyserial-asyncio
+    return protocol
+
+
+async def _print_gateway(port_name: str, baudrate: int):
+    gateway = await open_gateway(port_name, baudrate)
+    async for msg in gateway:
+        print(f"{port_name}: {CANDecoder.get_message_name(msg.can_id):<20} {msg!r}  {msg.decode()}")
+    print(port_name, gateway.engine.get_statistics())
+
+
+async def _main(ports: List[str], baudrate: int):
+    await asyncio.gather(*(_print_gateway(port, baudrate) for port in ports))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="asyncio CAN ingest (prints decoded frames)")
+    parser.add_argument('--port', action='append', required=True, help="repeat for several gateways")
+    parser.add_argument('--baudrate', type=int, default=115200)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_main(args.port, args.baudrate))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""
+Vectorized (NumPy) batch decoding for offline analysis of recorded sessions.
+
+Columns are generated from the same SIGNAL_DB used by CANDecoder, so the
+scaling is identical to the scalar decoders:
+
+    payloads = payload_matrix(frames)                    # (N, 8) uint8
+    act1 = decode_batch(CANDecoder.CAN_ID_ACT1, payloads)
+    act1['vout_V'].mean(), act1['temp_C'].max()
+
+Flags become bool columns (packed flag bytes: the raw byte plus one bool
+column per flag), enums the integer member value (-1 if invalid),
+text fields 'S' byte strings. Messages with a "no content" frame (faults)
+get an extra bool column 'empty'. Requires numpy (not needed by the GUI).
+
+Headless usage (from the repository root):
+    python -m charger_gui.batch session.trace [--id 0x611]
+"""
+
+import argparse
+import time
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from .can_decoder import CANDecoder, SIGNAL_DB
+from .ingest import IngestEngine, SerialMessage
+from .signal_db import Message, Signal
+
+
+Columns = Dict[str, np.ndarray]
+
+
+def payload_matrix(payloads: Iterable[bytes], width: int = 8) -> np.ndarray:
+    """List of payloads -> (N, width) uint8 array (short payloads zero-padded)"""
+    blob = b''.join(bytes(p)[:width].ljust(width, b'\x00') for p in payloads)
+    return np.frombuffer(blob, dtype=np.uint8).reshape(-1, width)
+
+
+def _u16_column(payloads: np.ndarray, byte: int) -> np.ndarray:
+    """Big-endian uint16 at `byte` of every row (strided view, no copy)"""
+    return np.ndarray(shape=(payloads.shape[0],), dtype='>u2', buffer=payloads,
+                      offset=byte, strides=(payloads.strides[0],))
+
+
+def _enum_lookup(message: Message, signal: Signal) -> np.ndarray:
+    """raw code -> enum member value, -1 for codes without a member"""
+    table = SIGNAL_DB.enum_table(message.can_id, signal.name)
+    lookup = np.full(1 << signal.width, -1, dtype=np.int16)
+    for raw, member in table.items():
+        lookup[raw] = member.value
+    return lookup
+
+
+def _column(message: Message, signal: Signal, payloads: np.ndarray) -> np.ndarray:
+    if signal.text:
+        size = signal.width // 8
+        return np.ascontiguousarray(payloads[:, signal.byte:signal.byte + size]).view(f'S{size}')[:, 0]
+    if signal.width == 16:
+        raw = _u16_column(payloads, signal.byte)
+    elif signal.is_flag:
+        return (payloads[:, signal.byte] & (1 << signal.bit)) != 0
+    else:
+        raw = payloads[:, signal.byte]
+        if signal.bit:
+            raw = raw >> signal.bit
+        if signal.bit + signal.width < 8:
+            raw = raw & signal.mask
+    if signal.enum is not None:
+        return _enum_lookup(message, signal)[raw]
+    if signal.scale is not None:
+        values = raw * signal.scale         # float64, same operations as the scalar decoder
+        if signal.offset:
+            values += signal.offset
+        return values
+    return raw.astype(np.int64)
+
+
+def empty_column(message: Message, payloads: np.ndarray) -> np.ndarray:
+    """True for the "no content" frames of the message (bytes start..length all = fill)"""
+    start, fill = message.empty
+    if payloads.shape[1] == 8 and message.length == 8 and payloads.flags.c_contiguous:
+        # one 64-bit compare per row instead of a (N, 8 - start) bool matrix
+        words = payloads.view('>u8')[:, 0]
+        mask = (1 << (8 * (8 - start))) - 1
+        return (words & np.uint64(mask)) == np.uint64(int.from_bytes(bytes([fill]) * (8 - start), 'big'))
+    return (payloads[:, start:message.length] == fill).all(axis=1)
+
+
+def decode_batch(can_id: int, payloads: Union[np.ndarray, Sequence[bytes]]) -> Columns:
+    """Decode N payloads of one CAN ID into columns of physical values"""
+    message = SIGNAL_DB.messages.get(can_id)
+    if message is None:
+        raise ValueError(f"Unknown CAN ID 0x{can_id:03X}")
+    if not isinstance(payloads, np.ndarray):
+        payloads = payload_matrix(payloads)
+    payloads = np.ascontiguousarray(payloads, dtype=np.uint8)
+    if payloads.ndim != 2 or payloads.shape[1] < message.length:
+        raise ValueError(f"{message.name}: servono payload (N, {message.length}), ricevuto {payloads.shape}")
+
+    columns = {}
+    for signal in message.signals:
+        columns[signal.name] = column = _column(message, signal, payloads)
+        for flag, bit in signal.flags:
+            columns[flag] = (column & (1 << bit)) != 0
+    if message.empty is not None:
+        columns['empty'] = empty_column(message, payloads)
+    return columns
+
+
+def group_messages(messages: Iterable[SerialMessage]) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+    """SerialMessage stream -> {can_id: (timestamps, payload matrix)}"""
+    times: Dict[int, List[float]] = {}
+    payloads: Dict[int, List[bytes]] = {}
+    for msg in messages:
+        times.setdefault(msg.can_id, []).append(msg.timestamp)
+        payloads.setdefault(msg.can_id, []).append(msg.data)
+    return {can_id: (np.array(times[can_id]), payload_matrix(payloads[can_id])) for can_id in times}
+
+
+def decode_messages(messages: Iterable[SerialMessage],
+                    decoder: Callable[[int, np.ndarray], Columns] = None) -> Dict[int, Columns]:
+    """Decode a whole session: {can_id: columns + 'timestamp'} for every known ID"""
+    decoder = decoder or decode_batch     # accel.decode_batch: C decoder
+    result = {}
+    for can_id, (timestamps, payloads) in group_messages(messages).items():
+        if can_id in SIGNAL_DB.messages:
+            columns = decoder(can_id, payloads)
+            columns['timestamp'] = timestamps
+            result[can_id] = columns
+    return result
+
+
+def load_messages(path: str) -> List[SerialMessage]:
+    """All frames of a trace file (see replay.load_trace), timestamped with the trace time"""
+    from .replay import load_trace
+
+    engine = IngestEngine(decode=False)
+    messages = []
+    engine.subscribe(messages.extend)
+    for t, chunk in zip(*load_trace(path)):
+        engine.feed(chunk, t)
+    return messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-decode a recorded session (numpy)")
+    parser.add_argument('path')
+    parser.add_argument('--id', type=lambda s: int(s, 0), help="only this CAN ID (e.g. 0x611)")
+    parser.add_argument('--accel', action='store_true', help="C decoder if built (charger_gui.accel)")
+    args = parser.parse_args()
+
+    decoder = decode_batch
+    if args.accel:
+        from . import accel
+        if accel.available():
+            decoder = accel.decode_batch
+        else:
+            print(f"Decoder C non disponibile ({accel.load_error()}): si usa numpy")
+
+    messages = load_messages(args.path)
+    if args.id is not None:
+        messages = [msg for msg in messages if msg.can_id == args.id]
+    start = time.perf_counter()
+    session = decode_messages(messages, decoder)
+    elapsed = time.perf_counter() - start
+    print(f"{len(messages)} frame decodificati in {elapsed * 1000:.1f} ms")
+
+    for can_id, columns in sorted(session.items()):
+        print(f"\n0x{can_id:03X} {CANDecoder.get_message_name(can_id)}  ({len(columns['timestamp'])} frame)")
+        for name, column in columns.items():
+            if name == 'timestamp':
+                continue
+            if column.dtype.kind == 'S':
+                print(f"    {name:<16} {sorted(set(column.tolist()))[:4]}")
+            elif column.dtype == bool:
+                print(f"    {name:<16} true {column.mean() * 100:6.1f} %")
+            else:
+                print(f"    {name:<16} min {column.min():10.3f}  mean {column.mean():10.3f}  max {column.max():10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,10 @@
+import sys
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional
+from functools import lru_cache
+from typing import FrozenSet, Iterable, List, Optional
+
+from .signal_db import Flag, Flags, Message, Signal, SignalDatabase, Text
 
 
 # ============================================================================
@@ -96,7 +100,10 @@ class IDSettingType(Enum):
 # Level 1 - Data Structures
 # ============================================================================
 
-@dataclass
+# Packets are immutable (shared by DecodeCache) and slotted where supported
+PACKET = dict(frozen=True, slots=True) if sys.version_info >= (3, 10) else dict(frozen=True)
+
+@dataclass(**PACKET)
 class CtlPacket:
     """CTL Packet (BMS → Charger) - ID 0x618"""
     can_enable: bool
@@ -106,18 +113,13 @@ class CtlPacket:
     iout_max_A: float
 
 
-@dataclass
+@dataclass(**PACKET)
 class StatPacket:
     """STAT Packet (Charger → BMS) - ID 0x610"""
-    power_enable: bool
-    error_latch: bool
-    warn_limit: bool
-    lim_temp: bool
-    warning_hv: bool
-    bulks: bool
+    flags_d0: int   # power_enable, error_latch, warn_limit, lim_temp, warning_hv, bulks
 
 
-@dataclass
+@dataclass(**PACKET)
 class Act1Packet:
     """ACT1 Packet (Charger → BMS) - ID 0x611"""
     iac_A: float
@@ -126,7 +128,7 @@ class Act1Packet:
     iout_A: float
 
 
-@dataclass
+@dataclass(**PACKET)
 class Act2Packet:
     """ACT2 Packet (Charger → BMS) - ID 0x614"""
     temp_loglv_C: float
@@ -135,58 +137,29 @@ class Act2Packet:
     pilot_limit_A: float
 
 
-@dataclass
+@dataclass(**PACKET)
 class Tst1Packet:
-    """TST1 Packet (Charger → BMS) - ID 0x615"""
-    # Byte 0
-    ack: bool
-    pr_compl: bool
-    pwr_ok: bool
-    vout_ok: bool
-    neutral: bool
-    led3: bool
-    led618: bool
-    # Byte 1
-    ovp: bool
-    conn_open: bool
-    ther_fail: bool
-    rx618_fail: bool
-    # Byte 2
-    bulk1_fail: bool
-    bulk2_fail: bool
-    bulk3_fail: bool
-    pump_on: bool
-    fan_on: bool
-    hv_rx_fail: bool
-    cooling_fail: bool
-    rx619_fail: bool
-    # Byte 3
-    neutro1: bool
-    neutro2: bool
-    three_phase: bool
-    iac_fail: bool
-    ignition: bool
-    lv_battery_np: bool
-    # Byte 4
-    prox_ok: bool
-    pilot_ok: bool
-    s2_ok: bool
-    # Byte 6
-    cnt_hours: int
+    """TST1 Packet (Charger → BMS) - ID 0x615 (flag bytes packed, bool accessors from SIGNAL_DB)"""
+    flags_d0: int   # ack, pr_compl, pwr_ok, vout_ok, neutral, led3, led618
+    flags_d1: int   # ovp, conn_open, ther_fail, rx618_fail
+    flags_d2: int   # bulk1/2/3_fail, pump_on, fan_on, hv_rx_fail, cooling_fail, rx619_fail
+    flags_d3: int   # neutro1, neutro2, three_phase, iac_fail, ignition, lv_battery_np
+    flags_d4: int   # prox_ok, pilot_ok, s2_ok
+    cnt_hours: int  # Byte 6-7
 
 
 # ============================================================================
 # Level 2 - Data Structures
 # ============================================================================
 
-@dataclass
+@dataclass(**PACKET)
 class ReqPacket:
     """REQ Packet (BMS → Charger) - ID 0x61B"""
     enable: bool
     id_requested: int
 
 
-@dataclass
+@dataclass(**PACKET)
 class FaultPacket:
     """Pacchetto Fault (Active or Passive) - ID 0x61D or 0x61C"""
     frame_type: FrameType
@@ -199,13 +172,13 @@ class FaultPacket:
     last_time_h: int
 
 
-@dataclass
+@dataclass(**PACKET)
 class SoftwarePacket:
     """Pacchetto Software Version - ID 0x61E"""
     version: str
 
 
-@dataclass
+@dataclass(**PACKET)
 class SerialNumberPacket:
     """Pacchetto Serial Number - ID 0x61F"""
     serial: str
@@ -215,7 +188,7 @@ class SerialNumberPacket:
 # Level 3 - Data Structures
 # ============================================================================
 
-@dataclass
+@dataclass(**PACKET)
 class Act3Packet:
     """ACT3 Packet (Charger → BMS) - ID 0x712"""
     fan_voltage_V: float
@@ -224,7 +197,7 @@ class Act3Packet:
     iacm3_A: float
 
 
-@dataclass
+@dataclass(**PACKET)
 class TempPacket:
     """TEMP Packet (Charger → BMS) - ID 0x713"""
     temp_loghv_C: float
@@ -233,27 +206,16 @@ class TempPacket:
     temp_power3_C: float
 
 
-@dataclass
+@dataclass(**PACKET)
 class Stst1Packet:
-    """STST1 Packet (Charger → BMS) - ID 0x715"""
-    pfc_enable: bool
-    log_temp_high: bool
-    log_temp_low: bool
-    uvlo_log: bool
-    ther_low_fail: bool
-    rx618_fail: bool
-    bulk1_fail: bool
-    bulk2_fail: bool
-    bulk3_fail: bool
-    cooling_fail1: bool
-    cooling_fail2: bool
-    cooling_fail3: bool
-    uvlo_log_lv: bool
-    bat_over: bool
-    bat_under: bool
-
-
-@dataclass
+    """STST1 Packet (Charger → BMS) - ID 0x715 (flag bytes packed, bool accessors from SIGNAL_DB)"""
+    flags_d0: int   # pfc_enable
+    flags_d1: int   # log_temp_high, log_temp_low, uvlo_log, ther_low_fail, rx618_fail
+    flags_d2: int   # bulk1/2/3_fail, cooling_fail1/2/3
+    flags_d3: int   # uvlo_log_lv, bat_over, bat_under
+
+
+@dataclass(**PACKET)
 class Act4Packet:
     """ACT4 Packet (Charger → BMS) - ID 0x717"""
     temp_logfan_C: float
@@ -266,7 +228,7 @@ class Act4Packet:
 # Level 4 - Data Structures
 # ============================================================================
 
-@dataclass
+@dataclass(**PACKET)
 class Tst2Packet:
     """TST2 Packet (Charger → BMS) - ID 0x716"""
     baudrate: BaudrateType
@@ -285,6 +247,119 @@ class Tst2Packet:
     password: int
 
 
+# ============================================================================
+# SIGNAL DATABASE (single source of truth for decoder and encoder)
+# ============================================================================
+
+TEMP_SCALE = 0.005188       # °C/bit, offset -40 °C
+
+# Failure level bits (D3 bit 1-0): 00 non previsto -> Warning
+_FAILURE_LEVELS = {0: FailureLevel.WARNING, 1: FailureLevel.WARNING,
+                   2: FailureLevel.SOFT, 3: FailureLevel.HARD}
+
+
+def _temp_signal(name: str, byte: int) -> Signal:
+    return Signal(name, byte, scale=TEMP_SCALE, offset=-40.0, unit='°C')
+
+
+SIGNAL_DB = SignalDatabase([
+    # ---------------------------------------------------------------- Level 1
+    Message(0x618, 'CTL', CtlPacket, title="CTL (Control)", signals=[
+        Flag('can_enable', 0, 7), Flag('led3_enable', 0, 3),
+        Signal('iac_max_A', 1, scale=0.1, unit='A'),
+        Signal('vout_max_V', 3, scale=0.1, unit='V'),
+        Signal('iout_max_A', 5, scale=0.1, unit='A'),
+    ]),
+    Message(0x610, 'STAT', StatPacket, length=4, title="STAT (Status)", signals=[
+        Flags('flags_d0', 0, power_enable=7, error_latch=6, warn_limit=5, lim_temp=3,
+              warning_hv=1, bulks=0),
+    ]),
+    Message(0x611, 'ACT1', Act1Packet, title="ACT1 (Actual Values 1)", signals=[
+        Signal('iac_A', 0, scale=0.1, unit='A'),
+        _temp_signal('temp_C', 2),
+        Signal('vout_V', 4, scale=0.1, unit='V'),
+        Signal('iout_A', 6, scale=0.1, unit='A'),
+    ]),
+    Message(0x614, 'ACT2', Act2Packet, title="ACT2 (Actual Values 2)", signals=[
+        _temp_signal('temp_loglv_C', 0),
+        Signal('ac_power_kW', 2, scale=0.01, unit='kW'),
+        Signal('prox_limit_A', 4, scale=0.1, unit='A'),
+        Signal('pilot_limit_A', 6, scale=0.1, unit='A'),
+    ]),
+    Message(0x615, 'TST1', Tst1Packet, title="TST1 (Test/Diagnostic)", signals=[
+        Flags('flags_d0', 0, ack=7, pr_compl=6, pwr_ok=5, vout_ok=4, neutral=3, led3=2, led618=1),
+        Flags('flags_d1', 1, ovp=7, conn_open=6, ther_fail=2, rx618_fail=0),
+        Flags('flags_d2', 2, bulk1_fail=7, bulk2_fail=6, bulk3_fail=5, pump_on=4, fan_on=3,
+              hv_rx_fail=2, cooling_fail=1, rx619_fail=0),
+        Flags('flags_d3', 3, neutro1=7, neutro2=6, three_phase=5, iac_fail=2, ignition=1, lv_battery_np=0),
+        Flags('flags_d4', 4, prox_ok=7, pilot_ok=5, s2_ok=3),
+        Signal('cnt_hours', 6, unit='h'),
+    ]),
+    # ---------------------------------------------------------------- Level 2
+    Message(0x61B, 'REQ', ReqPacket, length=4, title="REQ (Request)", signals=[
+        Flag('enable', 0, 7),
+        Signal('id_requested', 2),
+    ]),
+    *(Message(can_id, name, FaultPacket, title=title, empty=(1, 0xFF), signals=[
+        Signal('frame_type', 0, width=2, bit=6, enum=FrameType),
+        Signal('total_errors', 0, width=6),
+        Signal('frame_number', 1, width=6),
+        Signal('fault_code', 2, width=8),
+        Signal('occurrence', 3, width=6, bit=2),
+        Signal('failure_level', 3, width=2, enum=FailureLevel, values=_FAILURE_LEVELS),
+        Signal('first_time_h', 4, unit='h'),
+        Signal('last_time_h', 6, unit='h'),
+    ]) for can_id, name, title in ((0x61C, 'FLTP', "FLTP (Fault Passive)"),
+                                   (0x61D, 'FLTA', "FLTA (Fault Active)"))),
+    Message(0x61E, 'SW', SoftwarePacket, title="SW (Software Version)", signals=[
+        Text('version', 0, 8),
+    ]),
+    Message(0x61F, 'SN', SerialNumberPacket, title="SN (Serial Number)", signals=[
+        Text('serial', 0, 8),
+    ]),
+    # ---------------------------------------------------------------- Level 3
+    Message(0x712, 'ACT3', Act3Packet, title="ACT3 (AC Currents)", signals=[
+        Signal('fan_voltage_V', 0, scale=0.1, unit='V'),
+        Signal('iacm1_A', 2, scale=0.1, unit='A'),
+        Signal('iacm2_A', 4, scale=0.1, unit='A'),
+        Signal('iacm3_A', 6, scale=0.1, unit='A'),
+    ]),
+    Message(0x713, 'TEMP', TempPacket, title="TEMP (Temperatures)", signals=[
+        _temp_signal('temp_loghv_C', 0), _temp_signal('temp_power1_C', 2),
+        _temp_signal('temp_power2_C', 4), _temp_signal('temp_power3_C', 6),
+    ]),
+    Message(0x714, 'ACT4', Act4Packet, title="ACT4 (Temperature FAN)", signals=[
+        _temp_signal('temp_logfan_C', 0),
+        Signal('iout1_raw', 2), Signal('iout2_raw', 4), Signal('iout3_raw', 6),
+    ]),
+    Message(0x715, 'STST1', Stst1Packet, length=4, title="STST1 (Real Time Diagnostic)", signals=[
+        Flags('flags_d0', 0, pfc_enable=2),
+        Flags('flags_d1', 1, log_temp_high=5, log_temp_low=4, uvlo_log=3, ther_low_fail=2, rx618_fail=0),
+        Flags('flags_d2', 2, bulk1_fail=7, bulk2_fail=6, bulk3_fail=5,
+              cooling_fail1=4, cooling_fail2=3, cooling_fail3=2),
+        Flags('flags_d3', 3, uvlo_log_lv=3, bat_over=1, bat_under=0),
+    ]),
+    # ---------------------------------------------------------------- Level 4
+    Message(0x616, 'TST2', Tst2Packet, title="TST2 (Configuration)", signals=[
+        Signal('baudrate', 0, width=2, bit=6, enum=BaudrateType),
+        Signal('id_type', 0, width=1, bit=5, enum=IdType),
+        Signal('iac_control', 0, width=2, bit=2, enum=IacControlType),
+        Signal('range', 0, width=2, enum=RangeType),
+        Flag('three_phase', 0, 0),      # same bit as range (manual)
+        Flag('slave', 1, 7),
+        Signal('evc_model', 1, width=1, bit=6, enum=EVCModelType),
+        Signal('id_setting', 1, width=4, bit=2, enum=IDSettingType),
+        Flag('parallel_ctrl', 1, 1), Flag('air_cooler', 1, 0),
+        Signal('iacm_max_set_A', 2, width=8, scale=0.2, unit='A'),
+        Signal('vout_max_set_V', 3, scale=0.1, unit='V'),
+        Signal('iout_max_set_A', 5, scale=0.1, unit='A'),
+        Signal('password', 7, width=8),
+    ]),
+])
+
+_DECODERS = SIGNAL_DB.decoders
+
+
 # ============================================================================
 # DECODER CLASS
 # ============================================================================
@@ -311,300 +386,89 @@ class CANDecoder:
     CAN_ID_STST1 = 0x715        #lv3
     
     # ========================================================================
-    # LEVEL 1 - Decoders
-    # ========================================================================
-    
-    @staticmethod
-    def decode_ctl(data: List[int]) -> CtlPacket:
-        """Decode CTL packet - ID 0x618 (BMS → Charger)"""
-        can_enable = bool(data[0] & 0x80)
-        led3_enable = bool(data[0] & 0x40)
-        iac_max_A = data[1] * 0.1
-        vout_max_V = ((data[2] << 8) | data[3]) * 0.1
-        iout_max_A = ((data[4] << 8) | data[5]) * 0.1
-        
-        return CtlPacket(can_enable, led3_enable, iac_max_A, vout_max_V, iout_max_A)
-    
-    @staticmethod
-    def decode_stat(data: List[int]) -> StatPacket:
-        """Decode STAT packet - ID 0x610 (Charger → BMS)"""
-        return StatPacket(
-            power_enable=bool(data[0] & (1 << 7)),
-            error_latch=bool(data[0] & (1 << 6)),
-            warn_limit=bool(data[0] & (1 << 5)),
-            lim_temp=bool(data[0] & (1 << 3)),
-            warning_hv=bool(data[0] & (1 << 1)),
-            bulks=bool(data[0] & (1 << 0))
-        )
-    
-    @staticmethod
-    def decode_act1(data: List[int]) -> Act1Packet:
-        """Decode ACT1 packet - ID 0x611 (Charger → BMS)"""
-        iac_raw = (data[0] << 8) | data[1]
-        temp_raw = (data[2] << 8) | data[3]
-        vout_raw = (data[4] << 8) | data[5]
-        iout_raw = (data[6] << 8) | data[7]
-        
-        return Act1Packet(
-            iac_A=iac_raw * 0.1,
-            temp_C=(temp_raw * 0.005188) - 40.0,
-            vout_V=vout_raw * 0.1,
-            iout_A=iout_raw * 0.1
-        )
-    
-    @staticmethod
-    def decode_act2(data: List[int]) -> Act2Packet:
-        """Decode ACT2 packet - ID 0x614 (Charger → BMS)"""
-        temp_raw = (data[0] << 8) | data[1]
-        power_raw = (data[2] << 8) | data[3]
-        prox_raw = (data[4] << 8) | data[5]
-        pilot_raw = (data[6] << 8) | data[7]
-        
-        return Act2Packet(
-            temp_loglv_C=(temp_raw * 0.005188) - 40.0,
-            ac_power_kW=power_raw * 0.05,
-            prox_limit_A=prox_raw * 0.1,
-            pilot_limit_A=pilot_raw * 0.1
-        )
-    
-    @staticmethod
-    def decode_tst1(data: List[int]) -> Tst1Packet:
-        """Decode TST1 packet - ID 0x615 (Charger → BMS)"""
-        return Tst1Packet(
-            # Byte 0
-            ack=bool(data[0] & (1 << 7)),
-            pr_compl=bool(data[0] & (1 << 6)),
-            pwr_ok=bool(data[0] & (1 << 5)),
-            vout_ok=bool(data[0] & (1 << 4)),
-            neutral=bool(data[0] & (1 << 3)),
-            led3=bool(data[0] & (1 << 2)),
-            led618=bool(data[0] & (1 << 1)),
-            # Byte 1
-            ovp=bool(data[1] & (1 << 7)),
-            conn_open=bool(data[1] & (1 << 6)),
-            ther_fail=bool(data[1] & (1 << 2)),
-            rx618_fail=bool(data[1] & (1 << 0)),
-            # Byte 2
-            bulk1_fail=bool(data[2] & (1 << 7)),
-            bulk2_fail=bool(data[2] & (1 << 6)),
-            bulk3_fail=bool(data[2] & (1 << 5)),
-            pump_on=bool(data[2] & (1 << 4)),
-            fan_on=bool(data[2] & (1 << 3)),
-            hv_rx_fail=bool(data[2] & (1 << 2)),
-            cooling_fail=bool(data[2] & (1 << 1)),
-            rx619_fail=bool(data[2] & (1 << 0)),
-            # Byte 3
-            neutro1=bool(data[3] & (1 << 7)),
-            neutro2=bool(data[3] & (1 << 6)),
-            three_phase=bool(data[3] & (1 << 5)),
-            iac_fail=bool(data[3] & (1 << 2)),
-            ignition=bool(data[3] & (1 << 1)),
-            lv_battery_np=bool(data[3] & (1 << 0)),
-            # Byte 4
-            prox_ok=bool(data[4] & (1 << 7)),
-            pilot_ok=bool(data[4] & (1 << 5)),
-            s2_ok=bool(data[4] & (1<<3)),
-            #Byte6
-            cnt_hours= int((data[6]<<8) | data[7])
-        )
-    
-    # ========================================================================
-    # LEVEL 2 - Decoders
-    # ========================================================================
-    
-    @staticmethod
-    def decode_req(data: List[int]) -> ReqPacket:
-        """Decode REQ packet - ID 0x61B (BMS → Charger)"""
-        enable = bool(data[0] & 0x80)
-        id_requested = (data[2] << 8) | data[3]
-        return ReqPacket(enable, id_requested)
-    
-    @staticmethod
-    def decode_fault(data: List[int]) -> Optional[FaultPacket]:
-        """Decode Fault packet - ID 0x61D (Active) or 0x61C (Passive)"""
-        # Check for "No Fault Detected" (all bytes from D1 to D7 are 0xFF)
-        if all(b == 0xFF for b in data[1:8]):
-            return None
-        
-        frame_type = FrameType((data[0] >> 6) & 0x03)
-        total_errors = data[0] & 0x3F
-        frame_number = (data[1] >> 2) & 0x3F
-        fault_code = data[2]
-        occurrence = (data[3] >> 2) & 0x3F
-        
-        level_bits = data[3] & 0x03
-        if level_bits == 0x01:
-            failure_level = FailureLevel.WARNING
-        elif level_bits == 0x02:
-            failure_level = FailureLevel.SOFT
-        elif level_bits == 0x03:
-            failure_level = FailureLevel.HARD
-        else:
-            failure_level = FailureLevel.WARNING
-        
-        first_time_h = (data[4] << 8) | data[5]
-        last_time_h = (data[6] << 8) | data[7]
-        
-        return FaultPacket(
-            frame_type, total_errors, frame_number, fault_code,
-            occurrence, failure_level, first_time_h, last_time_h
-        )
-    
-    @staticmethod
-    def decode_software(data: List[int]) -> SoftwarePacket:
-        """Decode Software Version packet - ID 0x61E"""
-        version = ''.join(chr(b) for b in data[:8])
-        return SoftwarePacket(version)
-    
-    @staticmethod
-    def decode_serial_number(data: List[int]) -> SerialNumberPacket:
-        """Decode Serial Number packet - ID 0x61F"""
-        serial = ''.join(chr(b) for b in data[:8])
-        return SerialNumberPacket(serial)
-    
-    # ========================================================================
-    # LEVEL 3 - Decoders
-    # ========================================================================
-    
-    @staticmethod
-    def decode_act3(data: List[int]) -> Act3Packet:
-        """Decode ACT3 packet - ID 0x712"""
-        fan_voltage_V = ((data[0] << 8) | data[1]) * 0.1
-        iacm1_A = ((data[2] << 8) | data[3]) * 0.1
-        iacm2_A = ((data[4] << 8) | data[5]) * 0.1
-        iacm3_A = ((data[6] << 8) | data[7]) * 0.1
-        
-        return Act3Packet(fan_voltage_V, iacm1_A, iacm2_A, iacm3_A)
-    
-    @staticmethod
-    def decode_temp(data: List[int]) -> TempPacket:
-        """Decode TEMP packet - ID 0x713"""
-        loghv_raw = (data[0] << 8) | data[1]
-        power1_raw = (data[2] << 8) | data[3]
-        power2_raw = (data[4] << 8) | data[5]
-        power3_raw = (data[6] << 8) | data[7]
-        
-        return TempPacket(
-            temp_loghv_C=(loghv_raw * 0.005188) - 40.0,
-            temp_power1_C=(power1_raw * 0.005188) - 40.0,
-            temp_power2_C=(power2_raw * 0.005188) - 40.0,
-            temp_power3_C=(power3_raw * 0.005188) - 40.0
-        )
-    
-    @staticmethod
-    def decode_stst1(data: List[int]) -> Stst1Packet:
-        """Decode STST1 packet - ID 0x715"""
-        return Stst1Packet(
-            pfc_enable=bool(data[0] & (1 << 2)),
-            log_temp_high=bool(data[1] & (1 << 5)),
-            log_temp_low=bool(data[1] & (1 << 4)),
-            uvlo_log=bool(data[1] & (1 << 3)),
-            ther_low_fail=bool(data[1] & (1 << 2)),
-            rx618_fail=bool(data[1] & (1 << 0)),
-            bulk1_fail=bool(data[2] & (1 << 7)),
-            bulk2_fail=bool(data[2] & (1 << 6)),
-            bulk3_fail=bool(data[2] & (1 << 5)),
-            cooling_fail1=bool(data[2] & (1 << 4)),
-            cooling_fail2=bool(data[2] & (1 << 3)),
-            cooling_fail3=bool(data[2] & (1 << 2)),
-            uvlo_log_lv=bool(data[3] & (1 << 3)),
-            bat_over=bool(data[3] & (1 << 1)),
-            bat_under=bool(data[3] & (1 << 0))
-        )
-    
-    @staticmethod
-    def decode_act4(data: List[int]) -> Act4Packet:
-        """Decode ACT4 packet - ID 0x714"""
-        temp_raw = (data[0] << 8) | data[1]
-        iout1_raw = (data[2] << 8) | data[3]
-        iout2_raw = (data[4] << 8) | data[5]
-        iout3_raw = (data[6] << 8) | data[7]
-        
-        return Act4Packet(
-            temp_logfan_C=(temp_raw * 0.005188) - 40.0,
-            iout1_raw=iout1_raw,
-            iout2_raw=iout2_raw,
-            iout3_raw=iout3_raw
-        )
-    
-    # ========================================================================
-    # LEVEL 4 - Decoders
+    # Decoders (generated from SIGNAL_DB)
     # ========================================================================
-    
-    @staticmethod
-    def decode_tst2(data: List[int]) -> Tst2Packet:
-        """Decode TST2 packet - ID 0x616"""
-        baudrate = BaudrateType((data[0] >> 6) & 0x03)
-        id_type = IdType((data[0] >> 5) & 0x01)
-        iac_control = IacControlType((data[0] >> 2) & 0x03)
-        range_val = RangeType(data[0] & 0x03)
-        three_phase = bool(data[0] & (1 << 0))
-        
-        slave = bool(data[1] & (1 << 7))
-        evc_model = EVCModelType((data[1] >> 6) & 0x01)
-        id_setting = IDSettingType((data[1] >> 2) & 0x0F)
-        parallel_ctrl = bool(data[1] & (1 << 1))
-        air_cooler = bool(data[1] & (1 << 0))
-        
-        iacm_max_set_A = data[2] * 0.2
-        vout_max_set_V = ((data[3] << 8) | data[4]) * 0.1
-        iout_max_set_A = ((data[5] << 8) | data[6]) * 0.1
-        password = data[7]
-        
-        return Tst2Packet(
-            baudrate, id_type, iac_control, range_val, three_phase,
-            slave, evc_model, id_setting, air_cooler, parallel_ctrl,
-            iacm_max_set_A, vout_max_set_V, iout_max_set_A, password
-        )
-    
+
+    decode_ctl = staticmethod(_DECODERS[CAN_ID_CTL])
+    decode_stat = staticmethod(_DECODERS[CAN_ID_STAT])
+    decode_act1 = staticmethod(_DECODERS[CAN_ID_ACT1])
+    decode_act2 = staticmethod(_DECODERS[CAN_ID_ACT2])
+    decode_tst1 = staticmethod(_DECODERS[CAN_ID_TST1])
+    decode_req = staticmethod(_DECODERS[CAN_ID_REQ])
+    decode_fault = staticmethod(_DECODERS[CAN_ID_FLTA])     # same layout for FLTA/FLTP
+    decode_software = staticmethod(_DECODERS[CAN_ID_SW])
+    decode_serial_number = staticmethod(_DECODERS[CAN_ID_SN])
+    decode_act3 = staticmethod(_DECODERS[CAN_ID_ACT3])
+    decode_temp = staticmethod(_DECODERS[CAN_ID_TEMP])
+    decode_stst1 = staticmethod(_DECODERS[CAN_ID_STST1])
+    decode_act4 = staticmethod(_DECODERS[CAN_ID_ACT4])
+    decode_tst2 = staticmethod(_DECODERS[CAN_ID_TST2])
+
     # ========================================================================
     # Main Decode Function
     # ========================================================================
-    
-    @classmethod
-    def decode_message(cls, can_id: int, data: List[int]):
-        """Decode CAN message based on ID"""
-        decoders = {
-            cls.CAN_ID_CTL: cls.decode_ctl,
-            cls.CAN_ID_STAT: cls.decode_stat,
-            cls.CAN_ID_ACT1: cls.decode_act1,
-            cls.CAN_ID_ACT2: cls.decode_act2,
-            cls.CAN_ID_TST1: cls.decode_tst1,
-            cls.CAN_ID_REQ: cls.decode_req,
-            cls.CAN_ID_FLTP: cls.decode_fault,
-            cls.CAN_ID_FLTA: cls.decode_fault,
-            cls.CAN_ID_SW: cls.decode_software,
-            cls.CAN_ID_SN: cls.decode_serial_number,
-            cls.CAN_ID_TST2: cls.decode_tst2,
-            cls.CAN_ID_ACT3: cls.decode_act3,
-            cls.CAN_ID_TEMP: cls.decode_temp,
-            cls.CAN_ID_ACT4: cls.decode_act4,
-            cls.CAN_ID_STST1: cls.decode_stst1,
-        }
-        
-        decoder = decoders.get(can_id)
+
+    @staticmethod
+    def decode_message(can_id: int, data: List[int]):
+        """Decode CAN message based on ID (one lookup + one struct unpack)"""
+        decoder = _DECODERS.get(can_id)
         if decoder:
             return decoder(data)
         return None
-    
+
     @classmethod
     def get_message_name(cls, can_id: int) -> str:
         """Get message name from CAN ID"""
-        names = {
-            cls.CAN_ID_CTL: "CTL (Control)",
-            cls.CAN_ID_STAT: "STAT (Status)",
-            cls.CAN_ID_ACT1: "ACT1 (Actual Values 1)",
-            cls.CAN_ID_ACT2: "ACT2 (Actual Values 2)",
-            cls.CAN_ID_TST1: "TST1 (Test/Diagnostic)",
-            cls.CAN_ID_REQ: "REQ (Request)",
-            cls.CAN_ID_FLTP: "FLTP (Fault Passive)",
-            cls.CAN_ID_FLTA: "FLTA (Fault Active)",
-            cls.CAN_ID_SW: "SW (Software Version)",
-            cls.CAN_ID_SN: "SN (Serial Number)",
-            cls.CAN_ID_TST2: "TST2 (Configuration)",
-            cls.CAN_ID_ACT3: "ACT3 (AC Currents)",
-            cls.CAN_ID_TEMP: "TEMP (Temperatures)",
-            cls.CAN_ID_ACT4: "ACT4 (Temperature FAN)",
-            cls.CAN_ID_STST1: "STST1 (Real Time Diagnostic)",
+        return SIGNAL_DB.message_name(can_id) or f"Unknown (0x{can_id:03X})"
+
+
+# ============================================================================
+# DECODE CACHE
+# ============================================================================
+
+class DecodeCache:
+    """
+    Bounded LRU of decoded packets keyed by (can_id, payload bytes).
+
+    Status frames (STAT, TST1, STST1, TST2, SW/SN, CTL echo) repeat byte for
+    byte for long stretches: a hit returns the same frozen packet instead of
+    decoding again. Measurements (ACT1, TEMP, ...) change every frame and are
+    decoded directly, so they do not evict the status frames.
+    """
+
+    CACHED_IDS = frozenset({
+        CANDecoder.CAN_ID_CTL, CANDecoder.CAN_ID_STAT, CANDecoder.CAN_ID_TST1,
+        CANDecoder.CAN_ID_REQ, CANDecoder.CAN_ID_SW, CANDecoder.CAN_ID_SN,
+        CANDecoder.CAN_ID_STST1, CANDecoder.CAN_ID_TST2,
+        CANDecoder.CAN_ID_FLTA, CANDecoder.CAN_ID_FLTP,
+    })
+
+    def __init__(self, maxsize: int = 256, cached_ids: Optional[Iterable[int]] = None):
+        self.maxsize = maxsize
+        self.cached_ids: FrozenSet[int] = frozenset(cached_ids) if cached_ids is not None else self.CACHED_IDS
+        self._decode = lru_cache(maxsize=maxsize)(CANDecoder.decode_message)
+        self.uncached = 0
+
+    def decode(self, can_id: int, data):
+        """Same result as CANDecoder.decode_message (errors are not cached)"""
+        if can_id not in self.cached_ids:
+            self.uncached += 1
+            return CANDecoder.decode_message(can_id, data)
+        if type(data) is not bytes:
+            data = bytes(data)
+        return self._decode(can_id, data)
+
+    def clear(self):
+        self._decode.cache_clear()
+        self.uncached = 0
+
+    def get_statistics(self) -> dict:
+        info = self._decode.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            'cache_hits': info.hits,
+            'cache_misses': info.misses,
+            'cache_hit_rate': round(info.hits / lookups, 3) if lookups else 0.0,
+            'cache_size': info.currsize,
+            'cache_uncached': self.uncached,
         }
-        return names.get(can_id, f"Unknown (0x{can_id:03X})")
@@ -0,0 +1,133 @@
+from typing import List
+
+from .can_decoder import (
+    CANDecoder, SIGNAL_DB, CtlPacket, StatPacket, Act1Packet, Act2Packet, Tst1Packet,
+    ReqPacket, FaultPacket, FrameType, SoftwarePacket,
+    SerialNumberPacket, Act3Packet, TempPacket, Stst1Packet, Act4Packet,
+    Tst2Packet, RequestType,
+)
+
+
+class CANEncoder:
+    """Encoder per i messaggi CAN LIVELLI: 1, 2, 3, 4 (inverso di CANDecoder)"""
+
+    # ========================================================================
+    # LEVEL 1 - Encoders
+    # ========================================================================
+
+    @staticmethod
+    def encode_ctl(ctl: CtlPacket) -> bytes:
+        """Encode CTL packet - ID 0x618 (BMS → Charger), as CanBus_CreatePacket_Ctl"""
+        return SIGNAL_DB.encode(CANDecoder.CAN_ID_CTL, ctl)
+
+    @staticmethod
+    def encode_stat(stat: StatPacket) -> bytes:
+        """Encode STAT packet - ID 0x610 (4 byte)"""
+        return SIGNAL_DB.encode(CANDecoder.CAN_ID_STAT, stat)
+
+    @staticmethod
+    def encode_act1(act1: Act1Packet) -> bytes:
+        """Encode ACT1 packet - ID 0x611"""
+        return SIGNAL_DB.encode(CANDecoder.CAN_ID_ACT1, act1)
+
+    @staticmethod
+    def encode_act2(act2: Act2Packet) -> bytes:
+        """Encode ACT2 packet - ID 0x614"""
+        return SIGNAL_DB.encode(CANDecoder.CAN_ID_ACT2, act2)
+
+    @staticmethod
+    def encode_tst1(tst: Tst1Packet) -> bytes:
+        """Encode TST1 packet - ID 0x615"""
+        return SIGNAL_DB.encode(CANDecoder.CAN_ID_TST1, tst)
+
+    # ========================================================================
+    # LEVEL 2 - Encoders
+    # ========================================================================
+
+    @staticmethod
+    def encode_req(req: ReqPacket) -> bytes:
+        """Encode REQ packet - ID 0x61B (4 byte), as CanBus_CreatePacket_Req"""
+        return SIGNAL_DB.encode(CANDecoder.CAN_ID_REQ, req)
+
+    @staticmethod
+    def encode_request(request_type: RequestType, enable: bool = True) -> bytes:
+        """REQ for a RequestType (ID richiesto 0x06xx)"""
+        return CANEncoder.encode_req(ReqPacket(enable, 0x0600 | request_type.value))
+
+    @staticmethod
+    def encode_fault(fault: FaultPacket) -> bytes:
+        """Encode Fault packet - ID 0x61D (Active) or 0x61C (Passive)"""
+        return SIGNAL_DB.encode(CANDecoder.CAN_ID_FLTA, fault)
+
+    @staticmethod
+    def encode_no_fault() -> bytes:
+        """Particular frame "No fault detected" (D1-D7 = 0xFF)"""
+        return bytes([0x00] + [0xFF] * 7)
+
+    @staticmethod
+    def encode_faults(faults: List[FaultPacket]) -> List[bytes]:
+        """
+        One frame per fault, numbered from 1 (multi frame if more than one).
+        frame_type, total_errors and frame_number are filled in here.
+        """
+        if not faults:
+            return [CANEncoder.encode_no_fault()]
+        frame_type = FrameType.SINGLE if len(faults) == 1 else FrameType.MULTI
+        frames = []
+        for number, fault in enumerate(faults, start=1):
+            frames.append(CANEncoder.encode_fault(FaultPacket(
+                frame_type, len(faults), number, fault.fault_code, fault.occurrence,
+                fault.failure_level, fault.first_time_h, fault.last_time_h)))
+        return frames
+
+    @staticmethod
+    def encode_software(sw: SoftwarePacket) -> bytes:
+        """Encode Software Version packet - ID 0x61E (8 ASCII)"""
+        return SIGNAL_DB.encode(CANDecoder.CAN_ID_SW, sw)
+
+    @staticmethod
+    def encode_serial_number(sn: SerialNumberPacket) -> bytes:
+        """Encode Serial Number packet - ID 0x61F (8 ASCII)"""
+        return SIGNAL_DB.encode(CANDecoder.CAN_ID_SN, sn)
+
+    # ========================================================================
+    # LEVEL 3 - Encoders
+    # ========================================================================
+
+    @staticmethod
+    def encode_act3(act3: Act3Packet) -> bytes:
+        """Encode ACT3 packet - ID 0x712"""
+        return SIGNAL_DB.encode(CANDecoder.CAN_ID_ACT3, act3)
+
+    @staticmethod
+    def encode_temp(temp: TempPacket) -> bytes:
+        """Encode TEMP packet - ID 0x713"""
+        return SIGNAL_DB.encode(CANDecoder.CAN_ID_TEMP, temp)
+
+    @staticmethod
+    def encode_stst1(stst: Stst1Packet) -> bytes:
+        """Encode STST1 packet - ID 0x715 (4 byte)"""
+        return SIGNAL_DB.encode(CANDecoder.CAN_ID_STST1, stst)
+
+    @staticmethod
+    def encode_act4(act4: Act4Packet) -> bytes:
+        """Encode ACT4 packet - ID 0x714"""
+        return SIGNAL_DB.encode(CANDecoder.CAN_ID_ACT4, act4)
+
+    # ========================================================================
+    # LEVEL 4 - Encoders
+    # ========================================================================
+
+    @staticmethod
+    def encode_tst2(tst2: Tst2Packet) -> bytes:
+        """Encode TST2 packet - ID 0x616"""
+        return SIGNAL_DB.encode(CANDecoder.CAN_ID_TST2, tst2)
+
+    # ========================================================================
+    # Main Encode Function
+    # ========================================================================
+
+    @staticmethod
+    def encode_message(can_id: int, packet) -> bytes:
+        """Encode a packet dataclass for the given CAN ID (ValueError if unknown)"""
+        return SIGNAL_DB.encode(can_id, packet)
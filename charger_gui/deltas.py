@@ -0,0 +1,97 @@
+"""
+Bitfield delta stage for the flag messages (STAT, TST1, STST1).
+
+Each flag payload is XORed against the last one seen for that ID: only the
+flags that changed come out, as FlagChange(signal, old, new, timestamp)
+events. The first frame of an ID reports every flag with old=None.
+
+    tracker = FlagDeltaTracker()
+    for change in tracker.update(CANDecoder.CAN_ID_TST1, data, t) or ():
+        print(change.signal, change.old, '->', change.new)
+
+Flag positions come from SIGNAL_DB (Flag / Flags signals), so the names are
+the packet accessor names.
+"""
+
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from .can_decoder import CANDecoder, SIGNAL_DB
+from .signal_db import SignalDatabase
+
+
+class FlagChange(NamedTuple):
+    signal: str
+    old: Optional[bool]     # None = first frame with this ID
+    new: bool
+    timestamp: float
+
+
+Changes = Tuple[FlagChange, ...]
+
+# Messages made (mostly) of flag bytes
+FLAG_IDS = (CANDecoder.CAN_ID_STAT, CANDecoder.CAN_ID_TST1, CANDecoder.CAN_ID_STST1)
+
+
+class FlagDeltaTracker:
+    """Last flag payload per CAN ID -> changed flags only"""
+
+    def __init__(self, can_ids: Iterable[int] = FLAG_IDS, db: SignalDatabase = SIGNAL_DB):
+        # can_id -> (bytes compared, {single-bit mask: flag name}, all flag bits)
+        self._tables: Dict[int, Tuple[int, Dict[int, str], int]] = {}
+        for can_id in can_ids:
+            self._tables[can_id] = self._flag_table(db, can_id)
+        self._last: Dict[int, int] = {}
+        self.changes = 0
+
+    @staticmethod
+    def _flag_table(db: SignalDatabase, can_id: int) -> Tuple[int, Dict[int, str], int]:
+        message = db.messages[can_id]
+        positions = []
+        for signal in message.signals:
+            if signal.is_flag:
+                positions.append((signal.name, signal.byte, signal.bit))
+            for flag, bit in signal.flags:
+                positions.append((flag, signal.byte, bit))
+        if not positions:
+            raise ValueError(f"{message.name}: nessun flag da tracciare")
+
+        size = max(byte for _, byte, _ in positions) + 1
+        bits = {1 << ((size - 1 - byte) * 8 + bit): name for name, byte, bit in positions}
+        return size, bits, sum(bits)
+
+    def update(self, can_id: int, data: bytes, timestamp: float = 0.0) -> Optional[Changes]:
+        """Changed flags of this payload (empty if none), None for untracked IDs or short payloads"""
+        table = self._tables.get(can_id)
+        if table is None:
+            return None
+        size, bits, relevant = table
+        if len(data) < size:
+            return None     # truncated: the decoder rejects it anyway
+
+        value = int.from_bytes(data[:size], 'big')
+        last = self._last.get(can_id)
+        self._last[can_id] = value
+        if last is None:
+            changes = tuple(FlagChange(name, None, bool(value & mask), timestamp)
+                            for mask, name in bits.items())
+            self.changes += len(changes)
+            return changes
+
+        diff = (value ^ last) & relevant
+        if not diff:
+            return ()
+        changes = []
+        while diff:
+            mask = diff & -diff     # lowest changed bit
+            diff ^= mask
+            new = bool(value & mask)
+            changes.append(FlagChange(bits[mask], not new, new, timestamp))
+        self.changes += len(changes)
+        return tuple(changes)
+
+    def tracks(self, can_id: int) -> bool:
+        return can_id in self._tables
+
+    def reset(self):
+        """Forget the last payloads: the next frame of every ID reports all its flags"""
+        self._last.clear()
@@ -0,0 +1,353 @@
+"""
+Level 2 diagnostic requests: REQ (0x61B) out, FLTP/FLTA/SW/SN (0x61C-0x61F) back.
+
+Every RequestType has its own response ID, so the requests are pipelined:
+all of them can be on the bus at the same time and each response frame is
+matched to its request by CAN ID. A full sweep (passive and active faults,
+software version, serial number) costs one round-trip instead of four.
+
+    requester = DiagnosticRequester(engine.write_frame)
+    requester.attach(engine)        # responses come from the ingest pipeline
+    requester.start()               # timeouts and retries
+    futures = requester.sweep()
+    print(futures[RequestType.SOFTWARE].result(2.0).version)
+
+Results (concurrent.futures.Future): FaultSet for the fault requests,
+SoftwarePacket / SerialNumberPacket for SW / SN. A request with no
+response within `timeout` seconds is sent again up to `retries` times,
+then its future fails with TimeoutError. For fault answers the timeout
+restarts at every frame (one frame every 100 ms); an incomplete set is
+requested again and, with no retries left, returned with complete=False.
+Asking for something already queued or in flight returns the same future.
+"""
+
+import argparse
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .can_decoder import CANDecoder, RequestType
+from .can_encoder import CANEncoder
+from .faults import FaultSet
+from .scheduler import FrameSender
+
+
+REQUEST_TIMEOUT = 0.5   # s without a response frame
+REQUEST_RETRIES = 2
+
+SWEEP = (RequestType.FAULT_INACTIVE, RequestType.FAULT_ACTIVE,
+         RequestType.SOFTWARE, RequestType.SERIAL_NUMBER)
+
+# response CAN ID -> RequestType (0x61C..0x61F = 0x0600 | RequestType)
+RESPONSE_IDS = {0x0600 | request_type.value: request_type for request_type in RequestType}
+_FAULT_REQUESTS = (RequestType.FAULT_INACTIVE, RequestType.FAULT_ACTIVE)
+
+RequestCallback = Callable[[Future], None]
+
+
+class _InFlight:
+    """A sent request waiting for its response"""
+
+    __slots__ = ('future', 'attempts', 'sent_time', 'deadline')
+
+    def __init__(self, future: Future):
+        self.future = future
+        self.attempts = 0
+        self.sent_time = 0.0
+        self.deadline = 0.0
+
+
+class DiagnosticRequester:
+    """Queues REQ frames, pipelines them and resolves futures from the responses"""
+
+    def __init__(self, send: FrameSender, timeout: float = REQUEST_TIMEOUT,
+                 retries: int = REQUEST_RETRIES, max_in_flight: int = len(RequestType),
+                 clock: Callable[[], float] = time.monotonic):
+        self.send = send
+        self.timeout = timeout
+        self.retries = retries
+        self.max_in_flight = max_in_flight
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._queue: deque = deque()                        # RequestType waiting for a slot
+        self._queued: Dict[RequestType, Future] = {}
+        self._in_flight: Dict[RequestType, _InFlight] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        self.requests_sent = 0
+        self.requests_retried = 0
+        self.requests_completed = 0
+        self.requests_failed = 0
+        self.responses_unsolicited = 0
+        self.round_trips = 0        # times the bus went from idle to busy
+        self.send_errors = 0
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+    def request(self, request_type: RequestType, callback: Optional[RequestCallback] = None) -> Future:
+        """Queue one request; the future resolves with the decoded answer"""
+        with self._lock:
+            future = self._enqueue(request_type)
+            frames = self._dispatch()
+        if callback is not None:
+            future.add_done_callback(callback)
+        self._send_all(frames)
+        return future
+
+    def sweep(self, request_types: Iterable[RequestType] = SWEEP,
+              callback: Optional[RequestCallback] = None) -> Dict[RequestType, Future]:
+        """Several requests at once (default: faults, SW, SN) - one round-trip when they all fit in flight"""
+        with self._lock:
+            futures = {request_type: self._enqueue(request_type) for request_type in request_types}
+            frames = self._dispatch()
+        if callback is not None:
+            for future in futures.values():
+                future.add_done_callback(callback)
+        self._send_all(frames)
+        return futures
+
+    def _enqueue(self, request_type: RequestType) -> Future:
+        if request_type in self._in_flight:
+            return self._in_flight[request_type].future
+        future = self._queued.get(request_type)
+        if future is None:
+            future = self._queued[request_type] = Future()
+            future.request_type = request_type
+            self._queue.append(request_type)
+        return future
+
+    def _dispatch(self) -> List[bytes]:
+        """Move queued requests into free slots; return the REQ payloads to send (lock held)"""
+        frames = []
+        now = self.clock()
+        if self._queue and not self._in_flight:
+            self.round_trips += 1
+        while self._queue and len(self._in_flight) < self.max_in_flight:
+            request_type = self._queue.popleft()
+            entry = self._in_flight[request_type] = _InFlight(self._queued.pop(request_type))
+            frames.append(self._arm(request_type, entry, now))
+        if frames:
+            self._wakeup.notify()
+        return frames
+
+    def _arm(self, request_type: RequestType, entry: _InFlight, now: float) -> bytes:
+        entry.attempts += 1
+        entry.sent_time = now
+        entry.deadline = now + self.timeout
+        self.requests_sent += 1
+        return CANEncoder.encode_request(request_type)
+
+    def _send_all(self, frames: List[bytes]):
+        """Write outside the lock: the responses may arrive while we are still sending"""
+        for payload in frames:
+            try:
+                if self.send(CANDecoder.CAN_ID_REQ, payload) is False:
+                    self.send_errors += 1   # TX queue full: the timeout retries
+            except OSError:     # serial.SerialException included: the timeout retries
+                self.send_errors += 1
+
+    # ------------------------------------------------------------------
+    # Responses (ingest thread)
+    # ------------------------------------------------------------------
+    def attach(self, engine):
+        """Take the responses from an IngestEngine (needs decode=True)"""
+        engine.subscribe(self.on_batch)
+        engine.subscribe_faults(self.on_fault_set)
+
+    def detach(self, engine):
+        engine.unsubscribe(self.on_batch)
+        engine.unsubscribe_faults(self.on_fault_set)
+
+    def on_batch(self, batch: list):
+        """Batch subscriber: SW/SN resolve their request, fault frames extend its deadline"""
+        finished = []
+        with self._lock:
+            if not self._in_flight:
+                return
+            for msg in batch:
+                request_type = RESPONSE_IDS.get(msg.can_id)
+                if request_type is None or msg.direction.upper() == 'TX':
+                    continue
+                entry = self._in_flight.get(request_type)
+                if entry is None:
+                    self.responses_unsolicited += 1
+                elif request_type in _FAULT_REQUESTS:
+                    entry.deadline = self.clock() + self.timeout
+                else:
+                    packet = msg.decode()
+                    if packet is not None:
+                        finished.append(self._complete(request_type, packet))
+            frames = self._dispatch() if finished else []
+        self._resolve(finished)
+        self._send_all(frames)
+
+    def on_fault_set(self, fault_set: FaultSet):
+        """Fault subscriber: a complete set resolves its request, an incomplete one is asked again"""
+        request_type = RESPONSE_IDS[fault_set.can_id]
+        finished = []
+        with self._lock:
+            entry = self._in_flight.get(request_type)
+            if entry is None:
+                self.responses_unsolicited += 1
+                return
+            if fault_set.complete or entry.attempts > self.retries:
+                finished.append(self._complete(request_type, fault_set))
+                frames = self._dispatch()
+            else:
+                self.requests_retried += 1
+                frames = [self._arm(request_type, entry, self.clock())]
+        self._resolve(finished)
+        self._send_all(frames)
+
+    def _complete(self, request_type: RequestType, result) -> Tuple[Future, object, Optional[Exception]]:
+        entry = self._in_flight.pop(request_type)
+        self.requests_completed += 1
+        return entry.future, result, None
+
+    @staticmethod
+    def _resolve(finished: list):
+        """Set the results outside the lock (done callbacks may submit new requests)"""
+        for future, result, error in finished:
+            if future.done():
+                continue    # cancelled by the caller
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    # ------------------------------------------------------------------
+    # Timeouts
+    # ------------------------------------------------------------------
+    def expire(self, now: Optional[float] = None) -> float:
+        """Retry or fail the requests past their deadline; return the next deadline (inf if none)"""
+        if now is None:
+            now = self.clock()
+        finished, frames = [], []
+        with self._lock:
+            for request_type, entry in list(self._in_flight.items()):
+                if entry.future.cancelled():
+                    del self._in_flight[request_type]
+                elif now >= entry.deadline:
+                    if entry.attempts <= self.retries:
+                        self.requests_retried += 1
+                        frames.append(self._arm(request_type, entry, now))
+                    else:
+                        del self._in_flight[request_type]
+                        self.requests_failed += 1
+                        finished.append((entry.future, None, TimeoutError(
+                            f"Nessuna risposta a {request_type.name} dopo {entry.attempts} tentativi")))
+            frames += self._dispatch()
+            next_deadline = min((entry.deadline for entry in self._in_flight.values()),
+                                default=float('inf'))
+        self._resolve(finished)
+        self._send_all(frames)
+        return next_deadline
+
+    def start(self):
+        """Timeout thread (sleeps until the nearest deadline)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="diagnostic-requests", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        """Stop the timeout thread and cancel what is still pending"""
+        with self._lock:
+            self._running = False
+            self._wakeup.notify()
+            pending = [entry.future for entry in self._in_flight.values()] + list(self._queued.values())
+            self._in_flight.clear()
+            self._queued.clear()
+            self._queue.clear()
+        for future in pending:
+            future.cancel()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        next_deadline = float('inf')
+        while True:
+            with self._lock:
+                if not self._running:
+                    break
+                delay = next_deadline - self.clock()
+                if delay > 0:
+                    # woken early by _dispatch() when a new request goes out
+                    self._wakeup.wait(None if delay == float('inf') else delay)
+                if not self._running:
+                    break
+            next_deadline = self.expire()
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._in_flight) + len(self._queue)
+
+    def get_statistics(self) -> dict:
+        return {
+            'req_sent': self.requests_sent,
+            'req_retried': self.requests_retried,
+            'req_completed': self.requests_completed,
+            'req_failed': self.requests_failed,
+            'req_round_trips': self.round_trips,
+            'req_unsolicited_responses': self.responses_unsolicited,
+            'req_send_errors': self.send_errors,
+            'req_pending': self.pending,
+        }
+
+
+def describe(result) -> str:
+    """One line for a request result"""
+    if isinstance(result, FaultSet):
+        state = "" if result.complete else f" (incompleto, mancano {list(result.missing)})"
+        codes = ", ".join(f"0x{fault.fault_code:02X}" for fault in result.faults) or "nessun fault"
+        return f"{len(result.faults)} fault: {codes}{state}"
+    return str(getattr(result, 'version', None) or getattr(result, 'serial', None) or result)
+
+
+def main():
+    from .ingest import IngestEngine
+
+    parser = argparse.ArgumentParser(description="Level 2 diagnostic sweep (faults, SW, SN) via REQ 0x61B")
+    parser.add_argument('--port', required=True)
+    parser.add_argument('--baudrate', type=int, default=115200)
+    parser.add_argument('--timeout', type=float, default=REQUEST_TIMEOUT)
+    parser.add_argument('--retries', type=int, default=REQUEST_RETRIES)
+    args = parser.parse_args()
+
+    engine = IngestEngine()
+    engine.open(args.port, args.baudrate)
+    requester = DiagnosticRequester(engine.write_frame, args.timeout, args.retries)
+    requester.attach(engine)
+    reader = threading.Thread(target=engine.run, daemon=True)
+    reader.start()
+    requester.start()
+    t0 = time.monotonic()
+    try:
+        for request_type, future in requester.sweep().items():
+            try:
+                result = describe(future.result())
+            except TimeoutError as e:
+                result = f"ERRORE: {e}"
+            print(f"{request_type.name:<15} {result}")
+    finally:
+        print(f"{time.monotonic() - t0:.3f} s, {requester.get_statistics()}")
+        requester.stop()
+        engine.stop()
+        reader.join(1.0)
+        engine.close()
+
+
+if __name__ == '__main__':
+    main()
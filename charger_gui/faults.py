@@ -0,0 +1,153 @@
+"""
+Multi-frame fault reassembly for FLTA (active) and FLTP (passive).
+
+The charger answers a fault request with frames 1..total_errors (MULTI),
+one SINGLE frame, or the "no fault" frame (D1-D7 = 0xFF). FaultAssembler
+collects them per channel and publishes one FaultSet when the set is
+complete, so the UI replaces its list once instead of growing it frame by
+frame. Every frame costs O(1): a slot per frame number and a counter.
+
+    assembler = FaultAssembler()
+    fault_set = assembler.feed(msg.can_id, msg.data, msg.decode(), msg.timestamp)
+    if fault_set is not None:
+        show(fault_set.faults)
+
+A set whose frames stop arriving for `timeout` seconds is published by
+expire() with complete=False and the missing frame numbers. Duplicated
+frames are ignored; a different frame in a filled slot, or a new
+total_errors, restarts the collection.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .can_decoder import CANDecoder, FaultPacket, FrameType, PACKET, SIGNAL_DB
+
+
+FAULT_IDS = (CANDecoder.CAN_ID_FLTA, CANDecoder.CAN_ID_FLTP)
+
+FAULT_SET_TIMEOUT = 0.5     # s without frames before an incomplete set is given up (frames every 100 ms)
+
+
+@dataclass(**PACKET)
+class FaultSet:
+    """Faults reported by one channel in one answer, in frame order"""
+    can_id: int
+    faults: Tuple[FaultPacket, ...]
+    timestamp: float
+    complete: bool = True
+    missing: Tuple[int, ...] = ()   # frame numbers never received (complete=False)
+
+    @property
+    def is_active(self) -> bool:
+        return self.can_id == CANDecoder.CAN_ID_FLTA
+
+
+class _PendingSet:
+    """Frames of a MULTI set being collected"""
+
+    __slots__ = ('total', 'frames', 'received', 'last_time')
+
+    def __init__(self, total: int, timestamp: float):
+        self.total = total
+        self.frames: List[Optional[FaultPacket]] = [None] * total
+        self.received = 0
+        self.last_time = timestamp
+
+
+class FaultAssembler:
+    """FLTA/FLTP frames -> complete FaultSet per channel"""
+
+    def __init__(self, timeout: float = FAULT_SET_TIMEOUT):
+        self.timeout = timeout
+        self._pending: Dict[int, _PendingSet] = {}
+        self._empty = {can_id: SIGNAL_DB.messages[can_id].empty for can_id in FAULT_IDS}
+
+        self.sets_published = 0
+        self.sets_incomplete = 0
+        self.sets_restarted = 0
+        self.frames_duplicate = 0
+        self.frames_invalid = 0
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._pending)
+
+    def _is_no_fault(self, can_id: int, data: bytes) -> bool:
+        start, fill = self._empty[can_id]
+        tail = data[start:]
+        return len(tail) > 0 and tail.count(fill) == len(tail)
+
+    def _publish(self, fault_set: FaultSet) -> FaultSet:
+        self.sets_published += 1
+        if not fault_set.complete:
+            self.sets_incomplete += 1
+        return fault_set
+
+    def feed(self, can_id: int, data: bytes, packet: Optional[FaultPacket],
+             timestamp: float = 0.0) -> Optional[FaultSet]:
+        """One fault frame (packet = decoded frame, None if not decodable). Return the completed set, if any"""
+        if packet is None:
+            if self._is_no_fault(can_id, data):
+                self._pending.pop(can_id, None)
+                return self._publish(FaultSet(can_id, (), timestamp))
+            self.frames_invalid += 1
+            return None
+
+        if packet.frame_type is FrameType.SINGLE:
+            self._pending.pop(can_id, None)
+            return self._publish(FaultSet(can_id, (packet,), timestamp))
+
+        total, number = packet.total_errors, packet.frame_number
+        if not 1 <= number <= total:
+            self.frames_invalid += 1
+            return None
+
+        pending = self._pending.get(can_id)
+        if pending is not None and pending.total != total:
+            self.sets_restarted += 1
+            pending = None
+        if pending is None:
+            pending = self._pending[can_id] = _PendingSet(total, timestamp)
+
+        slot = pending.frames[number - 1]
+        if slot is not None:
+            if slot == packet:
+                self.frames_duplicate += 1
+                pending.last_time = timestamp
+                return None
+            # Same frame number, different content: a new answer has started
+            self.sets_restarted += 1
+            pending = self._pending[can_id] = _PendingSet(total, timestamp)
+
+        pending.frames[number - 1] = packet
+        pending.received += 1
+        pending.last_time = timestamp
+        if pending.received < total:
+            return None
+        del self._pending[can_id]
+        return self._publish(FaultSet(can_id, tuple(pending.frames), timestamp))
+
+    def expire(self, now: float) -> List[FaultSet]:
+        """Publish (complete=False) the sets without frames for more than `timeout`"""
+        expired = []
+        for can_id, pending in list(self._pending.items()):
+            if now - pending.last_time > self.timeout:
+                del self._pending[can_id]
+                missing = tuple(i + 1 for i, frame in enumerate(pending.frames) if frame is None)
+                faults = tuple(frame for frame in pending.frames if frame is not None)
+                expired.append(self._publish(FaultSet(can_id, faults, pending.last_time,
+                                                      complete=False, missing=missing)))
+        return expired
+
+    def reset(self):
+        self._pending.clear()
+
+    def get_statistics(self) -> dict:
+        return {
+            'fault_sets_published': self.sets_published,
+            'fault_sets_incomplete': self.sets_incomplete,
+            'fault_sets_restarted': self.sets_restarted,
+            'fault_frames_duplicate': self.frames_duplicate,
+            'fault_frames_invalid': self.frames_invalid,
+        }
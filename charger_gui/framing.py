@@ -0,0 +1,316 @@
+import binascii
+import struct
+from typing import List, NamedTuple, Optional, Union
+
+
+class LineFramer:
+    """
+    Split the serial byte stream into lines without decoding it to str.
+
+    Incoming chunks are appended to a bytearray; complete lines are located
+    with find() from a moving read offset and returned as bytes slices.
+    Only the trailing partial line is kept between calls, so the cost is
+    linear in the number of received bytes.
+
+    Resync rule: a line longer than max_line_length is treated as garbage
+    (wrong baudrate, binary noise, lost newline). Its bytes are dropped up
+    to and including the next newline, then framing restarts normally.
+    """
+
+    def __init__(self, max_line_length: int = 256):
+        self.max_line_length = max_line_length
+        self._buffer = bytearray()
+        self._discarding = False
+
+        # Statistics
+        self.lines = 0
+        self.overflows = 0
+        self.dropped_bytes = 0
+
+    def reset(self):
+        """Drop any partial line (e.g. on reconnect)"""
+        self._buffer.clear()
+        self._discarding = False
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """Append a chunk and return the complete, non-empty lines found"""
+        buf = self._buffer
+        buf += data
+        lines = []
+        pos = 0
+        max_len = self.max_line_length
+
+        with memoryview(buf) as view:
+            while True:
+                end = buf.find(b'\n', pos)
+                if end < 0:
+                    break
+
+                if self._discarding:
+                    # End of an oversized line: resync on this newline
+                    self.dropped_bytes += end + 1 - pos
+                    self._discarding = False
+                else:
+                    stop = end
+                    if stop > pos and buf[stop - 1] == 0x0D:     # '\r'
+                        stop -= 1
+                    if stop - pos > max_len:
+                        self.overflows += 1
+                        self.dropped_bytes += end + 1 - pos
+                    elif stop > pos:
+                        lines.append(view[pos:stop].tobytes())
+                pos = end + 1
+
+        # Keep only the partial line; enforce the max line length on it
+        pending = len(buf) - pos
+        if self._discarding:
+            self.dropped_bytes += pending
+            pos = len(buf)
+        elif pending > max_len:
+            self.overflows += 1
+            self.dropped_bytes += pending
+            self._discarding = True
+            pos = len(buf)
+
+        if pos:
+            del buf[:pos]
+
+        self.lines += len(lines)
+        return lines
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered bytes waiting for a newline"""
+        return len(self._buffer)
+
+
+# ============================================================================
+# Binary framing (COBS + CRC16)
+# ============================================================================
+#
+# Frame before COBS encoding (big endian, like the CAN payloads):
+#
+#   | Flags | ID MSB | ID LSB | Timestamp (4) | Payload (DLC) | CRC MSB | CRC LSB |
+#
+#   Flags:     bit 7 = direction (1 = Tx, 0 = Rx), bit 3-0 = DLC (0-8)
+#   Timestamp: gateway time in ms (uint32, wraps)
+#   CRC:       CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF) over flags..payload
+#
+# The frame is COBS encoded and terminated by a 0x00 delimiter. An 8-byte CAN
+# frame costs 19 bytes on the wire instead of ~40 for the ASCII line.
+# Reference encoder for the STM32: utils_c_functions/utils_serial_binary_frame.c
+
+BINARY_HEADER = struct.Struct('>BHI')
+BINARY_FLAG_TX = 0x80
+BINARY_MAX_DLC = 8
+BINARY_MIN_LENGTH = BINARY_HEADER.size + 2
+
+
+class BinaryFrame(NamedTuple):
+    """CAN frame received in binary mode"""
+    direction: str          # "Rx" o "Tx"
+    can_id: int
+    data: bytes
+    gateway_time_ms: int
+
+
+def crc16_ccitt(data: bytes) -> int:
+    """CRC-16/CCITT-FALSE (binascii.crc_hqx with init 0xFFFF)"""
+    return binascii.crc_hqx(data, 0xFFFF)
+
+
+def cobs_encode(data: bytes) -> bytes:
+    """Consistent Overhead Byte Stuffing (without the trailing delimiter)"""
+    out = bytearray()
+    for block in bytes(data).split(b'\x00'):
+        while len(block) >= 0xFE:
+            out.append(0xFF)
+            out += block[:0xFE]
+            block = block[0xFE:]
+        out.append(len(block) + 1)
+        out += block
+    return bytes(out)
+
+
+def cobs_decode(data: bytes) -> Optional[bytes]:
+    """Inverse of cobs_encode. Return None on a malformed block"""
+    out = bytearray()
+    i = 0
+    n = len(data)
+    while i < n:
+        code = data[i]
+        if code == 0 or i + code > n:
+            return None
+        out += data[i + 1:i + code]
+        i += code
+        if code != 0xFF and i < n:
+            out.append(0)
+    return bytes(out)
+
+
+def encode_binary_frame(can_id: int, data: bytes, direction: str = "Rx",
+                        gateway_time_ms: int = 0) -> bytes:
+    """Build one delimited binary frame (Python twin of SerialFrame_Encode)"""
+    if len(data) > BINARY_MAX_DLC:
+        raise ValueError(f"DLC {len(data)} > {BINARY_MAX_DLC}")
+    flags = len(data)
+    if direction.upper() == "TX":
+        flags |= BINARY_FLAG_TX
+    raw = BINARY_HEADER.pack(flags, can_id & 0xFFFF, gateway_time_ms & 0xFFFFFFFF) + bytes(data)
+    raw += struct.pack('>H', crc16_ccitt(raw))
+    return cobs_encode(raw) + b'\x00'
+
+
+class BinaryFramer:
+    """
+    Split a COBS stream on 0x00 delimiters and validate each frame.
+
+    Corrupted frames (bad COBS, length or CRC) are dropped and counted;
+    the next delimiter is a natural resync point.
+    """
+
+    def __init__(self, max_frame_length: int = 64):
+        self.max_frame_length = max_frame_length
+        self._buffer = bytearray()
+
+        # Statistics
+        self.frames = 0
+        self.crc_errors = 0
+        self.consecutive_errors = 0
+        self.dropped_bytes = 0
+
+    def reset(self):
+        self._buffer.clear()
+        self.consecutive_errors = 0
+
+    def decode(self, encoded: bytes) -> Optional[BinaryFrame]:
+        """Decode one COBS frame (without delimiter)"""
+        raw = cobs_decode(encoded)
+        if raw is None or len(raw) < BINARY_MIN_LENGTH:
+            return None
+        flags, can_id, gateway_time_ms = BINARY_HEADER.unpack_from(raw)
+        dlc = flags & 0x0F
+        if dlc > BINARY_MAX_DLC or len(raw) != BINARY_MIN_LENGTH + dlc:
+            return None
+        if crc16_ccitt(raw[:-2]) != (raw[-2] << 8) | raw[-1]:
+            return None
+        direction = "Tx" if flags & BINARY_FLAG_TX else "Rx"
+        return BinaryFrame(direction, can_id, raw[BINARY_HEADER.size:-2], gateway_time_ms)
+
+    def feed(self, data: bytes) -> List[BinaryFrame]:
+        buf = self._buffer
+        buf += data
+        frames = []
+        pos = 0
+
+        while True:
+            end = buf.find(b'\x00', pos)
+            if end < 0:
+                break
+            if end > pos:
+                frame = None
+                if end - pos <= self.max_frame_length:
+                    frame = self.decode(bytes(buf[pos:end]))
+                if frame is None:
+                    self.crc_errors += 1
+                    self.consecutive_errors += 1
+                    self.dropped_bytes += end - pos
+                else:
+                    self.consecutive_errors = 0
+                    frames.append(frame)
+            pos = end + 1
+
+        if len(buf) - pos > self.max_frame_length:
+            # No delimiter for too long: drop and wait for the next one
+            self.consecutive_errors += 1
+            self.dropped_bytes += len(buf) - pos
+            pos = len(buf)
+        if pos:
+            del buf[:pos]
+
+        self.frames += len(frames)
+        return frames
+
+
+class StreamFramer:
+    """
+    Framer with automatic ASCII/binary mode detection.
+
+    The ASCII gateway never sends 0x00, while every binary frame ends with
+    one: the first NUL byte selects binary mode, a newline without NUL
+    selects ASCII mode. In binary mode a run of invalid frames on a stream
+    without NUL bytes switches back to ASCII (gateway reflashed/rebooted).
+    feed() returns bytes lines (ASCII) and BinaryFrame items (binary).
+    """
+
+    ASCII = "ascii"
+    BINARY = "binary"
+    SWITCH_BACK_ERRORS = 8
+    MAX_UNDECIDED = 4096
+
+    def __init__(self, mode: Optional[str] = None):
+        self.forced_mode = mode
+        self.ascii = LineFramer()
+        self.binary = BinaryFramer()
+        self.mode = mode
+        self._undecided = bytearray()
+        self.mode_switches = 0
+
+    def reset(self):
+        self.ascii.reset()
+        self.binary.reset()
+        self.mode = self.forced_mode
+        self._undecided.clear()
+
+    def _set_mode(self, mode: str):
+        if self.mode is not None and mode != self.mode:
+            self.mode_switches += 1
+        self.mode = mode
+
+    def _enter_binary(self, data: bytes) -> List[Union[bytes, BinaryFrame]]:
+        """Switch to binary mode; complete lines before the first NUL stay ASCII"""
+        first_nul = data.find(b'\x00')
+        cut = data.rfind(b'\n', 0, first_nul) + 1
+        items = self.ascii.feed(data[:cut]) if cut else []
+        self.ascii.reset()
+        self._set_mode(self.BINARY)
+        return items + self.binary.feed(data[cut:])
+
+    def feed(self, data: bytes) -> List[Union[bytes, BinaryFrame]]:
+        if self.forced_mode is None:
+            if self.mode is None:
+                self._undecided += data
+                if b'\x00' in self._undecided:
+                    data = bytes(self._undecided)
+                    self._undecided.clear()
+                    return self._enter_binary(data)
+                if b'\n' not in self._undecided and len(self._undecided) <= self.MAX_UNDECIDED:
+                    return []
+                self._set_mode(self.ASCII)
+                data = bytes(self._undecided)
+                self._undecided.clear()
+            elif self.mode == self.ASCII:
+                if b'\x00' in data:
+                    # The pending partial line belongs to whatever precedes the NUL
+                    return self._enter_binary(bytes(self.ascii._buffer) + data)
+            elif (self.binary.consecutive_errors >= self.SWITCH_BACK_ERRORS
+                  and b'\x00' not in data and b'\n' in data):
+                self.binary.reset()
+                self._set_mode(self.ASCII)
+
+        if self.mode == self.BINARY:
+            return self.binary.feed(data)
+        return self.ascii.feed(data)
+
+    # Statistiche aggregate (compatibili con LineFramer)
+    @property
+    def overflows(self) -> int:
+        return self.ascii.overflows
+
+    @property
+    def dropped_bytes(self) -> int:
+        return self.ascii.dropped_bytes + self.binary.dropped_bytes
+
+    @property
+    def crc_errors(self) -> int:
+        return self.binary.crc_errors
@@ -0,0 +1,439 @@
+"""
+Qt-independent ingest core: transport -> framing -> parsing -> decoding -> subscribers.
+
+Usable without PyQt6 (bench box, scripts, benchmarks). The GUI's SerialHandler
+is a thin QThread adapter that runs this engine and re-emits batches as signals.
+
+Headless usage (from the repository root):
+    python -m charger_gui.ingest --port /dev/ttyUSB0 [--baudrate 115200]
+"""
+
+import argparse
+import select
+import time
+from typing import Callable, List, Optional, Union
+
+import serial
+import serial.tools.list_ports
+
+from .framing import StreamFramer, BinaryFrame
+from .parser import parse_can_line
+from .can_decoder import CANDecoder, DecodeCache
+from .deltas import FlagDeltaTracker
+from .faults import FaultAssembler, FaultSet
+from .txqueue import TxQueue
+
+
+_UNDECODED = object()
+
+
+class SerialMessage:
+    """One CAN frame from the gateway (slotted: long traces keep millions of them)"""
+
+    __slots__ = ('direction', 'can_id', 'data', '_raw', 'timestamp', 'gateway_time_ms',
+                 'repeated', 'changes', '_decoded')
+
+    def __init__(self, can_id: int, data: Union[bytes, List[int]], direction: str = "RX",
+                 raw: Union[str, bytes] = "", timestamp: float = 0.0, gateway_time_ms: Optional[int] = None):
+        self.direction = direction  # "RX" o "TX"
+        self.can_id = can_id
+        self.data = data if type(data) is bytes else bytes(data)
+        self._raw = raw             # "" = formatted from the payload on first access
+        self.timestamp = timestamp  # time.perf_counter() alla ricezione dalla seriale
+        self.gateway_time_ms = gateway_time_ms  # solo in modalità binaria
+        self.repeated = False   # same payload as the previous frame with this ID (IngestEngine)
+        self.changes = None     # FlagChange tuple: flags changed vs. the previous frame (None = not tracked)
+        self._decoded = _UNDECODED
+
+    @property
+    def raw(self) -> str:
+        """Gateway line text (formatted from the payload unless given)"""
+        raw = self._raw
+        if not raw:
+            raw = self._raw = self._format_raw()
+        elif type(raw) is bytes:
+            raw = self._raw = raw.decode('ascii', errors='ignore')
+        return raw
+
+    def decode(self, cache: Optional[DecodeCache] = None):
+        """Decoded packet (CANDecoder.decode_message), computed once and cached"""
+        if self._decoded is _UNDECODED:
+            try:
+                if cache is not None:
+                    self._decoded = cache.decode(self.can_id, self.data)
+                else:
+                    self._decoded = CANDecoder.decode_message(self.can_id, self.data)
+            except (ValueError, IndexError):
+                self._decoded = None  # payload troncato o valore enum sconosciuto
+        return self._decoded
+
+    def _format_raw(self):
+        data_hex = ' '.join(f'{b:02X}' for b in self.data)
+        return f"CanBus {self.direction} 0x{self.can_id:03X} {data_hex}"
+
+    def __repr__(self):
+        data_hex = ' '.join(f'{b:02X}' for b in self.data)
+        return f"CAN {self.direction} ID=0x{self.can_id:03X} Data=[{data_hex}]"
+
+
+# Subscriber callback: receives every batch (list[SerialMessage]) read in one cycle
+BatchCallback = Callable[[List[SerialMessage]], None]
+# Fault set callback: one complete (or timed out) FLTA/FLTP answer
+FaultSetCallback = Callable[[FaultSet], None]
+
+
+class IngestEngine:
+    """
+    Serial ingest pipeline without any Qt dependency.
+
+    feed() turns raw bytes into messages and delivers them to the subscribers;
+    read_once() does the same for the bytes currently available on the open
+    port. Serial errors propagate to the caller (run() or the Qt adapter).
+    """
+
+    # Multi-frame messages: every frame carries different content
+    NON_COALESCABLE_IDS = frozenset({CANDecoder.CAN_ID_FLTA, CANDecoder.CAN_ID_FLTP})
+
+    def __init__(self, decode: bool = True):
+        self.serial_port: Optional[serial.Serial] = None
+        self.running = False
+        self.framer = StreamFramer()  # ASCII o binario (COBS), rilevato in automatico
+        self.decode = decode          # decode in the ingest thread, before delivery
+        self.decode_cache = DecodeCache()   # shared frozen packets for repeated status frames
+        self._last_payload = {}       # (can_id, direction) -> last payload, for msg.repeated
+        self.flag_deltas = FlagDeltaTracker()   # msg.changes for the flag messages
+        self.fault_assembler = FaultAssembler() # FLTA/FLTP frames -> complete fault sets
+        self._subscribers: List[BatchCallback] = []
+        self._fault_subscribers: List[FaultSetCallback] = []
+        self.recorder = None          # replay.TraceRecorder: raw chunks to file
+        # Writes go through a queue drained by the writer thread: callers never block on the port
+        self.tx = TxQueue(self._write)
+        self.write_timeout = 1.0      # s, a stalled adapter raises in the writer instead of hanging it
+
+        # Read mode: "event" = wake only when bytes arrive (select/poll on the
+        # port fd where available, otherwise a blocking read with timeout),
+        # "poll" = legacy in_waiting check + 10 ms sleep
+        self.read_mode = "event"
+        self.read_timeout = 0.1
+        self.read_wakeups = 0
+        self._poller = None
+        self.event_backend = ""
+
+        # Batch delivery: "latest per CAN ID" coalescing (off by default)
+        self.coalesce_latest = False
+        self.frames_received = 0
+        self.frames_coalesced = 0
+        self.frames_repeated = 0
+        self.batches_emitted = 0
+
+    # ------------------------------------------------------------------
+    # Subscribers
+    # ------------------------------------------------------------------
+    def subscribe(self, callback: BatchCallback):
+        """Register a callback for every delivered batch"""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: BatchCallback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def subscribe_faults(self, callback: FaultSetCallback):
+        """Register a callback for every reassembled fault set (needs decode=True)"""
+        if callback not in self._fault_subscribers:
+            self._fault_subscribers.append(callback)
+
+    def unsubscribe_faults(self, callback: FaultSetCallback):
+        if callback in self._fault_subscribers:
+            self._fault_subscribers.remove(callback)
+
+    # ------------------------------------------------------------------
+    # Transport
+    # ------------------------------------------------------------------
+    def open(self, port_name: str, baudrate: int = 115200):
+        """Open the serial port (raises serial.SerialException)"""
+        self.close()
+        self.serial_port = serial.Serial(port=port_name, baudrate=baudrate,
+                                         timeout=self.read_timeout, write_timeout=self.write_timeout)
+        self._poller = self._create_poller(self.serial_port)
+        self.event_backend = "select.poll(fd)" if self._poller else "blocking read"
+        self.framer.reset()
+        self._last_payload.clear()
+        self.flag_deltas.reset()
+        self.fault_assembler.reset()
+        self.tx.start()
+
+    def close(self) -> bool:
+        """Close the port (after writing what is queued, e.g. a last CTL). Return True if it was open"""
+        self.tx.flush()
+        self.tx.stop()
+        self._poller = None
+        if self.serial_port and self.serial_port.is_open:
+            self.serial_port.close()
+            return True
+        return False
+
+    @property
+    def is_open(self) -> bool:
+        return bool(self.serial_port and self.serial_port.is_open)
+
+    @staticmethod
+    def _create_poller(port):
+        """select.poll on the port file descriptor (POSIX only), else None"""
+        if not hasattr(select, 'poll') or not hasattr(port, 'fileno'):
+            return None
+        try:
+            poller = select.poll()
+            poller.register(port.fileno(), select.POLLIN)
+            return poller
+        except (OSError, ValueError, serial.SerialException):
+            return None
+
+    def read_available(self) -> bytes:
+        """Return the bytes available on the port, waiting at most read_timeout"""
+        port = self.serial_port
+        self.read_wakeups += 1
+
+        if self.read_mode == "poll":
+            if port.in_waiting > 0:         #in buffer
+                return port.read(port.in_waiting)
+            time.sleep(0.01)  # Small pause to avoid CPU overload
+            return b""
+
+        if self._poller is not None:
+            # Sleep in the kernel until the fd is readable
+            if not self._poller.poll(int(self.read_timeout * 1000)):
+                return b""
+            return port.read(port.in_waiting or 1)
+
+        # Portable fallback: block on the first byte, then drain the buffer
+        data = port.read(1)
+        if data and port.in_waiting:
+            data += port.read(port.in_waiting)
+        return data
+
+    def _write(self, line: bytes):
+        """Blocking write (TX writer thread only)"""
+        if self.is_open:
+            self.serial_port.write(line)
+
+    def write_line(self, message: str) -> bool:
+        """Queue one ASCII command line for the gateway. Return False if the TX queue is full"""
+        return self.tx.put_line(message)
+
+    def write_frame(self, can_id: int, data: bytes) -> bool:
+        """Queue one CAN frame for the gateway ("CanBus Tx 0x618 ..." command line)"""
+        return self.tx.put_frame(can_id, data)
+
+    # ------------------------------------------------------------------
+    # Pipeline
+    # ------------------------------------------------------------------
+    @staticmethod
+    def parse_message(line: Union[bytes, str]) -> Optional[SerialMessage]:
+        """
+        Parse a line received from serial (bytes slice from the framer)
+
+        Expected format: "CanBus Rx/Tx {ID} {Content}"
+        Examples:
+            "CanBus Rx 0x618 12 34 56 78 9A BC DE F0"
+            "CanBus Tx 610 AA BB CC DD EE FF"
+        """
+        if isinstance(line, str):
+            line = line.encode('ascii', errors='ignore')
+        parsed = parse_can_line(line)
+        if parsed is None:
+            return None
+        direction, can_id, data = parsed  # direction: "Rx" o "Tx"
+        return SerialMessage(can_id, data, direction)   # raw text formatted on demand
+
+    def coalesce(self, batch: List[SerialMessage]) -> List[SerialMessage]:
+        """Keep only the newest frame per (CAN ID, direction), in arrival order"""
+        latest = {}
+        for i, msg in enumerate(batch):
+            if msg.can_id in self.NON_COALESCABLE_IDS:
+                key = i
+            else:
+                key = (msg.can_id, msg.direction)
+                latest.pop(key, None)
+            latest[key] = msg
+        self.frames_coalesced += len(batch) - len(latest)
+        return list(latest.values())
+
+    def feed(self, data: bytes, rx_time: Optional[float] = None) -> List[SerialMessage]:
+        """Frame, parse and decode a chunk of raw bytes, then deliver the batch"""
+        if rx_time is None:
+            rx_time = time.perf_counter()
+        if self.recorder is not None:
+            self.recorder.write(data, rx_time)
+
+        # Process complete lines (ASCII) or frames (binary)
+        batch = []
+        for item in self.framer.feed(data):
+            if isinstance(item, BinaryFrame):
+                msg = SerialMessage(item.can_id, item.data, item.direction,
+                                    gateway_time_ms=item.gateway_time_ms)
+            else:
+                # Parse the message
+                msg = self.parse_message(item)
+            if msg:
+                msg.timestamp = rx_time
+                batch.append(msg)
+
+        if not batch:
+            if self.fault_assembler.pending:
+                self.expire_faults(rx_time)    # partial line only: stalled sets still time out
+            return batch
+        self.frames_received += len(batch)
+        if self.coalesce_latest:
+            batch = self.coalesce(batch)
+
+        # Mark frames identical to the previous one with the same ID (faults: every frame counts)
+        # and attach the changed flags (repeated frames: none)
+        last_payload = self._last_payload
+        deltas = self.flag_deltas
+        for msg in batch:
+            if msg.can_id in self.NON_COALESCABLE_IDS:
+                continue
+            key = (msg.can_id, msg.direction)
+            if last_payload.get(key) == msg.data:
+                msg.repeated = True
+                self.frames_repeated += 1
+                if deltas.tracks(msg.can_id):
+                    msg.changes = ()
+            else:
+                last_payload[key] = msg.data
+                msg.changes = deltas.update(msg.can_id, msg.data, msg.timestamp)
+
+        if self.decode:
+            cache = self.decode_cache
+            for msg in batch:
+                msg.decode(cache)
+        self.batches_emitted += 1
+        for callback in self._subscribers:
+            callback(batch)
+        if self.decode and self._fault_subscribers:
+            self._assemble_faults(batch, rx_time)
+        return batch
+
+    def _assemble_faults(self, batch: List[SerialMessage], rx_time: float):
+        """Feed the fault frames to the assembler and deliver the finished sets"""
+        assembler = self.fault_assembler
+        fault_sets = assembler.expire(rx_time) if assembler.pending else []
+        for msg in batch:
+            if msg.can_id in self.NON_COALESCABLE_IDS:
+                fault_set = assembler.feed(msg.can_id, msg.data, msg.decode(), msg.timestamp)
+                if fault_set is not None:
+                    fault_sets.append(fault_set)
+        self._deliver_faults(fault_sets)
+
+    def _deliver_faults(self, fault_sets: List[FaultSet]):
+        for fault_set in fault_sets:
+            for callback in self._fault_subscribers:
+                callback(fault_set)
+
+    def expire_faults(self, now: Optional[float] = None):
+        """
+        Publish the fault sets stalled for more than the assembler timeout (complete=False).
+
+        Called when no frame arrives (empty read, partial line) so a set cut short
+        by a quiet link is not held back until unrelated traffic; now=inf flushes
+        every pending set (end of a replayed trace).
+        """
+        assembler = self.fault_assembler
+        if not (assembler.pending and self.decode and self._fault_subscribers):
+            return
+        self._deliver_faults(assembler.expire(time.perf_counter() if now is None else now))
+
+    def read_once(self) -> List[SerialMessage]:
+        """Read what is available on the port (waiting at most read_timeout) and process it"""
+        data = self.read_available()
+        if not data:
+            if self.fault_assembler.pending:
+                self.expire_faults()
+            return []
+        return self.feed(data, time.perf_counter())
+
+    def run(self):
+        """Blocking read loop until stop() (headless use; the GUI runs it in a QThread)"""
+        self.running = True
+        self.framer.reset()
+        try:
+            while self.running and self.is_open:
+                self.read_once()
+        finally:
+            self.running = False
+
+    def stop(self):
+        self.running = False
+
+    def get_statistics(self) -> dict:
+        """Ingest counters"""
+        return {
+            'frames_received': self.frames_received,
+            'frames_coalesced': self.frames_coalesced,
+            'frames_repeated': self.frames_repeated,
+            'flag_changes': self.flag_deltas.changes,
+            'batches_emitted': self.batches_emitted,
+            'stream_mode': self.framer.mode or "detecting",
+            'line_overflows': self.framer.overflows,
+            'crc_errors': self.framer.crc_errors,
+            'dropped_bytes': self.framer.dropped_bytes,
+            'read_mode': self.read_mode,
+            'event_backend': self.event_backend,
+            'read_wakeups': self.read_wakeups,
+            **self.decode_cache.get_statistics(),
+            **self.fault_assembler.get_statistics(),
+            **self.tx.get_statistics(),
+        }
+
+
+def list_serial_ports() -> List[str]:
+    """Return list of available (open) serial ports"""
+    ports = serial.tools.list_ports.comports()
+    return [port.device for port in ports]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless CAN ingest (prints decoded frames)")
+    parser.add_argument('--port', required=True)
+    parser.add_argument('--baudrate', type=int, default=115200)
+    parser.add_argument('--coalesce', action='store_true', help="latest frame per CAN ID")
+    parser.add_argument('--changes', action='store_true',
+                        help="only log flag changes (STAT/TST1/STST1) instead of every frame")
+    parser.add_argument('--faults', action='store_true', help="also log reassembled fault sets")
+    args = parser.parse_args()
+
+    def print_batch(batch: List[SerialMessage]):
+        for msg in batch:
+            print(f"{CANDecoder.get_message_name(msg.can_id):<20} {msg!r}  {msg.decode()}")
+
+    def print_changes(batch: List[SerialMessage]):
+        for msg in batch:
+            for change in msg.changes or ():
+                print(f"{msg.timestamp:12.3f}  {CANDecoder.get_message_name(msg.can_id):<20} "
+                      f"{change.signal:<16} {change.old} -> {change.new}")
+
+    def print_fault_set(fault_set: FaultSet):
+        status = "" if fault_set.complete else f" (incompleto, mancano {list(fault_set.missing)})"
+        print(f"{CANDecoder.get_message_name(fault_set.can_id)}: {len(fault_set.faults)} fault{status}")
+        for fault in fault_set.faults:
+            print(f"    0x{fault.fault_code:02X} x{fault.occurrence} {fault.failure_level.name} "
+                  f"last {fault.last_time_h} h")
+
+    engine = IngestEngine()
+    engine.coalesce_latest = args.coalesce
+    engine.subscribe(print_changes if args.changes else print_batch)
+    if args.faults:
+        engine.subscribe_faults(print_fault_set)
+    engine.open(args.port, args.baudrate)
+    try:
+        engine.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.close()
+        print(engine.get_statistics())
+
+
+if __name__ == '__main__':
+    main()
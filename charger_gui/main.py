@@ -1,18 +1,26 @@
 #!/usr/bin/env python3
 
-import sys, os
+import sys, os, time
 
 import serial
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QTabWidget, QWidget,
                               QVBoxLayout, QHBoxLayout, QPushButton, QComboBox,
                               QLabel, QStatusBar, QMenuBar, QMenu, QMessageBox,
                               QDialog, QDialogButtonBox, QFormLayout, QSpinBox,
-                              QCheckBox, QDoubleSpinBox)
-from PyQt6.QtCore import Qt, pyqtSlot
-from PyQt6.QtGui import QAction, QIcon
+                              QCheckBox, QDoubleSpinBox, QFileDialog, QInputDialog)
+from PyQt6.QtCore import Qt, QTimer, pyqtSlot
+from PyQt6.QtGui import QAction, QActionGroup, QIcon
 from .tabs import Level1Tab, Level2Tab, Level3Tab, Level4Tab
-from .serial_handler import SerialHandler, SerialMessage, list_serial_ports
-from .can_decoder import CANDecoder
+from .plots import ChartsTab
+from .widgets import widget_update_statistics
+from .serial_handler import SerialHandler, ReplayHandler, SerialMessage, list_serial_ports
+from .replay import TracePlayer, TraceRecorder
+from .can_decoder import CANDecoder, CtlPacket
+from .faults import FaultSet
+from .diagnostics import describe
+from .metrics import LatencyStats
+from .render import RenderScheduler, RENDER_RATES_HZ
+from .scheduler import CtlScheduler
 
 
 class ControlDialog(QDialog):
@@ -73,6 +81,13 @@ class ControlDialog(QDialog):
             'iout_max_A': self.iout_max_spin.value()
         }
 
+    def set_values(self, ctl: CtlPacket):
+        self.can_enable_cb.setChecked(ctl.can_enable)
+        self.led3_enable_cb.setChecked(ctl.led3_enable)
+        self.iac_max_spin.setValue(ctl.iac_max_A)
+        self.vout_max_spin.setValue(ctl.vout_max_V)
+        self.iout_max_spin.setValue(ctl.iout_max_A)
+
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -82,10 +97,34 @@ class MainWindow(QMainWindow):
 
         # Serial handler
         self.serial_handler = SerialHandler()
-        self.serial_handler.message_received.connect(self.on_message_received)
+        self.serial_handler.messages_received.connect(self.on_messages_received)
+        self.serial_handler.fault_set_received.connect(self.on_fault_set_received)
+        self.serial_handler.request_finished.connect(self.on_request_finished)
         self.serial_handler.connection_status.connect(self.on_connection_status)
         self.serial_handler.error_occurred.connect(self.on_error)
 
+        # Trace replay (stand-in for the serial port) and session recording
+        self.replay_handler: ReplayHandler = None
+        self.replay_speed = 1.0
+        self.recorder: TraceRecorder = None
+
+        # CTL every 100 ms from its own thread (the charger stops after 600 ms without)
+        self.ctl_scheduler = CtlScheduler(self.serial_handler.engine.write_frame)
+
+        # Widgets are redrawn by a timer with the latest message per CAN ID
+        # (hidden tabs keep only their latest messages and catch up when shown)
+        self.renderer = RenderScheduler(self.render_message, self.on_render_flushed, parent=self,
+                                        is_visible=self.is_tab_visible)
+        self.deferred_fault_sets = {}   # can_id -> FaultSet received while Level 2 was hidden
+
+        # Latency from serial receipt to decode
+        self.decode_latency = LatencyStats()
+
+        # Skip frames whose payload equals the previous one with the same ID
+        # ("Last Update" then shows the last change)
+        self.skip_repeated = False
+        self.frames_skipped = 0
+
         script_dir = os.path.dirname(os.path.abspath(__file__))
         icon_path = os.path.join(script_dir, "logoGUI.ico")
         self.setWindowIcon(QIcon(icon_path))
@@ -107,6 +146,7 @@ class MainWindow(QMainWindow):
         toolbar_layout.addWidget(QLabel("Serial Port:"))
         self.port_combo = QComboBox()
         self.port_combo.setMinimumWidth(150)
+        self.port_combo.setEditable(True)  # anche percorsi non elencati (es. simulatore /dev/pts/N)
         toolbar_layout.addWidget(self.port_combo)
 
         # Baudrate selection
@@ -140,18 +180,38 @@ class MainWindow(QMainWindow):
         self.level2_tab = Level2Tab()
         self.level3_tab = Level3Tab()
         self.level4_tab = Level4Tab()
+        self.charts_tab = ChartsTab()
 
         self.tab_widget.addTab(self.level1_tab, "Level 1 - Control & RT Diagnostic")
         self.tab_widget.addTab(self.level2_tab, "Level 2 - Faults & Info")
         self.tab_widget.addTab(self.level3_tab, "Level 3 - Service Messages")
         self.tab_widget.addTab(self.level4_tab, "Level 4 - Configuration")
+        self.tab_widget.addTab(self.charts_tab, "Charts")
 
         main_layout.addWidget(self.tab_widget)
 
+        # Tab that shows each CAN ID (render_message routing)
+        self.tab_of_id = {
+            CANDecoder.CAN_ID_CTL: self.level1_tab, CANDecoder.CAN_ID_ACT1: self.level1_tab,
+            CANDecoder.CAN_ID_STAT: self.level1_tab, CANDecoder.CAN_ID_ACT2: self.level1_tab,
+            CANDecoder.CAN_ID_TST1: self.level1_tab,
+            CANDecoder.CAN_ID_FLTA: self.level2_tab, CANDecoder.CAN_ID_FLTP: self.level2_tab,
+            CANDecoder.CAN_ID_SW: self.level2_tab, CANDecoder.CAN_ID_SN: self.level2_tab,
+            CANDecoder.CAN_ID_ACT3: self.level3_tab, CANDecoder.CAN_ID_TEMP: self.level3_tab,
+            CANDecoder.CAN_ID_STST1: self.level3_tab, CANDecoder.CAN_ID_ACT4: self.level3_tab,
+            CANDecoder.CAN_ID_TST2: self.level4_tab,
+        }
+        self.tab_widget.currentChanged.connect(self.on_tab_changed)
+
         # Status Bar
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("Ready - Not Connected")
+        self.ctl_label = QLabel("CTL: off")
+        self.status_bar.addPermanentWidget(self.ctl_label)
+        self.ctl_timer = QTimer(self)
+        self.ctl_timer.setInterval(500)
+        self.ctl_timer.timeout.connect(self.update_ctl_status)
 
         # Menu Bar
         self.create_menu_bar()
@@ -163,6 +223,13 @@ class MainWindow(QMainWindow):
         # File menu
         file_menu = menubar.addMenu("File")
 
+        self.record_action = QAction("Record Session...", self)
+        self.record_action.setCheckable(True)
+        self.record_action.toggled.connect(self.set_recording)
+        file_menu.addAction(self.record_action)
+
+        file_menu.addSeparator()
+
         exit_action = QAction("Exit", self)
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
@@ -174,6 +241,85 @@ class MainWindow(QMainWindow):
         clear_action.triggered.connect(self.clear_all_data)
         tools_menu.addAction(clear_action)
 
+        tools_menu.addSeparator()
+
+        ctl_action = QAction("CTL Transmission...", self)
+        ctl_action.triggered.connect(self.start_ctl)
+        tools_menu.addAction(ctl_action)
+
+        stop_ctl_action = QAction("Stop CTL Transmission", self)
+        stop_ctl_action.triggered.connect(self.stop_ctl)
+        tools_menu.addAction(stop_ctl_action)
+
+        diagnostics_action = QAction("Request Diagnostics (Faults, SW, SN)", self)
+        diagnostics_action.triggered.connect(self.request_diagnostics)
+        tools_menu.addAction(diagnostics_action)
+
+        tools_menu.addSeparator()
+
+        self.coalesce_action = QAction("Coalesce Frames (latest per ID)", self)
+        self.coalesce_action.setCheckable(True)
+        self.coalesce_action.setChecked(self.serial_handler.engine.coalesce_latest)
+        self.coalesce_action.toggled.connect(self.set_coalescing)
+        tools_menu.addAction(self.coalesce_action)
+
+        self.skip_repeated_action = QAction("Skip Repeated Payloads", self)
+        self.skip_repeated_action.setCheckable(True)
+        self.skip_repeated_action.setChecked(self.skip_repeated)
+        self.skip_repeated_action.toggled.connect(self.set_skip_repeated)
+        tools_menu.addAction(self.skip_repeated_action)
+
+        self.event_read_action = QAction("Event-driven Serial Read", self)
+        self.event_read_action.setCheckable(True)
+        self.event_read_action.setChecked(self.serial_handler.engine.read_mode == "event")
+        self.event_read_action.toggled.connect(self.set_event_read)
+        tools_menu.addAction(self.event_read_action)
+
+        rate_menu = tools_menu.addMenu("Display Refresh Rate")
+        rate_group = QActionGroup(self)
+        for rate in RENDER_RATES_HZ:
+            action = QAction(f"{rate} Hz", self)
+            action.setCheckable(True)
+            action.setChecked(rate == self.renderer.rate_hz)
+            action.triggered.connect(lambda checked, r=rate: self.renderer.set_rate(r))
+            rate_group.addAction(action)
+            rate_menu.addAction(action)
+
+        stats_action = QAction("Pipeline Statistics", self)
+        stats_action.triggered.connect(self.show_statistics)
+        tools_menu.addAction(stats_action)
+
+        # Replay menu
+        replay_menu = menubar.addMenu("Replay")
+
+        open_trace_action = QAction("Open Trace...", self)
+        open_trace_action.triggered.connect(self.open_trace)
+        replay_menu.addAction(open_trace_action)
+
+        self.pause_replay_action = QAction("Pause", self)
+        self.pause_replay_action.setCheckable(True)
+        self.pause_replay_action.toggled.connect(self.set_replay_paused)
+        replay_menu.addAction(self.pause_replay_action)
+
+        seek_action = QAction("Seek...", self)
+        seek_action.triggered.connect(self.seek_replay)
+        replay_menu.addAction(seek_action)
+
+        stop_replay_action = QAction("Stop Replay", self)
+        stop_replay_action.triggered.connect(self.stop_replay)
+        replay_menu.addAction(stop_replay_action)
+
+        speed_menu = replay_menu.addMenu("Speed")
+        speed_group = QActionGroup(self)
+        for label, speed in (("Real time", 1.0), ("2x", 2.0), ("10x", 10.0),
+                             ("100x", 100.0), ("As fast as possible", 0.0)):
+            action = QAction(label, self)
+            action.setCheckable(True)
+            action.setChecked(speed == self.replay_speed)
+            action.triggered.connect(lambda checked, s=speed: self.set_replay_speed(s))
+            speed_group.addAction(action)
+            speed_menu.addAction(action)
+
         # Help menu
         help_menu = menubar.addMenu("Help")
 
@@ -194,6 +340,9 @@ class MainWindow(QMainWindow):
         """Open/Close connection with selected serial port"""
         if not self.serial_handler.running:
             # Connect
+            if self.replay_handler and self.replay_handler.running:
+                QMessageBox.warning(self, "Error", "Stop the replay first")
+                return
             port = self.port_combo.currentText()
             if port == "No ports found":
                 QMessageBox.warning(self, "Error", "No serial port selected")
@@ -209,6 +358,7 @@ class MainWindow(QMainWindow):
 
         else:
             # Disconnect
+            self.stop_ctl()
             self.serial_handler.stop()
             self.connect_btn.setText("Connect")
             self.connect_btn.setStyleSheet("background-color: #4CAF50; color: white;")
@@ -216,25 +366,46 @@ class MainWindow(QMainWindow):
             self.refresh_btn.setEnabled(True)
 
 
-    @pyqtSlot(SerialMessage)
-    def on_message_received(self, msg: SerialMessage):
-        """Handle received CAN message"""
+    @pyqtSlot(list)
+    def on_messages_received(self, batch: list):
+        """Handle a batch of CAN messages read by the serial thread in one cycle"""
+        for msg in batch:
+            self.dispatch_message(msg)
 
-        decoded = CANDecoder.decode_message(msg.can_id, msg.data)
+    def dispatch_message(self, msg: SerialMessage) -> bool:
+        """Queue a decoded CAN message for the next render. Return False if unknown"""
+
+        decoded = msg.decode()  # already decoded by the ingest engine
+        if msg.timestamp:
+            self.decode_latency.add(time.perf_counter() - msg.timestamp)
 
         if decoded is None:
-            return
+            return False
 
+        # Every sample goes to the charts (also repeated ones: the time axis stays regular)
+        if msg.can_id in ChartsTab.SOURCES:
+            self.charts_tab.append(msg.can_id, decoded, msg.timestamp or time.perf_counter())
+
+        if msg.repeated and self.skip_repeated:
+            self.frames_skipped += 1
+            return True
+
+        self.renderer.submit(msg)
+        return True
+
+    def render_message(self, msg: SerialMessage, changes=None):
+        """Route a decoded message to its tab (RenderScheduler flush)"""
+        decoded = msg.decode()
         if msg.can_id == CANDecoder.CAN_ID_CTL:
             self.level1_tab.update_ctl(decoded,msg.can_id, msg.data)
         elif msg.can_id == CANDecoder.CAN_ID_ACT1:
             self.level1_tab.update_act1(decoded, msg.can_id, msg.data)
         elif msg.can_id == CANDecoder.CAN_ID_STAT:
-            self.level1_tab.update_stat(decoded, msg.can_id, msg.data)
+            self.level1_tab.update_stat(decoded, msg.can_id, msg.data, changes)
         elif msg.can_id == CANDecoder.CAN_ID_ACT2:
             self.level1_tab.update_act2(decoded, msg.can_id, msg.data)
         elif msg.can_id == CANDecoder.CAN_ID_TST1:
-            self.level1_tab.update_tst1(decoded, msg.can_id, msg.data)
+            self.level1_tab.update_tst1(decoded, msg.can_id, msg.data, changes)
         elif msg.can_id in [CANDecoder.CAN_ID_FLTA, CANDecoder.CAN_ID_FLTP]:
             self.level2_tab.update_fault(decoded, msg.can_id, msg.data)
         elif msg.can_id == CANDecoder.CAN_ID_SW:
@@ -246,13 +417,64 @@ class MainWindow(QMainWindow):
         elif msg.can_id == CANDecoder.CAN_ID_TEMP:
             self.level3_tab.update_temp(decoded, msg.can_id, msg.data)
         elif msg.can_id == CANDecoder.CAN_ID_STST1:
-            self.level3_tab.update_stst1(decoded, msg.can_id, msg.data)
+            self.level3_tab.update_stst1(decoded, msg.can_id, msg.data, changes)
         elif msg.can_id == CANDecoder.CAN_ID_ACT4:
             self.level3_tab.update_act4(decoded, msg.can_id, msg.data)
         elif msg.can_id == CANDecoder.CAN_ID_TST2:
             self.level4_tab.update_tst2(decoded, msg.can_id, msg.data)
 
-        # Aggiorna status bar
+    def is_tab_visible(self, can_id: int) -> bool:
+        """True if the tab showing can_id is the current one (unknown IDs: always)"""
+        tab = self.tab_of_id.get(can_id)
+        return tab is None or tab is self.tab_widget.currentWidget()
+
+    @pyqtSlot(int)
+    def on_tab_changed(self, index: int):
+        """Bring the tab just shown up to date in one pass"""
+        self.renderer.catch_up()
+        if self.tab_widget.currentWidget() is self.charts_tab:
+            self.charts_tab.redraw()
+        if self.deferred_fault_sets and self.tab_widget.currentWidget() is self.level2_tab:
+            for fault_set in self.deferred_fault_sets.values():
+                self.level2_tab.update_fault_set(fault_set)
+            self.deferred_fault_sets.clear()
+
+    @pyqtSlot(object)
+    def on_fault_set_received(self, fault_set: FaultSet):
+        """Complete FLTA/FLTP answer: the fault list is replaced in one step"""
+        if self.tab_widget.currentWidget() is not self.level2_tab:
+            self.deferred_fault_sets[fault_set.can_id] = fault_set   # latest per channel
+            return
+        self.level2_tab.update_fault_set(fault_set)
+
+    def request_diagnostics(self):
+        """Send the REQ sweep; the answers update Level 2 through the normal dispatch"""
+        if not self.serial_handler.engine.is_open:
+            QMessageBox.warning(self, "Error", "Connect to the gateway first")
+            return
+        self.serial_handler.request_diagnostics()
+        self.status_bar.showMessage("Diagnostic requests sent (FLTP, FLTA, SW, SN)")
+
+    @pyqtSlot(object)
+    def on_request_finished(self, future):
+        """One REQ answered, timed out or cancelled"""
+        name = future.request_type.name
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            self.status_bar.showMessage(f"Request {name}: {error}")
+        else:
+            self.status_bar.showMessage(f"Request {name}: {describe(future.result())}")
+
+    def on_render_flushed(self, msg: SerialMessage):
+        """After each render flush: status bar, and the new chart segments if shown"""
+        self.update_status_bar(msg)
+        if self.tab_widget.currentWidget() is self.charts_tab:
+            self.charts_tab.refresh()
+
+    def update_status_bar(self, msg: SerialMessage):
+        """Aggiorna status bar"""
         msg_name = CANDecoder.get_message_name(msg.can_id)
         self.status_bar.showMessage(f"Last message: {msg_name} ({msg.direction})")
 
@@ -270,6 +492,149 @@ class MainWindow(QMainWindow):
         self.status_bar.showMessage(f"ERROR: {error_msg}")
         QMessageBox.warning(self, "Communication Error", error_msg)
 
+    def start_ctl(self):
+        """Ask for the CTL setpoint and send it every 100 ms until stopped"""
+        if not self.serial_handler.engine.is_open:
+            QMessageBox.warning(self, "Error", "Connect to the gateway first")
+            return
+        dialog = ControlDialog(self)
+        if self.ctl_scheduler.running:
+            dialog.set_values(self.ctl_scheduler.ctl)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        self.ctl_scheduler.set_ctl(CtlPacket(**dialog.get_values()))
+        if not self.ctl_scheduler.running:
+            self.ctl_scheduler.reset_statistics()
+            self.ctl_scheduler.start()
+            self.ctl_timer.start()
+        self.update_ctl_status()
+
+    def stop_ctl(self):
+        """Stop the periodic CTL, sending a last one with CAN Enable off"""
+        if self.ctl_scheduler.running:
+            self.ctl_scheduler.stop(send_disable=True)
+        self.ctl_timer.stop()
+        self.update_ctl_status()
+
+    def update_ctl_status(self):
+        """Live CTL period jitter / lateness / missed deadlines in the status bar"""
+        scheduler = self.ctl_scheduler
+        self.ctl_label.setText(str(scheduler))
+        style = "color: red;" if scheduler.running and (scheduler.watchdog_gaps or scheduler.send_errors) else ""
+        if style != self.ctl_label.styleSheet():
+            self.ctl_label.setStyleSheet(style)
+
+    def set_coalescing(self, enabled: bool):
+        """Enable/disable "latest per CAN ID" coalescing in the serial thread"""
+        self.serial_handler.engine.coalesce_latest = enabled
+        if self.replay_handler:
+            self.replay_handler.engine.coalesce_latest = enabled
+
+    def set_skip_repeated(self, enabled: bool):
+        """Do not redraw widgets for frames identical to the previous one"""
+        self.skip_repeated = enabled
+        self.frames_skipped = 0
+
+    def set_event_read(self, enabled: bool):
+        """Switch between event-driven and legacy 10 ms polling serial reads"""
+        self.serial_handler.engine.read_mode = "event" if enabled else "poll"
+        self.serial_handler.engine.read_wakeups = 0
+        self.decode_latency.reset()
+
+    def open_trace(self):
+        """Replay a recorded trace / gateway log instead of the serial port"""
+        if self.serial_handler.running:
+            QMessageBox.warning(self, "Error", "Disconnect the serial port first")
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "Open Trace", "",
+                                              "Traces (*.trace *.log *.txt *.bin);;All files (*)")
+        if not path:
+            return
+        self.stop_replay()
+        try:
+            player = TracePlayer.from_file(path, self.replay_speed)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Cannot read trace: {e}")
+            return
+
+        self.replay_handler = ReplayHandler(player)
+        self.replay_handler.engine.coalesce_latest = self.serial_handler.engine.coalesce_latest
+        self.replay_handler.port_name = os.path.basename(path)
+        self.replay_handler.messages_received.connect(self.on_messages_received)
+        self.replay_handler.fault_set_received.connect(self.on_fault_set_received)
+        self.replay_handler.connection_status.connect(self.on_connection_status)
+        self.replay_handler.error_occurred.connect(self.on_error)
+        self.pause_replay_action.setChecked(False)
+        self.decode_latency.reset()
+        if self.replay_handler.connect():
+            self.replay_handler.start()
+
+    def stop_replay(self):
+        if self.replay_handler and self.replay_handler.running:
+            self.replay_handler.stop()
+
+    def set_replay_paused(self, paused: bool):
+        if self.replay_handler:
+            if paused:
+                self.replay_handler.player.pause()
+            else:
+                self.replay_handler.player.resume()
+
+    def set_replay_speed(self, speed: float):
+        """1.0 = real time, N = N times faster, 0 = as fast as possible"""
+        self.replay_speed = speed
+        if self.replay_handler:
+            self.replay_handler.player.speed = speed
+
+    def seek_replay(self):
+        if not self.replay_handler:
+            return
+        player = self.replay_handler.player
+        seconds, ok = QInputDialog.getDouble(self, "Seek", f"Position [s] (0 - {player.duration:.1f}):",
+                                             player.position, 0.0, player.duration, 1)
+        if ok:
+            player.seek(seconds)
+
+    def set_recording(self, enabled: bool):
+        """Record the raw serial stream to a trace file (replayable)"""
+        engine = self.serial_handler.engine
+        if enabled:
+            path, _ = QFileDialog.getSaveFileName(self, "Record Session", "session.trace",
+                                                  "Traces (*.trace);;All files (*)")
+            if not path:
+                self.record_action.setChecked(False)
+                return
+            try:
+                self.recorder = TraceRecorder(path)
+            except OSError as e:
+                QMessageBox.critical(self, "Error", f"Cannot create trace: {e}")
+                self.record_action.setChecked(False)
+                return
+            engine.recorder = self.recorder
+        elif self.recorder:
+            engine.recorder = None
+            self.recorder.close()
+            self.status_bar.showMessage(f"Recorded {self.recorder.chunks} chunks "
+                                        f"({self.recorder.bytes} bytes) to {self.recorder.path}")
+            self.recorder = None
+
+    def show_statistics(self):
+        """Show reader thread counters and receipt-to-decode latency"""
+        handler = self.serial_handler
+        if self.replay_handler and self.replay_handler.running:
+            handler = self.replay_handler
+        stats = handler.get_statistics()
+        stats['frames_skipped'] = self.frames_skipped
+        stats['decode_latency'] = str(self.decode_latency)
+        stats.update(self.renderer.get_statistics())
+        stats.update(widget_update_statistics())
+        if self.ctl_scheduler.frames_sent:
+            stats['ctl'] = str(self.ctl_scheduler)
+            stats['ctl_max_interval_ms'] = round(self.ctl_scheduler.max_interval * 1000.0, 3)
+            stats['ctl_watchdog_gaps'] = self.ctl_scheduler.watchdog_gaps
+        lines = [f"{name.replace('_', ' ').capitalize()}: {value}" for name, value in stats.items()]
+        QMessageBox.information(self, "Pipeline Statistics", "\n".join(lines))
+
     def clear_all_data(self):
         # This would require adding clear() methods to all tabs
         QMessageBox.information(self, "Clear Data",
@@ -291,8 +656,12 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         """Handle window close event"""
+        self.stop_ctl()
         if self.serial_handler.running:
             self.serial_handler.stop()
+        self.stop_replay()
+        if self.recorder:
+            self.record_action.setChecked(False)
         event.accept()
 
 
@@ -0,0 +1,49 @@
+import math
+
+
+class LatencyStats:
+    """Running statistics for a stream of durations (seconds in, ms out)"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.total_sq += seconds * seconds
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def stdev(self) -> float:
+        if self.count < 2:
+            return 0.0
+        mean = self.mean
+        return math.sqrt(max(self.total_sq / self.count - mean * mean, 0.0))
+
+    def summary(self) -> dict:
+        """Values in milliseconds, ready for display or JSON"""
+        return {
+            'count': self.count,
+            'mean_ms': round(self.mean * 1000.0, 3),
+            'stdev_ms': round(self.stdev * 1000.0, 3),
+            'max_ms': round(self.max * 1000.0, 3),
+            'last_ms': round(self.last * 1000.0, 3),
+        }
+
+    def __str__(self):
+        s = self.summary()
+        return (f"n={s['count']} mean={s['mean_ms']:.3f} ms "
+                f"max={s['max_ms']:.3f} ms last={s['last_ms']:.3f} ms")
@@ -0,0 +1,90 @@
+import re
+from typing import Optional, Tuple
+
+
+# (direction, can_id, payload)
+ParsedLine = Tuple[str, int, bytes]
+
+# Reference pattern (original implementation): "CanBus Rx/Tx {ID} {Content}"
+CAN_LINE_PATTERN = re.compile(
+    rb'CanBus\s+(Rx|Tx)\s+(?:0x)?([0-9A-Fa-f]+)\s+((?:[0-9A-Fa-f]{2}\s*)+)',
+    re.IGNORECASE
+)
+
+_HEX_CHARS = b'0123456789abcdefABCDEF'
+_HEX_DIGITS = frozenset(_HEX_CHARS)
+_WHITESPACE = frozenset(b' \t\n\r\x0b\x0c')
+
+# Direction tokens seen on the wire -> str (avoids a decode per line)
+_DIRECTIONS = {b'Rx': 'Rx', b'Tx': 'Tx', b'RX': 'RX', b'TX': 'TX',
+               b'rx': 'rx', b'tx': 'tx', b'rX': 'rX', b'tX': 'tX'}
+
+
+def _hex_prefix(payload: bytes) -> bytes:
+    """Longest leading run of hex byte pairs (slow path for trailing garbage)"""
+    out = bytearray()
+    i = 0
+    n = len(payload)
+    while i + 1 < n and payload[i] in _HEX_DIGITS and payload[i + 1] in _HEX_DIGITS:
+        out.append(int(payload[i:i + 2], 16))
+        i += 2
+        while i < n and payload[i] in _WHITESPACE:
+            i += 1
+    return bytes(out)
+
+
+def parse_can_line(line: bytes) -> Optional[ParsedLine]:
+    """
+    Parse a gateway line without regex.
+
+    Accepts the same lines as CAN_LINE_PATTERN: "CanBus" and "Rx"/"Tx" in
+    any case, ID with or without 0x, one or more payload bytes separated by
+    whitespace; anything after the last valid hex pair is ignored.
+    Unlike the regex path, unseparated pairs ("1234") always give one byte
+    each, so payload values stay in 0..255.
+    """
+    parts = line.split(None, 3)
+    if len(parts) != 4:
+        return None
+    tag, direction, ident, payload = parts
+
+    # Fixed prefix "CanBus R"/"CanBus T"
+    if tag != b'CanBus' and tag.lower() != b'canbus':
+        return None
+    direction_str = _DIRECTIONS.get(direction)
+    if direction_str is None:
+        return None
+
+    # ID: hex digits only, optional 0x prefix (int() alone would accept "_", "+", "0x0x")
+    if ident.startswith((b'0x', b'0X')):
+        ident = ident[2:]
+    if not ident or ident.translate(None, _HEX_CHARS):
+        return None
+    can_id = int(ident, 16)
+
+    try:
+        data = bytes.fromhex(payload.decode('ascii'))
+    except (ValueError, UnicodeDecodeError):
+        data = _hex_prefix(payload)
+    if not data:
+        return None
+
+    return direction_str, can_id, data
+
+
+def parse_can_line_regex(line: bytes) -> Optional[ParsedLine]:
+    """Original regex + int(b, 16) implementation, kept as reference for benchmarks"""
+    match = CAN_LINE_PATTERN.match(line.strip())
+    if not match:
+        return None
+    try:
+        can_id = int(match.group(2), 16)
+        data = [int(b, 16) for b in match.group(3).split()]
+    except ValueError:
+        return None
+    return match.group(1).decode(), can_id, data
+
+
+def format_can_line(can_id: int, data: bytes, direction: str = "Tx") -> str:
+    """Gateway command line for a frame to send (inverse of parse_can_line)"""
+    return f"CanBus {direction} 0x{can_id:03X} {bytes(data).hex(' ').upper()}"
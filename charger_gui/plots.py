@@ -0,0 +1,312 @@
+"""
+Live strip charts of the ACT1 / ACT2 / TEMP signals (whole charge curve).
+
+Every sample goes into a preallocated numpy ring buffer per signal (O(1)
+append, fixed memory however long the session). StripChart keeps a pixmap
+of what it has drawn: a refresh paints only the segments appended since the
+last one and scrolls the pixmap when the time window moves, so the cost
+per refresh depends on the new samples, not on the history. A full redraw
+happens only on resize, on a y-range change or when the tab is shown.
+
+numpy is optional for the GUI: without it the tab only shows a hint.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import Qt, QPointF, QRect
+from PyQt6.QtGui import QColor, QFont, QPainter, QPen, QPixmap, QPolygonF
+from PyQt6.QtWidgets import QGridLayout, QLabel, QVBoxLayout, QWidget
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .can_decoder import CANDecoder
+
+
+PLOT_CAPACITY = 36000       # samples per signal: 1 h of ACT1 at 100 ms
+PLOT_WINDOW_S = 600.0       # time span shown
+
+
+class RingBuffer:
+    """Fixed-size (time, value) buffer; `total` counts every sample ever appended"""
+
+    __slots__ = ('times', 'values', 'capacity', 'total')
+
+    def __init__(self, capacity: int = PLOT_CAPACITY):
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros(capacity, dtype=np.float32)
+        self.capacity = capacity
+        self.total = 0
+
+    def append(self, t: float, value: float):
+        i = self.total % self.capacity
+        self.times[i] = t
+        self.values[i] = value
+        self.total += 1
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def since(self, start: int) -> tuple:
+        """Samples appended from sample number `start` on (clipped to what is still held), in order"""
+        start = max(start, self.total - self.capacity)
+        if start >= self.total:
+            return self.times[:0], self.values[:0]
+        i, j = start % self.capacity, self.total % self.capacity
+        if i < j:
+            return self.times[i:j], self.values[i:j]
+        return (np.concatenate((self.times[i:], self.times[:j])),
+                np.concatenate((self.values[i:], self.values[:j])))
+
+    def clear(self):
+        self.total = 0
+
+
+class Trace:
+    """One signal in a chart"""
+
+    __slots__ = ('name', 'color', 'buffer', 'drawn', 'last_point')
+
+    def __init__(self, name: str, color: str, capacity: int = PLOT_CAPACITY):
+        self.name = name
+        self.color = QColor(color)
+        self.buffer = RingBuffer(capacity)
+        self.drawn = 0              # buffer.total at the last paint
+        self.last_point: Optional[Tuple[float, float]] = None   # last painted sample (t, value)
+
+
+class StripChart(QWidget):
+    """Scrolling time chart of a few traces with the same unit"""
+
+    MARGIN = 4
+
+    def __init__(self, title: str, unit: str, traces: List[Tuple[str, str]],
+                 window_s: float = PLOT_WINDOW_S, capacity: int = PLOT_CAPACITY):
+        super().__init__()
+        self.title = title
+        self.unit = unit
+        self.window_s = window_s
+        self.traces: Dict[str, Trace] = {name: Trace(name, color, capacity) for name, color in traces}
+        self.y_min, self.y_max = 0.0, 1.0
+        self._pixmap: Optional[QPixmap] = None
+        self._t_left = None         # time at the left edge of the pixmap
+        self.full_redraws = 0
+        self.segments_drawn = 0
+        self.setMinimumHeight(140)
+
+    def append(self, name: str, t: float, value: float):
+        self.traces[name].buffer.append(t, value)
+
+    def clear(self):
+        for trace in self.traces.values():
+            trace.buffer.clear()
+            trace.drawn = 0
+            trace.last_point = None
+        self._t_left = None
+        self._pixmap = None
+        self.update()
+
+    # ------------------------------------------------------------------
+    # Geometry
+    # ------------------------------------------------------------------
+    def _px_per_s(self) -> float:
+        return self._pixmap.width() / self.window_s
+
+    def _x(self, t):
+        return (t - self._t_left) * self._px_per_s()
+
+    def _y(self, value):
+        height = self._pixmap.height() - 2 * self.MARGIN
+        return self.MARGIN + height * (1.0 - (value - self.y_min) / (self.y_max - self.y_min))
+
+    def _latest_time(self) -> Optional[float]:
+        times = [trace.buffer.since(trace.buffer.total - 1)[0] for trace in self.traces.values()]
+        times = [t[0] for t in times if len(t)]
+        return max(times) if times else None
+
+    def _fit_y(self, low: float, high: float) -> bool:
+        """Widen the y range to [low, high] (+10%). Return True if it changed"""
+        if self.y_min <= low and high <= self.y_max:
+            return False
+        low, high = min(low, self.y_min), max(high, self.y_max)
+        pad = max((high - low) * 0.1, 1e-3)
+        self.y_min, self.y_max = low - pad, high + pad
+        return True
+
+    # ------------------------------------------------------------------
+    # Painting
+    # ------------------------------------------------------------------
+    def refresh(self):
+        """Paint the samples appended since the last refresh (full redraw when needed)"""
+        if self._pixmap is None or self._pixmap.size() != self.size():
+            self.redraw()
+            return
+        new = {name: trace.buffer.since(trace.drawn) for name, trace in self.traces.items()}
+        values = [v for _, v in new.values() if len(v)]
+        if not values:
+            return
+        if self._fit_y(min(float(v.min()) for v in values), max(float(v.max()) for v in values)):
+            self.redraw()
+            return
+        # Scroll when the newest sample is past the right edge
+        t_end = max(float(t[-1]) for t, _ in new.values() if len(t))
+        if self._t_left is None:
+            self._t_left = t_end - self.window_s * 0.9
+        overflow = self._x(t_end) - self._pixmap.width() + 1
+        if overflow > 0:
+            shift = int(overflow + self._pixmap.width() * 0.1)   # scroll in steps, not every sample
+            self._pixmap.scroll(-shift, 0, self._pixmap.rect())
+            painter = QPainter(self._pixmap)
+            painter.fillRect(QRect(self._pixmap.width() - shift, 0, shift, self._pixmap.height()),
+                             Qt.GlobalColor.white)
+            painter.end()
+            self._t_left += shift / self._px_per_s()
+            dirty = self._pixmap.rect()
+        else:
+            dirty = None
+
+        painter = QPainter(self._pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        x_min = self._pixmap.width()
+        for name, (times, values) in new.items():
+            trace = self.traces[name]
+            if len(times):
+                x_min = min(x_min, self._paint_trace(painter, trace, times, values))
+        painter.end()
+        self.update(dirty or QRect(int(x_min) - 2, 0, self.width() - int(x_min) + 2, self.height()))
+
+    def _paint_trace(self, painter: QPainter, trace: Trace, times, values) -> float:
+        """Polyline from the last painted sample through the new ones; return its left x"""
+        if trace.last_point is not None:
+            times = np.concatenate(([trace.last_point[0]], times))
+            values = np.concatenate(([trace.last_point[1]], values))
+        xs = self._x(times)
+        ys = self._y(values.astype(np.float64))
+        painter.setPen(QPen(trace.color, 1.5))
+        painter.drawPolyline(QPolygonF([QPointF(x, y) for x, y in zip(xs.tolist(), ys.tolist())]))
+        trace.last_point = (float(times[-1]), float(values[-1]))
+        trace.drawn = trace.buffer.total
+        self.segments_drawn += len(xs) - 1
+        return float(xs[0])
+
+    def redraw(self):
+        """Repaint the whole window from the ring buffers"""
+        self.full_redraws += 1
+        self._pixmap = QPixmap(self.size())
+        self._pixmap.fill(Qt.GlobalColor.white)
+        t_end = self._latest_time()
+        for trace in self.traces.values():
+            trace.drawn = max(trace.buffer.total - len(trace.buffer), 0)
+            trace.last_point = None
+        if t_end is None:
+            self._t_left = None
+            self.update()
+            return
+        self._t_left = t_end - self.window_s * 0.9
+        # y range from what is in the window
+        lows, highs = [], []
+        for trace in self.traces.values():
+            times, values = trace.buffer.since(0)
+            shown = values[times >= self._t_left]
+            if len(shown):
+                lows.append(float(shown.min()))
+                highs.append(float(shown.max()))
+        self.y_min, self.y_max = 0.0, 1.0
+        if lows:
+            self.y_min, self.y_max = min(lows), max(highs)
+            self._fit_y(self.y_min - 1e-3, self.y_max + 1e-3)
+        painter = QPainter(self._pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        for trace in self.traces.values():
+            times, values = trace.buffer.since(0)
+            keep = times >= self._t_left
+            if keep.any():
+                self._paint_trace(painter, trace, times[keep], values[keep])
+            trace.drawn = trace.buffer.total
+        painter.end()
+        self.update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self._pixmap is not None:
+            self.redraw()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        if self._pixmap is not None:
+            painter.drawPixmap(event.rect(), self._pixmap, event.rect())
+        else:
+            painter.fillRect(event.rect(), Qt.GlobalColor.white)
+        # Title, range and legend on top (text only, cheap)
+        painter.setFont(QFont("Arial", 8))
+        painter.setPen(Qt.GlobalColor.black)
+        painter.drawText(6, 12, f"{self.title} [{self.unit}]  {self.y_min:.1f} … {self.y_max:.1f}")
+        x = 6
+        for trace in self.traces.values():
+            painter.setPen(trace.color)
+            painter.drawText(x, 24, trace.name)
+            x += painter.fontMetrics().horizontalAdvance(trace.name) + 12
+        painter.setPen(QColor("#cccccc"))
+        painter.drawRect(self.rect().adjusted(0, 0, -1, -1))
+
+
+class ChartsTab(QWidget):
+    """Strip charts of ACT1 (vout, iout, iac, temp), ACT2 (AC power) and TEMP (power stages)"""
+
+    SOURCES = (CANDecoder.CAN_ID_ACT1, CANDecoder.CAN_ID_ACT2, CANDecoder.CAN_ID_TEMP)
+
+    def __init__(self):
+        super().__init__()
+        self.charts: List[StripChart] = []
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout()
+        if np is None:
+            layout.addWidget(QLabel("Grafici non disponibili: pip install numpy"))
+            layout.addStretch()
+            self.setLayout(layout)
+            return
+        grid = QGridLayout()
+        self.voltage = StripChart("Output voltage", "V", [("vout", "#1976D2")])
+        self.current = StripChart("Currents", "A", [("iout", "#388E3C"), ("iac", "#F57C00")])
+        self.power = StripChart("AC power", "kW", [("ac_power", "#7B1FA2")])
+        self.temperature = StripChart("Temperatures", "°C", [
+            ("act1", "#D32F2F"), ("power1", "#FF7043"), ("power2", "#8D6E63"), ("power3", "#455A64")])
+        self.charts = [self.voltage, self.current, self.power, self.temperature]
+        grid.addWidget(self.voltage, 0, 0)
+        grid.addWidget(self.current, 0, 1)
+        grid.addWidget(self.power, 1, 0)
+        grid.addWidget(self.temperature, 1, 1)
+        layout.addLayout(grid)
+        self.setLayout(layout)
+
+    def append(self, can_id: int, packet, t: float):
+        """Store one decoded sample (every frame, also when the tab is hidden)"""
+        if np is None:
+            return
+        if can_id == CANDecoder.CAN_ID_ACT1:
+            self.voltage.append("vout", t, packet.vout_V)
+            self.current.append("iout", t, packet.iout_A)
+            self.current.append("iac", t, packet.iac_A)
+            self.temperature.append("act1", t, packet.temp_C)
+        elif can_id == CANDecoder.CAN_ID_ACT2:
+            self.power.append("ac_power", t, packet.ac_power_kW)
+        elif can_id == CANDecoder.CAN_ID_TEMP:
+            self.temperature.append("power1", t, packet.temp_power1_C)
+            self.temperature.append("power2", t, packet.temp_power2_C)
+            self.temperature.append("power3", t, packet.temp_power3_C)
+
+    def refresh(self):
+        for chart in self.charts:
+            chart.refresh()
+
+    def redraw(self):
+        for chart in self.charts:
+            chart.redraw()
+
+    def clear(self):
+        for chart in self.charts:
+            chart.clear()
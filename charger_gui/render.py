@@ -0,0 +1,143 @@
+"""
+Frame-rate-capped rendering of decoded messages.
+
+The serial thread can deliver hundreds of frames per second; the widgets
+only need the newest value of each message. RenderScheduler keeps the
+latest message per CAN ID and a QTimer flushes that dirty set to the tabs
+at a fixed rate (10-30 Hz), so the repaint cost per second depends on the
+number of message types, not on the bus load.
+
+Flag deltas (msg.changes) of superseded frames are merged, so the indicator
+updates stay incremental. The timer stops when there is nothing to draw.
+
+With is_visible(can_id), messages for a hidden tab are not drawn: only the
+latest one per ID is kept, and catch_up() draws them in a single pass when
+the tab is shown again.
+"""
+
+import time
+from typing import Callable, Dict, Optional
+
+from PyQt6.QtCore import QObject, QTimer
+
+from .ingest import SerialMessage
+from .metrics import LatencyStats
+
+
+RENDER_RATES_HZ = (10, 20, 30)
+RENDER_RATE_HZ = 20
+
+# render(msg, changes) routes one message to its tab
+RenderCallback = Callable[[SerialMessage, Optional[tuple]], None]
+
+
+class RenderScheduler(QObject):
+    """Latest message per CAN ID, drawn by a QTimer at `rate_hz`"""
+
+    def __init__(self, render: RenderCallback,
+                 flushed: Optional[Callable[[SerialMessage], None]] = None,
+                 rate_hz: float = RENDER_RATE_HZ, parent: QObject = None,
+                 is_visible: Optional[Callable[[int], bool]] = None):
+        super().__init__(parent)
+        self.render = render
+        self.flushed = flushed      # called with the newest message after each flush (status bar)
+        self.is_visible = is_visible
+        self._pending: Dict[int, list] = {}     # can_id -> [msg, changes]
+        self._deferred: Dict[int, list] = {}    # same, for IDs whose tab is hidden
+        self._last: Optional[SerialMessage] = None
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.flush)
+        self.set_rate(rate_hz)
+        self.reset_statistics()
+
+    def set_rate(self, rate_hz: float):
+        self.rate_hz = rate_hz
+        self.timer.setInterval(max(int(round(1000.0 / rate_hz)), 1))
+
+    @staticmethod
+    def _store(entries: Dict[int, list], msg: SerialMessage, changes) -> bool:
+        """Latest message per ID, flag deltas merged. Return True if an older one was replaced"""
+        entry = entries.get(msg.can_id)
+        if entry is None:
+            entries[msg.can_id] = [msg, changes]
+            return False
+        old_changes = entry[1]
+        entry[0] = msg
+        # Keep every flag transition: None (= full refresh) wins
+        entry[1] = None if old_changes is None or changes is None else old_changes + changes
+        return True
+
+    def submit(self, msg: SerialMessage):
+        """Store the message for the next flush, replacing an older one with the same ID"""
+        self.frames_submitted += 1
+        if self._store(self._pending, msg, msg.changes):
+            self.frames_superseded += 1
+        self._last = msg
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        """Draw the pending messages (timer slot; also callable directly)"""
+        if not self._pending:
+            self.timer.stop()
+            return
+        start = time.perf_counter()
+        pending, self._pending = self._pending, {}
+        is_visible = self.is_visible
+        drawn = 0
+        for msg, changes in pending.values():
+            if is_visible is not None and not is_visible(msg.can_id):
+                if self._store(self._deferred, msg, changes):
+                    self.frames_superseded += 1
+                continue
+            if self._deferred and msg.can_id in self._deferred:
+                # shown without catch_up(): keep the flag transitions of the deferred frames
+                if self._store(self._deferred, msg, changes):
+                    self.frames_superseded += 1
+                msg, changes = self._deferred.pop(msg.can_id)
+            self.render(msg, changes)
+            drawn += 1
+        if self.flushed is not None and self._last is not None:
+            self.flushed(self._last)
+        self.frames_rendered += drawn
+        self.flushes += 1
+        self.render_time.add(time.perf_counter() - start)
+
+    def catch_up(self):
+        """Draw the deferred messages whose tab is now visible (call on tab change)"""
+        if not self._deferred:
+            return
+        is_visible = self.is_visible
+        for can_id in [i for i in self._deferred if is_visible is None or is_visible(i)]:
+            msg, changes = self._deferred.pop(can_id)
+            self.render(msg, changes)
+            self.frames_rendered += 1
+            self.frames_caught_up += 1
+
+    def clear(self):
+        self._pending.clear()
+        self._deferred.clear()
+        self._last = None
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+    def reset_statistics(self):
+        self.frames_submitted = 0
+        self.frames_superseded = 0
+        self.frames_rendered = 0
+        self.frames_caught_up = 0   # drawn late, when their tab was shown
+        self.flushes = 0
+        self.render_time = LatencyStats()   # one flush
+
+    def get_statistics(self) -> dict:
+        return {
+            'render_rate_hz': self.rate_hz,
+            'render_frames_submitted': self.frames_submitted,
+            'render_frames_superseded': self.frames_superseded,
+            'render_frames_drawn': self.frames_rendered,
+            'render_frames_caught_up': self.frames_caught_up,
+            'render_deferred_ids': len(self._deferred),
+            'render_flushes': self.flushes,
+            'render_time': str(self.render_time),
+        }
@@ -0,0 +1,261 @@
+"""
+Trace recording and replay (stand-in for the serial port).
+
+A trace is a list of (time [s], raw bytes) records fed to an IngestEngine
+exactly like bytes read from the gateway. Supported files:
+
+  - session recorded by TraceRecorder (header TRACE_MAGIC, exact timing,
+    ASCII or binary stream)
+  - raw ASCII gateway log ("CanBus Rx 0x611 ..." per line): one line every
+    line_interval seconds
+  - raw binary session (COBS frames): timing from the gateway timestamp
+
+Headless usage (from the repository root):
+    python -m charger_gui.replay trace.bin [--speed 10 | --speed 0]
+"""
+
+import argparse
+import struct
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple
+
+from .framing import BinaryFramer
+from .ingest import IngestEngine
+
+
+TRACE_MAGIC = b'EVOTRACE1\n'
+TRACE_RECORD = struct.Struct('<dI')     # time since start [s], chunk length
+
+
+class TraceRecorder:
+    """Write raw serial chunks with their receive time (IngestEngine.recorder)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'wb')
+        self._file.write(TRACE_MAGIC)
+        self._t0: Optional[float] = None
+        self._lock = threading.Lock()
+        self.chunks = 0
+        self.bytes = 0
+
+    def write(self, data: bytes, rx_time: float):
+        with self._lock:
+            if self._file is None:
+                return
+            if self._t0 is None:
+                self._t0 = rx_time
+            self._file.write(TRACE_RECORD.pack(rx_time - self._t0, len(data)))
+            self._file.write(data)
+            self.chunks += 1
+            self.bytes += len(data)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _read_recorded(blob: bytes) -> Tuple[List[float], List[bytes]]:
+    times, chunks = [], []
+    pos = len(TRACE_MAGIC)
+    size = TRACE_RECORD.size
+    while pos + size <= len(blob):
+        t, length = TRACE_RECORD.unpack_from(blob, pos)
+        pos += size
+        if pos + length > len(blob):
+            break   # recording interrupted mid-chunk
+        times.append(t)
+        chunks.append(blob[pos:pos + length])
+        pos += length
+    return times, chunks
+
+
+def _read_raw_binary(blob: bytes) -> Tuple[List[float], List[bytes]]:
+    times, chunks = [], []
+    decoder = BinaryFramer()
+    t = 0.0
+    last_ms = None
+    pos = 0
+    while pos < len(blob):
+        end = blob.find(b'\x00', pos)
+        end = len(blob) if end < 0 else end + 1
+        frame = decoder.decode(blob[pos:end].rstrip(b'\x00'))
+        if frame is not None:
+            if last_ms is not None:
+                t += ((frame.gateway_time_ms - last_ms) & 0xFFFFFFFF) / 1000.0   # uint32 wrap
+            last_ms = frame.gateway_time_ms
+        times.append(t)
+        chunks.append(blob[pos:end])
+        pos = end
+    return times, chunks
+
+
+def load_trace(path: str, line_interval: float = 0.01) -> Tuple[List[float], List[bytes]]:
+    """Read a trace file into (times, chunks)"""
+    with open(path, 'rb') as f:
+        blob = f.read()
+
+    if blob.startswith(TRACE_MAGIC):
+        return _read_recorded(blob)
+    if b'\x00' in blob:
+        return _read_raw_binary(blob)
+
+    chunks = blob.splitlines(keepends=True)
+    return [i * line_interval for i in range(len(chunks))], chunks
+
+
+class TracePlayer:
+    """
+    Replay a trace into an IngestEngine.
+
+    speed: 1.0 = real time, N = N times faster, 0 = as fast as possible.
+    Records that are due at the same wake-up are fed as one chunk, like a
+    serial read returning several frames. pause()/resume()/seek() and speed
+    changes are safe from another thread while play() runs.
+    """
+
+    MAX_SLEEP = 0.05        # keeps pause/seek/stop responsive
+    FAST_CHUNK = 4096       # bytes per feed in as-fast-as-possible mode
+
+    def __init__(self, times: List[float], chunks: List[bytes], speed: float = 1.0):
+        self.times = times
+        self.chunks = chunks
+        self._speed = speed
+        self._index = 0
+        self._seek_to: Optional[float] = None
+        self._rebase = True
+        self._running = False
+        self._resume = threading.Event()
+        self._resume.set()
+
+    @classmethod
+    def from_file(cls, path: str, speed: float = 1.0, line_interval: float = 0.01):
+        return cls(*load_trace(path, line_interval), speed=speed)
+
+    @property
+    def duration(self) -> float:
+        return self.times[-1] if self.times else 0.0
+
+    @property
+    def position(self) -> float:
+        """Trace time of the next record [s]"""
+        if self._index < len(self.times):
+            return self.times[self._index]
+        return self.duration
+
+    @property
+    def finished(self) -> bool:
+        return self._index >= len(self.times)
+
+    @property
+    def paused(self) -> bool:
+        return not self._resume.is_set()
+
+    @property
+    def speed(self) -> float:
+        return self._speed
+
+    @speed.setter
+    def speed(self, value: float):
+        self._speed = max(float(value), 0.0)
+        self._rebase = True
+
+    def pause(self):
+        self._resume.clear()
+
+    def resume(self):
+        self._rebase = True
+        self._resume.set()
+
+    def seek(self, seconds: float):
+        """Jump to trace time `seconds` (applied by play(), or immediately when idle)"""
+        if self._running:
+            self._seek_to = seconds
+        else:
+            self._index = bisect_left(self.times, seconds)
+            self._rebase = True
+
+    def stop(self):
+        self._running = False
+        self._resume.set()
+
+    def play(self, engine: IngestEngine) -> bool:
+        """Blocking replay from the current position. Return True at end of trace"""
+        times, chunks = self.times, self.chunks
+        n = len(times)
+        self._running = True
+        base_wall = base_t = 0.0
+
+        while self._running and self._index < n:
+            if not self._resume.is_set():
+                self._resume.wait(self.MAX_SLEEP)
+                continue
+
+            if self._seek_to is not None:
+                self._index = bisect_left(times, self._seek_to)
+                self._seek_to = None
+                engine.framer.reset()   # drop the partial line/frame before the jump
+                self._rebase = True
+                continue
+
+            i = self._index
+            speed = self._speed
+            if self._rebase:
+                base_wall = time.perf_counter()
+                base_t = times[i]
+                self._rebase = False
+
+            if speed > 0:
+                now = time.perf_counter()
+                due = base_wall + (times[i] - base_t) / speed
+                if due > now:
+                    time.sleep(min(due - now, self.MAX_SLEEP))
+                    engine.expire_faults()  # gap in the trace: stalled fault sets time out
+                    continue
+                j = max(bisect_right(times, base_t + (now - base_wall) * speed, i), i + 1)
+            else:
+                j = i + 1
+                size = len(chunks[i])
+                while j < n and size < self.FAST_CHUNK:
+                    size += len(chunks[j])
+                    j += 1
+
+            self._index = j
+            engine.feed(b''.join(chunks[i:j]) if j - i > 1 else chunks[i])
+
+        self._running = False
+        if self._index >= n:
+            engine.expire_faults(float('inf'))     # end of trace: nothing else will complete them
+            return True
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a gateway trace (headless)")
+    parser.add_argument('path')
+    parser.add_argument('--speed', type=float, default=0.0, help="1 = real time, 0 = max")
+    parser.add_argument('--line-interval', type=float, default=0.01)
+    parser.add_argument('--coalesce', action='store_true')
+    args = parser.parse_args()
+
+    engine = IngestEngine()
+    engine.coalesce_latest = args.coalesce
+    player = TracePlayer.from_file(args.path, args.speed, args.line_interval)
+
+    start = time.perf_counter()
+    player.play(engine)
+    elapsed = time.perf_counter() - start
+
+    stats = engine.get_statistics()
+    print(f"records: {len(player.times)}  trace: {player.duration:.3f} s  "
+          f"replay: {elapsed:.3f} s  frames: {stats['frames_received']} "
+          f"({stats['frames_received'] / max(elapsed, 1e-9):.0f} frames/s)")
+    print(stats)
+
+
+if __name__ == '__main__':
+    main()
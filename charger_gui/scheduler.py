@@ -0,0 +1,192 @@
+"""
+Periodic CTL (0x618) transmitter on absolute deadlines.
+
+The charger expects CTL every 100 ms and raises Tst1.rx618_fail after 600 ms
+without one. CtlScheduler sends the current setpoint from its own thread at
+start + n * period on the monotonic clock, so the period does not drift and
+GUI stalls do not delay it. When a deadline has already passed it sends
+once, late, for the latest one and counts the skipped ones as missed.
+
+Headless usage (from the repository root):
+    python -m charger_gui.scheduler --port /dev/ttyUSB0 --enable --iac 16 --vout 360 --iout 17
+"""
+
+import argparse
+import threading
+import time
+from typing import Callable, Optional
+
+from .can_decoder import CANDecoder, CtlPacket
+from .can_encoder import CANEncoder
+from .metrics import LatencyStats
+
+
+CTL_PERIOD = 0.1        # s, from the manual
+CTL_WATCHDOG = 0.6      # s without CTL -> charger stops (Tst1.rx618_fail)
+
+# send(can_id, payload): e.g. IngestEngine.write_frame
+FrameSender = Callable[[int, bytes], None]
+
+
+class CtlScheduler:
+    """Sends the CTL setpoint every `period` seconds in a dedicated thread"""
+
+    def __init__(self, send: FrameSender, period: float = CTL_PERIOD,
+                 clock: Callable[[], float] = time.monotonic):
+        self.send = send
+        self.period = period
+        self.clock = clock
+        self.ctl = CtlPacket(False, False, 0.0, 0.0, 0.0)
+        self._payload = CANEncoder.encode_ctl(self.ctl)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.reset_statistics()
+
+    # ------------------------------------------------------------------
+    # Control
+    # ------------------------------------------------------------------
+    def set_ctl(self, ctl: CtlPacket):
+        """New setpoint, sent from the next deadline on"""
+        self.ctl = ctl
+        self._payload = CANEncoder.encode_ctl(ctl)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="ctl-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, send_disable: bool = False, timeout: float = 1.0):
+        """Stop sending; with send_disable a last CTL with can_enable=False goes out first"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if send_disable:
+            self.set_ctl(CtlPacket(False, self.ctl.led3_enable, self.ctl.iac_max_A,
+                                   self.ctl.vout_max_V, self.ctl.iout_max_A))
+            self._send(self._payload)
+
+    # ------------------------------------------------------------------
+    # Loop
+    # ------------------------------------------------------------------
+    def _send(self, payload: bytes) -> bool:
+        try:
+            self.send(CANDecoder.CAN_ID_CTL, payload)
+            return True
+        except OSError as e:    # serial.SerialException included
+            self.send_errors += 1
+            self.last_error = str(e)
+            return False
+
+    def run(self):
+        """Deadline loop (runs in the scheduler thread until stop())"""
+        clock, period = self.clock, self.period
+        start = clock()
+        n = 0
+        last_sent = None
+        while not self._stop.is_set():
+            deadline = start + n * period
+            delay = deadline - clock()
+            if delay > 0:
+                if self._stop.wait(delay):
+                    break
+            else:
+                # Behind schedule: send once for the latest passed deadline
+                latest = int((clock() - start) / period)
+                if latest > n:
+                    self.deadlines_missed += latest - n
+                    n = latest
+                    deadline = start + n * period
+
+            now = clock()
+            if self._send(self._payload):
+                self.frames_sent += 1
+                self.lateness.add(now - deadline)
+                if last_sent is not None:
+                    interval = now - last_sent
+                    self.jitter.add(abs(interval - period))
+                    self.max_interval = max(self.max_interval, interval)
+                    if interval > CTL_WATCHDOG:
+                        self.watchdog_gaps += 1
+                last_sent = now
+            n += 1
+
+    # ------------------------------------------------------------------
+    # Telemetry
+    # ------------------------------------------------------------------
+    def reset_statistics(self):
+        self.frames_sent = 0
+        self.deadlines_missed = 0
+        self.watchdog_gaps = 0      # intervals > CTL_WATCHDOG: the charger has stopped
+        self.send_errors = 0
+        self.last_error = ""
+        self.max_interval = 0.0
+        self.jitter = LatencyStats()    # |interval - period|
+        self.lateness = LatencyStats()  # hand-off to send() - deadline (wire time: TxQueue stats)
+
+    def get_statistics(self) -> dict:
+        return {
+            'ctl_running': self.running,
+            'ctl_period_ms': self.period * 1000.0,
+            'ctl_frames_sent': self.frames_sent,
+            'ctl_deadlines_missed': self.deadlines_missed,
+            'ctl_watchdog_gaps': self.watchdog_gaps,
+            'ctl_max_interval_ms': round(self.max_interval * 1000.0, 3),
+            'ctl_jitter': self.jitter.summary(),
+            'ctl_lateness': self.lateness.summary(),
+            'ctl_send_errors': self.send_errors,
+        }
+
+    def __str__(self):
+        if not self.frames_sent:
+            return "CTL: off"
+        state = "CTL" if self.running else "CTL (stopped)"
+        return (f"{state} {self.period * 1000:.0f} ms | jitter {self.jitter.mean * 1000:.2f} ms "
+                f"(max {self.jitter.max * 1000:.2f}) | late max {self.lateness.max * 1000:.2f} ms | "
+                f"missed {self.deadlines_missed}")
+
+
+def main():
+    from .ingest import IngestEngine
+
+    parser = argparse.ArgumentParser(description="Send CTL every 100 ms (prints jitter telemetry)")
+    parser.add_argument('--port', required=True)
+    parser.add_argument('--baudrate', type=int, default=115200)
+    parser.add_argument('--enable', action='store_true', help="Ctl.CanEnable")
+    parser.add_argument('--led3', action='store_true')
+    parser.add_argument('--iac', type=float, default=0.0, help="max AC current [A]")
+    parser.add_argument('--vout', type=float, default=0.0, help="max output voltage [V]")
+    parser.add_argument('--iout', type=float, default=0.0, help="max output current [A]")
+    parser.add_argument('--duration', type=float, default=None)
+    args = parser.parse_args()
+
+    engine = IngestEngine(decode=False)
+    engine.open(args.port, args.baudrate)
+    scheduler = CtlScheduler(engine.write_frame)
+    scheduler.set_ctl(CtlPacket(args.enable, args.led3, args.iac, args.vout, args.iout))
+    reader = threading.Thread(target=engine.run, daemon=True)    # drain the echo
+    reader.start()
+    scheduler.start()
+    end = time.monotonic() + args.duration if args.duration else None
+    try:
+        while end is None or time.monotonic() < end:
+            time.sleep(1.0)
+            print(scheduler)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        scheduler.stop(send_disable=True)
+        engine.stop()
+        reader.join(1.0)
+        engine.close()
+        print(scheduler.get_statistics())
+
+
+if __name__ == '__main__':
+    main()
@@ -1,49 +1,34 @@
-import re
-from typing import Optional, List
 from PyQt6.QtCore import QThread, pyqtSignal
 import serial
-import serial.tools.list_ports
+from .ingest import IngestEngine, SerialMessage, list_serial_ports
+from .diagnostics import DiagnosticRequester
+from .replay import TracePlayer
 
-
-class SerialMessage:
-    def __init__(self, can_id: int, data: List[int], direction: str = "RX", raw: str = ""):
-        self.direction = direction  # "RX" o "TX"
-        self.can_id = can_id
-        self.data = data
-        self.raw = raw if raw else self._format_raw()
-    
-    def _format_raw(self):
-        data_hex = ' '.join(f'{b:02X}' for b in self.data)
-        return f"CanBus {self.direction} 0x{self.can_id:03X} {data_hex}"
-    
-    def __repr__(self):
-        data_hex = ' '.join(f'{b:02X}' for b in self.data)
-        return f"CAN {self.direction} ID=0x{self.can_id:03X} Data=[{data_hex}]"
+__all__ = ['SerialHandler', 'ReplayHandler', 'SerialMessage', 'list_serial_ports']
 
 
 class SerialHandler(QThread):
-    """Thread to handle serial communication"""
+    """Thread to handle serial communication (Qt adapter around IngestEngine)"""
     
     # PyQt Signals
-    message_received = pyqtSignal(SerialMessage)
+    messages_received = pyqtSignal(list)  # list[SerialMessage] letti in un ciclo
+    fault_set_received = pyqtSignal(object)  # FaultSet completo (FLTA/FLTP)
+    request_finished = pyqtSignal(object)  # Future di una richiesta REQ (diagnostics.py)
     connection_status = pyqtSignal(bool, str)  # (connected, message)
     error_occurred = pyqtSignal(str)
     
-    def __init__(self):
+    def __init__(self, engine: IngestEngine = None):
         super().__init__()
-        self.serial_port: Optional[serial.Serial] = None
+        self.engine = engine if engine is not None else IngestEngine()
+        self.engine.subscribe(self.messages_received.emit)
+        self.engine.subscribe_faults(self.fault_set_received.emit)
+        self.engine.tx.on_error = self.error_occurred.emit   # write errors from the TX writer thread
+        # REQ 0x61B: responses matched in the reader thread, results via request_finished
+        self.requester = DiagnosticRequester(self.engine.write_frame)
+        self.requester.attach(self.engine)
         self.running = False
         self.port_name = ""
         self.baudrate = 115200
-        
-        # Pattern espressione regolare: "CanBus Rx/Tx {ID} {Contenuto}"
-        # Esempi:
-        # "CanBus Rx 0x618 12 34 56 78 9A BC DE F0"
-        # "CanBus Tx 0x610 AA BB CC DD"
-        self.pattern = re.compile(
-            r'CanBus\s+(Rx|Tx)\s+(?:0x)?([0-9A-Fa-f]+)\s+((?:[0-9A-Fa-f]{2}\s*)+)',
-            re.IGNORECASE
-        )
     
     def set_port(self, port_name: str, baudrate: int = 115200):
         """Set serial port and baudrate"""
@@ -53,15 +38,8 @@ class SerialHandler(QThread):
     def connect(self) -> bool:
         """Connect to serial port"""
         try:
-            if self.serial_port and self.serial_port.is_open:
-                self.serial_port.close()
-            
-            self.serial_port = serial.Serial(
-                port=self.port_name,
-                baudrate=self.baudrate,
-                timeout=0.1
-            )
-            
+            self.engine.open(self.port_name, self.baudrate)
+            self.requester.start()
             self.connection_status.emit(True, f"Connesso a {self.port_name}")
             return True
             
@@ -69,86 +47,53 @@ class SerialHandler(QThread):
             self.connection_status.emit(False, f"Errore connessione: {e}")
             self.error_occurred.emit(str(e))
             return False
-    
+
     def disconnect(self):
         """Disconnect from serial port"""
         self.running = False
-        if self.serial_port and self.serial_port.is_open:
-            self.serial_port.close()
+        self.requester.stop()
+        self.engine.stop()
+        if self.engine.close():
             self.connection_status.emit(False, "Disconnesso")
     
     def send_message(self, message: str):
-        """Invia un messaggio sulla seriale"""
-        if self.serial_port and self.serial_port.is_open:
-            try:
-                self.serial_port.write(f"{message}\n".encode())
-            except serial.SerialException as e:
-                self.error_occurred.emit(f"Errore invio: {e}")
-    
-    def parse_message(self, line: str) -> Optional[SerialMessage]:
-        """
-        Verify if it's an expected RE
-        Parse a line received from serial
-        
-        Expected format: "CanBus Rx/Tx {ID} {Content}"
-        Examples:
-            "CanBus Rx 0x618 12 34 56 78 9A BC DE F0"
-            "CanBus Tx 610 AA BB CC DD EE FF"
-        """
-        match = self.pattern.match(line.strip())
-        if not match:
-            return None
-        direction = match.group(1)  # "Rx" o "Tx"
-        can_id_str = match.group(2)
-        data_str = match.group(3).strip()
-        
-        try:
-            # Convert ID (can be hex or decimal)
-            can_id = int(can_id_str, 16)
-            
-            # Convert data (space separated)
-            data_bytes = [int(b, 16) for b in data_str.split()]
-            
-            return SerialMessage(can_id, data_bytes, direction, line)
-            
-        except ValueError as e:
-            self.error_occurred.emit(f"Errore parsing: {e} - Riga: {line}")
-            return None
-    
+        """Invia un messaggio sulla seriale (in coda: non blocca il chiamante)"""
+        if not self.engine.write_line(message):
+            self.error_occurred.emit("Errore invio: coda TX piena")
+
+    def request_diagnostics(self, request_types=None):
+        """Pipelined REQ sweep (default: faults, SW, SN); each result arrives via request_finished"""
+        if request_types is None:
+            return self.requester.sweep(callback=self.request_finished.emit)
+        return self.requester.sweep(request_types, callback=self.request_finished.emit)
+
+    def get_statistics(self) -> dict:
+        """Reader thread counters"""
+        return {**self.engine.get_statistics(), **self.requester.get_statistics()}
+
     def run(self):
         """Main thread for serial reading"""
         self.running = True
-        buffer = ""
+        self.engine.framer.reset()
         
         while self.running:
-            if not self.serial_port or not self.serial_port.is_open:
+            if not self.engine.is_open:
                 self.msleep(50)    #delay
                 continue
             
             try:
-                # Read from serial
-                if self.serial_port.in_waiting > 0:         #in buffer
-                    data = self.serial_port.read(self.serial_port.in_waiting)
-                    buffer += data.decode('utf-8', errors='ignore')
-                    
-                    # Process complete lines separated by newline
-                    while '\n' in buffer:
-                        line, buffer = buffer.split('\n', 1)
-                        line = line.strip()
-                        
-                        if line:
-                            # Parse the message
-                            msg = self.parse_message(line)
-                            if msg:
-                                self.message_received.emit(msg)
-                
-                self.msleep(10)  # Small pause to avoid CPU overload
+                # Read, frame, parse, decode; batches arrive via messages_received
+                self.engine.read_once()
                 
             except serial.SerialException as e:
+                if not self.running:
+                    break  # porta chiusa da disconnect()
                 self.error_occurred.emit(f"Errore lettura: {e}")
                 self.disconnect()
                 break
             except Exception as e:
+                if not self.running:
+                    break
                 self.error_occurred.emit(f"Errore inaspettato: {e}")
     
     def stop(self):
@@ -158,7 +103,31 @@ class SerialHandler(QThread):
         self.wait()
 
 
-def list_serial_ports() -> List[str]:
-    """Return list of available (open) serial ports"""
-    ports = serial.tools.list_ports.comports()
-    return [port.device for port in ports]
\ No newline at end of file
+class ReplayHandler(SerialHandler):
+    """Same signals as SerialHandler, fed from a recorded trace (replay.TracePlayer)"""
+
+    def __init__(self, player: TracePlayer, engine: IngestEngine = None):
+        super().__init__(engine)
+        self.player = player
+
+    def connect(self) -> bool:
+        self.connection_status.emit(True, f"Replay {self.port_name} ({self.player.duration:.1f} s)")
+        return True
+
+    def disconnect(self):
+        self.running = False
+        self.player.stop()
+
+    def send_message(self, message: str):
+        pass  # nessun gateway durante il replay
+
+    def run(self):
+        self.running = True
+        self.engine.framer.reset()
+        try:
+            finished = self.player.play(self.engine)
+        except Exception as e:
+            self.error_occurred.emit(f"Errore replay: {e}")
+            finished = False
+        self.running = False
+        self.connection_status.emit(False, "Replay terminato" if finished else "Replay interrotto")
@@ -0,0 +1,343 @@
+"""
+Declarative signal database (DBC-like) for the charger CAN messages.
+
+Each message is described once: ID, packet dataclass and its signals (byte,
+bit, width, scale, offset, enum, unit). At load time every message is
+compiled into a decoder made of one precompiled struct.Struct unpack plus
+inline shift/mask/scale expressions, so decoding a frame is one dict lookup
+and one unpack. The same table drives the encoder (inverse scaling).
+
+Conventions (as in the CAN manual): D0 is byte 0, 16-bit values are big
+endian (D[n] MSB, D[n+1] LSB), bit 7 is the MSB of a byte.
+
+Listing of the table (from the repository root):
+    python -m charger_gui.signal_db
+"""
+
+import dataclasses
+import operator
+import struct
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class Signal:
+    """
+    One field of a packet dataclass.
+
+    width: 1..8 bits inside byte `byte` (lsb at `bit`), 16 for a big-endian
+    uint16 starting at `byte`, or 8 * n for an n-character text (text=True).
+    value = raw * scale + offset; with `enum`, value = values[raw] (default
+    {member.value: member}). `flags`: (name, bit) pairs of a packed flag
+    byte, exposed as bool accessors on the packet.
+    """
+    name: str
+    byte: int
+    width: int = 16
+    bit: int = 0
+    scale: Optional[float] = None
+    offset: float = 0.0
+    unit: str = ''
+    enum: Optional[type] = None
+    values: Optional[Mapping[int, Enum]] = None
+    text: bool = False
+    flags: Tuple[Tuple[str, int], ...] = ()
+
+    @property
+    def is_flag(self) -> bool:
+        return self.width == 1 and self.enum is None
+
+    @property
+    def mask(self) -> int:
+        return (1 << self.width) - 1
+
+
+def Flag(name: str, byte: int, bit: int) -> Signal:
+    """Single-bit boolean signal"""
+    return Signal(name, byte, width=1, bit=bit)
+
+
+def Flags(name: str, byte: int, **bits: int) -> Signal:
+    """Flag byte kept as one packed int; every name=bit becomes a bool accessor"""
+    return Signal(name, byte, width=8, flags=tuple(bits.items()))
+
+
+def Text(name: str, byte: int, length: int) -> Signal:
+    """Fixed-length ASCII (latin-1) signal"""
+    return Signal(name, byte, width=8 * length, text=True)
+
+
+@dataclass(frozen=True)
+class Message:
+    """
+    One CAN message. `empty`: (start byte, fill value) - when all bytes from
+    start on equal fill, the frame has no content and decodes as None
+    (e.g. "No fault detected").
+    """
+    can_id: int
+    name: str
+    packet: type
+    signals: Sequence[Signal]
+    length: int = 8
+    title: str = ''
+    empty: Optional[Tuple[int, int]] = None
+
+
+class _EnumTable(dict):
+    """raw value -> enum member; unknown raw values raise ValueError like Enum(raw)"""
+
+    def __init__(self, enum: type, values: Mapping[int, Enum]):
+        super().__init__(values)
+        self.enum = enum
+
+    def __missing__(self, raw):
+        raise ValueError(f"{raw} is not a valid {self.enum.__name__}")
+
+
+def _flag_property(field: str, bit: int) -> property:
+    mask = 1 << bit
+    get = operator.attrgetter(field)
+    return property(lambda packet: (get(packet) & mask) != 0, doc=f"{field} bit {bit}")
+
+
+def _flag_constructor(groups: List[Tuple[str, Tuple[Tuple[str, int], ...]]]) -> classmethod:
+    def from_flags(cls, **values):
+        """Build the packet from bool flags (missing flags are False) and the other fields"""
+        for field, flags in groups:
+            byte = 0
+            for flag, bit in flags:
+                if values.pop(flag, False):
+                    byte |= 1 << bit
+            values[field] = byte
+        return cls(**values)
+    return classmethod(from_flags)
+
+
+def _payload(data, size: int, name: str) -> bytes:
+    """Slow path: list payloads and short frames"""
+    data = bytes(data)
+    if len(data) < size:
+        raise IndexError(f"{name}: payload di {len(data)} byte, servono {size}")
+    return data
+
+
+class SignalDatabase:
+    """Compiled message table: decoders[can_id](data) -> packet dataclass"""
+
+    def __init__(self, messages: Sequence[Message]):
+        self.messages: Dict[int, Message] = {}
+        self.decoders: Dict[int, Callable] = {}
+        self._enum_tables: Dict[Tuple[int, str], _EnumTable] = {}
+        self._encode_tables: Dict[Tuple[int, str], Dict[Enum, int]] = {}
+        for message in messages:
+            if message.can_id in self.messages:
+                raise ValueError(f"CAN ID 0x{message.can_id:03X} definito due volte")
+            self.messages[message.can_id] = message
+            self.decoders[message.can_id] = self._compile(message)
+            self._install_flags(message)
+
+    # ========================================================================
+    # Compilation
+    # ========================================================================
+
+    @staticmethod
+    def _check_fields(message: Message):
+        names = [signal.name for signal in message.signals]
+        fields = [field.name for field in dataclasses.fields(message.packet)]
+        if sorted(names) != sorted(fields):
+            raise ValueError(f"{message.name}: segnali {names} != campi {message.packet.__name__} {fields}")
+        for signal in message.signals:
+            end = signal.byte + max(signal.width, 8) // 8
+            if end > message.length or (signal.width < 8 and signal.bit + signal.width > 8):
+                raise ValueError(f"{message.name}.{signal.name} fuori dal messaggio")
+
+    @staticmethod
+    def _install_flags(message: Message):
+        """Bool accessors + from_flags() on packets with packed flag bytes"""
+        groups = [(signal.name, signal.flags) for signal in message.signals if signal.flags]
+        if not groups:
+            return
+        packet = message.packet
+        for field, flags in groups:
+            for flag, bit in flags:
+                current = packet.__dict__.get(flag)
+                if current is not None and not isinstance(current, property):
+                    raise ValueError(f"{message.name}: flag {flag} in conflitto con {packet.__name__}")
+                setattr(packet, flag, _flag_property(field, bit))
+        packet.from_flags = _flag_constructor(groups)
+
+    def _enum_table(self, message: Message, signal: Signal) -> _EnumTable:
+        values = signal.values if signal.values is not None else {m.value: m for m in signal.enum}
+        table = _EnumTable(signal.enum, values)
+        self._enum_tables[message.can_id, signal.name] = table
+        # member -> raw (the highest raw wins when several map to one member)
+        self._encode_tables[message.can_id, signal.name] = {member: raw for raw, member in sorted(values.items())}
+        return table
+
+    def _compile(self, message: Message) -> Callable:
+        """Generate decode_<name>(data): one struct unpack + inline expressions"""
+        self._check_fields(message)
+
+        # Struct layout: one field per byte (bit fields share it), 'H' for 16 bit.
+        # Text is sliced, so short strings decode like the original data[:8]
+        layout: Dict[int, str] = {}
+        for signal in message.signals:
+            if signal.text:
+                continue
+            if signal.width == 16:
+                layout[signal.byte] = 'H'
+            else:
+                layout.setdefault(signal.byte, 'B')
+        fmt, variables, pos = '>', {}, 0
+        for byte in sorted(layout):
+            fmt += 'x' * (byte - pos) + layout[byte]
+            variables[byte] = f'r{byte}'
+            pos = byte + struct.calcsize('>' + layout[byte])
+        unpacker = struct.Struct(fmt)
+
+        packet_fields = [field.name for field in dataclasses.fields(message.packet)]
+        namespace = {'_unpack': unpacker.unpack_from, '_payload': _payload, '_error': struct.error,
+                     '_Packet': message.packet, '_new': object.__new__}
+        expressions = {}
+        for signal in message.signals:
+            if signal.text:
+                end = signal.byte + signal.width // 8
+                expressions[signal.name] = f"bytes(data[{signal.byte}:{end}]).decode('latin-1')"
+                continue
+            raw = variables[signal.byte]
+            if signal.is_flag:
+                expressions[signal.name] = f'({raw} & 0x{1 << signal.bit:02X}) != 0'
+                continue
+            if signal.width < 8:
+                if signal.bit:
+                    raw = f'({raw} >> {signal.bit})'
+                if signal.bit + signal.width < 8:
+                    raw = f'({raw} & 0x{signal.mask:02X})'
+            if signal.enum is not None:
+                namespace[f'_{signal.name}'] = self._enum_table(message, signal)
+                expr = f'_{signal.name}[{raw}]'
+            elif signal.scale is not None:
+                expr = f'{raw} * {signal.scale!r}'
+                if signal.offset:
+                    expr = f'({expr}) + {signal.offset!r}'
+            else:
+                expr = raw
+            expressions[signal.name] = expr
+
+        args = ', '.join(expressions[field.name] for field in dataclasses.fields(message.packet))
+        lines = [f"def decode_{message.name.lower()}(data):"]
+        if message.empty is not None:
+            start, fill = message.empty
+            lines += [f"    tail = data[{start}:{message.length}]",
+                      f"    if tail.count({fill}) == len(tail):",
+                      f"        return None"]
+        if layout:
+            targets = ', '.join(variables[byte] for byte in sorted(layout))
+            if len(layout) == 1:
+                targets += ','
+            lines += [f"    try:",
+                      f"        {targets} = _unpack(data)",
+                      f"    except (TypeError, _error):",
+                      f"        data = _payload(data, {unpacker.size}, {message.name!r})",
+                      f"        {targets} = _unpack(data)"]
+        if message.packet.__dataclass_params__.frozen:
+            # Frozen packets: the generated frozen __init__ costs one
+            # object.__setattr__ call per field; set slots (or __dict__) directly
+            lines.append(f"    packet = _new(_Packet)")
+            if hasattr(message.packet, '__slots__'):
+                for name in packet_fields:
+                    namespace[f'_set_{name}'] = getattr(message.packet, name).__set__
+                    lines.append(f"    _set_{name}(packet, {expressions[name]})")
+            else:
+                items = ', '.join(f"{name!r}: {expressions[name]}" for name in packet_fields)
+                lines.append(f"    packet.__dict__.update({{{items}}})")
+            lines.append(f"    return packet")
+        else:
+            lines.append(f"    return _Packet({args})")
+        source = '\n'.join(lines)
+
+        exec(compile(source, f'<signal_db {message.name}>', 'exec'), namespace)
+        decoder = namespace[f'decode_{message.name.lower()}']
+        decoder.__doc__ = f"Decode {message.name} - ID 0x{message.can_id:03X} (generated)"
+        decoder.source = source
+        return decoder
+
+    # ========================================================================
+    # Decode / encode
+    # ========================================================================
+
+    def decode(self, can_id: int, data):
+        """Packet dataclass, or None for unknown IDs / empty frames"""
+        decoder = self.decoders.get(can_id)
+        if decoder is None:
+            return None
+        return decoder(data)
+
+    def encode(self, can_id: int, packet) -> bytes:
+        """Inverse of decode(): physical values are rounded and clamped to the signal width"""
+        message = self.messages.get(can_id)
+        if message is None:
+            raise ValueError(f"Unknown CAN ID 0x{can_id:03X}")
+        out = bytearray(message.length)
+        for signal in message.signals:
+            value = getattr(packet, signal.name)
+            if signal.text:
+                size = signal.width // 8
+                out[signal.byte:signal.byte + size] = value.encode('latin-1', errors='replace')[:size].ljust(size, b' ')
+                continue
+            if signal.enum is not None:
+                raw = self._encode_tables[can_id, signal.name][value]
+            elif signal.scale is not None:
+                raw = min(max(int(round((value - signal.offset) / signal.scale)), 0), signal.mask)
+            else:
+                raw = int(value) & signal.mask
+            if signal.width == 16:
+                out[signal.byte] = raw >> 8
+                out[signal.byte + 1] = raw & 0xFF
+            else:
+                out[signal.byte] |= raw << signal.bit
+        return bytes(out)
+
+    def enum_table(self, can_id: int, name: str) -> Mapping[int, Enum]:
+        """raw value -> enum member for an enum signal"""
+        return self._enum_tables[can_id, name]
+
+    def message_name(self, can_id: int) -> Optional[str]:
+        message = self.messages.get(can_id)
+        return message.title or message.name if message else None
+
+    def describe(self) -> List[str]:
+        """Human-readable table (one line per signal)"""
+        lines = []
+        for can_id, message in sorted(self.messages.items()):
+            lines.append(f"0x{can_id:03X} {message.name:<6} {message.packet.__name__} ({message.length} byte)")
+            for signal in message.signals:
+                if signal.width >= 8 and signal.bit == 0:
+                    position = f"D{signal.byte}" + (f"-D{signal.byte + signal.width // 8 - 1}" if signal.width > 8 else "")
+                elif signal.width == 1:
+                    position = f"D{signal.byte}.{signal.bit}"
+                else:
+                    position = f"D{signal.byte}.{signal.bit + signal.width - 1}-{signal.bit}"
+                if signal.enum is not None:
+                    conversion = signal.enum.__name__
+                elif signal.scale is not None:
+                    conversion = f"x{signal.scale:g}" + (f" {signal.offset:+g}" if signal.offset else "")
+                elif signal.flags:
+                    conversion = "flags"
+                else:
+                    conversion = "text" if signal.text else ("bool" if signal.is_flag else "raw")
+                lines.append(f"    {signal.name:<16} {position:<9} {conversion:<20} {signal.unit}")
+                for flag, bit in signal.flags:
+                    lines.append(f"      {flag:<14} D{signal.byte}.{bit:<7} bool")
+        return lines
+
+
+def main():
+    from .can_decoder import SIGNAL_DB
+    print('\n'.join(SIGNAL_DB.describe()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,426 @@
+"""
+Charger EVO11KA + STM32 gateway simulator on a Linux/macOS pseudo-terminal.
+
+Emits the gateway serial traffic (ASCII "CanBus Rx ..." lines or binary COBS
+frames) with the charger periods from the manual, answers CTL and REQ
+commands written to the port, and can be overdriven for load tests.
+SerialHandler / IngestEngine connect to the printed /dev/pts/N like a real port.
+
+Usage (from the repository root):
+    python -m charger_gui.simulator [--overdrive 10] [--binary] [--link /tmp/ttyEVO]
+"""
+
+import argparse
+import heapq
+import math
+import os
+import random
+import select
+import time
+from typing import Dict, List, Optional
+
+from .can_decoder import (
+    CANDecoder, CtlPacket, StatPacket, Act1Packet, Act2Packet, Tst1Packet,
+    FaultPacket, FrameType, FailureLevel, FaultCode, SoftwarePacket,
+    SerialNumberPacket, Act3Packet, TempPacket, Stst1Packet, Act4Packet,
+    Tst2Packet, BaudrateType, IdType, IacControlType, RangeType, EVCModelType,
+    IDSettingType,
+)
+from .can_encoder import CANEncoder
+from .framing import LineFramer, encode_binary_frame
+from .parser import parse_can_line
+
+try:
+    import pty
+    import tty
+except ImportError:     # Windows
+    pty = tty = None
+
+
+# Periods from the manual [s] (Tst2 and SN: single shot at power on)
+DEFAULT_PERIODS = {
+    CANDecoder.CAN_ID_STAT: 1.0,
+    CANDecoder.CAN_ID_ACT1: 0.1,
+    CANDecoder.CAN_ID_TST1: 0.1,
+    CANDecoder.CAN_ID_ACT2: 1.0,
+    CANDecoder.CAN_ID_ACT3: 0.1,
+    CANDecoder.CAN_ID_TEMP: 0.1,
+    CANDecoder.CAN_ID_STST1: 0.1,
+    CANDecoder.CAN_ID_ACT4: 0.1,
+}
+
+CTL_TIMEOUT = 0.5           # no CTL for this long -> no output power (Tst1.Rx618Fail)
+FAULT_FRAME_INTERVAL = 0.1  # multi frame faults: one frame every 100 ms
+
+
+def random_packet(rng: random.Random, length: int = 8) -> bytes:
+    """Python twin of CanBus_GenerateRandomPacket: 8 random bytes"""
+    return bytes(rng.getrandbits(8) for _ in range(length))
+
+
+class ChargerModel:
+    """Minimal charger physics: CTL setpoints -> output voltage/current, temperatures"""
+
+    MAX_POWER_W = 11000.0
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.ctl = CtlPacket(False, False, 0.0, 0.0, 0.0)
+        self.last_ctl = -math.inf
+        self.battery_V = 300.0
+        self.vout_V = 0.0
+        self.iout_A = 0.0
+        self.temp_C = 25.0
+        self.cnt_hours = 1234
+        self.version = "SW3225A5"
+        self.serial = "EVO11KA1"
+        self.active_faults = [
+            FaultPacket(FrameType.SINGLE, 0, 0, FaultCode.TEMP_DERATING.value, 3,
+                        FailureLevel.WARNING, 30, 120),
+            FaultPacket(FrameType.SINGLE, 0, 0, FaultCode.CAN_COMMAND.value, 1,
+                        FailureLevel.SOFT, 118, 120),
+        ]
+        self.passive_faults = [
+            FaultPacket(FrameType.SINGLE, 0, 0, FaultCode.BULK1_VOLTAGE.value, 5,
+                        FailureLevel.HARD, 30, 120),
+        ]
+
+    def apply_ctl(self, ctl: CtlPacket, now: float):
+        self.ctl = ctl
+        self.last_ctl = now
+
+    def enabled(self, now: float) -> bool:
+        return self.ctl.can_enable and now - self.last_ctl < CTL_TIMEOUT
+
+    def step(self, dt: float, now: float):
+        """Advance the model by dt seconds"""
+        if self.enabled(now):
+            target_i = min(self.ctl.iout_max_A, self.MAX_POWER_W / max(self.battery_V, 1.0))
+            target_v = min(self.ctl.vout_max_V, self.battery_V + 0.05 * target_i)
+            if target_v < self.battery_V:
+                target_i = 0.0
+        else:
+            target_i = target_v = 0.0
+        k = min(dt / 0.3, 1.0)     # 300 ms ramp
+        self.iout_A += (target_i - self.iout_A) * k
+        self.vout_V += (target_v - self.vout_V) * k
+        self.battery_V = min(self.battery_V + self.iout_A * dt * 1e-3, 400.0)
+        power = self.vout_V * self.iout_A
+        self.temp_C += ((25.0 + power / 400.0) - self.temp_C) * min(dt / 30.0, 1.0)
+
+    def noise(self, sigma: float) -> float:
+        return self.rng.gauss(0.0, sigma)
+
+    # -- Packets -----------------------------------------------------------
+    def stat(self, now: float) -> StatPacket:
+        return StatPacket.from_flags(power_enable=self.enabled(now), error_latch=False,
+                                     warn_limit=bool(self.active_faults), lim_temp=self.temp_C > 60.0,
+                                     warning_hv=False, bulks=False)
+
+    def act1(self, now: float) -> Act1Packet:
+        iac = self.vout_V * self.iout_A / (3 * 230.0 * 0.95)
+        return Act1Packet(iac_A=max(iac + self.noise(0.05), 0.0), temp_C=self.temp_C + self.noise(0.1),
+                          vout_V=max(self.vout_V + self.noise(0.2), 0.0),
+                          iout_A=max(self.iout_A + self.noise(0.05), 0.0))
+
+    def act2(self, now: float) -> Act2Packet:
+        return Act2Packet(temp_loglv_C=self.temp_C - 5.0, ac_power_kW=self.vout_V * self.iout_A / 950.0,
+                          prox_limit_A=32.0, pilot_limit_A=32.0)
+
+    def tst1(self, now: float) -> Tst1Packet:
+        enabled = self.enabled(now)
+        return Tst1Packet.from_flags(
+            ack=enabled, pr_compl=False, pwr_ok=enabled, vout_ok=self.vout_V > 0.0,
+            neutral=True, led3=self.ctl.led3_enable, led618=now - self.last_ctl < CTL_TIMEOUT,
+            ovp=False, conn_open=False, ther_fail=False,
+            rx618_fail=self.ctl.can_enable and not enabled,
+            bulk1_fail=False, bulk2_fail=False, bulk3_fail=False, pump_on=enabled,
+            fan_on=self.temp_C > 40.0, hv_rx_fail=False, cooling_fail=False, rx619_fail=False,
+            neutro1=False, neutro2=False, three_phase=True, iac_fail=False, ignition=True,
+            lv_battery_np=False, prox_ok=True, pilot_ok=True, s2_ok=enabled,
+            cnt_hours=self.cnt_hours,
+        )
+
+    def act3(self, now: float) -> Act3Packet:
+        iac = self.vout_V * self.iout_A / (3 * 230.0 * 0.95)
+        return Act3Packet(12.0 if self.temp_C > 40.0 else 0.0, iac + self.noise(0.05),
+                          iac + self.noise(0.05), iac + self.noise(0.05))
+
+    def temp(self, now: float) -> TempPacket:
+        return TempPacket(self.temp_C + 2.0, self.temp_C + self.noise(0.2),
+                          self.temp_C + self.noise(0.2), self.temp_C + self.noise(0.2))
+
+    def stst1(self, now: float) -> Stst1Packet:
+        return Stst1Packet.from_flags(pfc_enable=self.enabled(now), log_temp_high=False, log_temp_low=False,
+                                      uvlo_log=False, ther_low_fail=False, rx618_fail=False,
+                                      bulk1_fail=False, bulk2_fail=False, bulk3_fail=False,
+                                      cooling_fail1=False, cooling_fail2=False, cooling_fail3=False,
+                                      uvlo_log_lv=False, bat_over=False, bat_under=False)
+
+    def act4(self, now: float) -> Act4Packet:
+        raw = int(self.iout_A * 10 / 3)
+        return Act4Packet(self.temp_C - 2.0, raw, raw, raw)
+
+    def tst2(self, now: float) -> Tst2Packet:
+        return Tst2Packet(BaudrateType.BAUDRATE_500KBIT, IdType.STANDARD_11BIT,
+                          IacControlType.ID618, RangeType.R4_EVO_USERS, False, False,
+                          EVCModelType.EVO11K, IDSettingType.SINGLE_CHARGER, True, False,
+                          32.0, 450.0, 30.0, 0xA5)
+
+
+class GatewaySimulator:
+    """Pseudo-terminal that behaves like the STM32 gateway attached to the charger"""
+
+    PACKETS = {
+        CANDecoder.CAN_ID_STAT: ChargerModel.stat,
+        CANDecoder.CAN_ID_ACT1: ChargerModel.act1,
+        CANDecoder.CAN_ID_TST1: ChargerModel.tst1,
+        CANDecoder.CAN_ID_ACT2: ChargerModel.act2,
+        CANDecoder.CAN_ID_ACT3: ChargerModel.act3,
+        CANDecoder.CAN_ID_TEMP: ChargerModel.temp,
+        CANDecoder.CAN_ID_STST1: ChargerModel.stst1,
+        CANDecoder.CAN_ID_ACT4: ChargerModel.act4,
+        CANDecoder.CAN_ID_TST2: ChargerModel.tst2,
+    }
+
+    def __init__(self, periods: Optional[Dict[int, float]] = None, overdrive: float = 1.0,
+                 binary: bool = False, noise_rate: float = 0.0, seed: Optional[int] = None):
+        self.periods = dict(DEFAULT_PERIODS if periods is None else periods)
+        self.overdrive = max(overdrive, 1e-6)
+        self.binary = binary
+        self.noise_rate = noise_rate    # random-payload frames/s (decoder robustness)
+        self.rng = random.Random(seed)
+        self.model = ChargerModel(self.rng)
+        self.framer = LineFramer()
+
+        self.master_fd: Optional[int] = None
+        self.slave_fd: Optional[int] = None
+        self.port_name = ""
+        self.running = False
+        self._t0 = 0.0
+        self._queue: list = []      # heap of (due, seq, can_id, payload or None)
+        self._seq = 0
+
+        # Statistics
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.bytes_dropped = 0
+        self.commands_received = 0
+
+    # -- Port --------------------------------------------------------------
+    def open(self, link: Optional[str] = None) -> str:
+        """Create the pseudo-terminal; return the path to connect to"""
+        if pty is None:
+            raise RuntimeError("Pseudo-terminal non disponibili su questa piattaforma")
+        self.master_fd, self.slave_fd = pty.openpty()
+        tty.setraw(self.master_fd)
+        tty.setraw(self.slave_fd)
+        os.set_blocking(self.master_fd, False)
+        self.port_name = os.ttyname(self.slave_fd)
+        if link:
+            if os.path.islink(link):
+                os.unlink(link)
+            os.symlink(self.port_name, link)
+            self.port_name = link
+        return self.port_name
+
+    def close(self):
+        for fd in (self.master_fd, self.slave_fd):
+            if fd is not None:
+                os.close(fd)
+        self.master_fd = self.slave_fd = None
+
+    # -- Scheduling ----------------------------------------------------------
+    def _schedule(self, due: float, can_id: int, payload: Optional[bytes] = None):
+        heapq.heappush(self._queue, (due, self._seq, can_id, payload))
+        self._seq += 1
+
+    def _start(self, now: float):
+        self._queue.clear()
+        for can_id, period in self.periods.items():
+            if period > 0:
+                # Spread the first frames so that equal periods do not collide
+                self._schedule(now + self.rng.uniform(0.0, period / self.overdrive), can_id)
+        # Single shot at power on
+        self._schedule(now, CANDecoder.CAN_ID_TST2)
+        self._schedule(now, CANDecoder.CAN_ID_SN,
+                       CANEncoder.encode_serial_number(SerialNumberPacket(self.model.serial)))
+        if self.noise_rate > 0:
+            self._schedule(now + self.rng.expovariate(self.noise_rate), -1)
+
+    def _due_frames(self, now: float) -> List[tuple]:
+        frames = []
+        queue = self._queue
+        while queue and queue[0][0] <= now:
+            due, _, can_id, payload = heapq.heappop(queue)
+            if can_id == -1:
+                # Random frame on a random known ID (CanBus_GenerateRandomPacket)
+                frames.append((self.rng.choice(list(self.PACKETS)), random_packet(self.rng), "Rx"))
+                self._schedule(due + self.rng.expovariate(self.noise_rate), -1)
+                continue
+            if payload is None:
+                payload = CANEncoder.encode_message(can_id, self.PACKETS[can_id](self.model, now))
+                period = self.periods.get(can_id, 0)
+                if period > 0:
+                    self._schedule(due + period / self.overdrive, can_id)
+            frames.append((can_id, payload, "Rx"))
+        return frames
+
+    # -- Commands from the PC --------------------------------------------------
+    def handle_line(self, line: bytes, now: float) -> List[tuple]:
+        """Process one command line; return the frames to echo immediately"""
+        parsed = parse_can_line(line.strip())
+        if parsed is None:
+            return []
+        self.commands_received += 1
+        _, can_id, data = parsed
+
+        if can_id == CANDecoder.CAN_ID_CTL and len(data) >= 7:
+            self.model.apply_ctl(CANDecoder.decode_ctl(data), now)
+        elif can_id == CANDecoder.CAN_ID_REQ and len(data) >= 4:
+            req = CANDecoder.decode_req(data)
+            if req.enable:
+                self._answer_request(req.id_requested, now)
+        # The gateway echoes every frame it puts on the bus
+        return [(can_id, data, "Tx")]
+
+    def _answer_request(self, id_requested: int, now: float):
+        delay = 0.002   # charger response time
+        if id_requested == CANDecoder.CAN_ID_SW:
+            self._schedule(now + delay, id_requested,
+                           CANEncoder.encode_software(SoftwarePacket(self.model.version)))
+        elif id_requested == CANDecoder.CAN_ID_SN:
+            self._schedule(now + delay, id_requested,
+                           CANEncoder.encode_serial_number(SerialNumberPacket(self.model.serial)))
+        elif id_requested in (CANDecoder.CAN_ID_FLTA, CANDecoder.CAN_ID_FLTP):
+            faults = (self.model.active_faults if id_requested == CANDecoder.CAN_ID_FLTA
+                      else self.model.passive_faults)
+            for k, frame in enumerate(CANEncoder.encode_faults(faults)):
+                self._schedule(now + delay + k * FAULT_FRAME_INTERVAL / self.overdrive,
+                               id_requested, frame)
+
+    # -- Output --------------------------------------------------------------
+    def _encode(self, can_id: int, payload: bytes, direction: str, now: float) -> bytes:
+        if self.binary:
+            return encode_binary_frame(can_id, payload, direction, int((now - self._t0) * 1000))
+        return f"CanBus {direction} 0x{can_id:03X} {payload.hex(' ').upper()}\n".encode('ascii')
+
+    def _write(self, frames: List[tuple], now: float):
+        if not frames:
+            return
+        data = b''.join(self._encode(can_id, payload, direction, now)
+                        for can_id, payload, direction in frames)
+        try:
+            written = os.write(self.master_fd, data)
+        except BlockingIOError:
+            written = 0     # nobody is reading: the UART drops the bytes
+        self.frames_sent += len(frames)
+        self.bytes_sent += written
+        self.bytes_dropped += len(data) - written
+
+    def run(self, duration: Optional[float] = None):
+        """Blocking simulation loop until stop() or duration seconds"""
+        self.running = True
+        now = self._t0 = last_step = time.monotonic()
+        end = now + duration if duration else math.inf
+        self._start(now)
+
+        while self.running and now < end:
+            timeout = max(min(self._queue[0][0] if self._queue else end, end) - now, 0.0)
+            readable, _, _ = select.select([self.master_fd], [], [], min(timeout, 0.1))
+            now = time.monotonic()
+
+            echo = []
+            if readable:
+                try:
+                    data = os.read(self.master_fd, 4096)
+                except (BlockingIOError, OSError):
+                    data = b""
+                for line in self.framer.feed(data):
+                    echo += self.handle_line(line, now)
+
+            self.model.step(now - last_step, now)
+            last_step = now
+            self._write(echo + self._due_frames(now), now)
+
+        self.running = False
+
+    def stop(self):
+        self.running = False
+
+    def generate(self, duration: float, step: float = 0.01,
+                 ctl: Optional[CtlPacket] = CtlPacket(True, False, 16.0, 360.0, 17.0),
+                 commands: Optional[List[tuple]] = None) -> List[tuple]:
+        """
+        Offline traffic on virtual time (no pty): list of (t, can_id, payload, direction).
+        The model receives `ctl` at every step, so the charger is delivering power;
+        commands is a list of (t, line) handled as if written by the PC at time t.
+        """
+        traffic = []
+        pending = sorted(commands or [], key=lambda command: command[0])
+        now = self._t0 = 0.0
+        self._start(now)
+        while now < duration:
+            now += step
+            if ctl is not None:
+                self.model.apply_ctl(ctl, now)
+            self.model.step(step, now)
+            frames = []
+            while pending and pending[0][0] <= now:
+                frames += self.handle_line(pending.pop(0)[1], now)
+            frames += self._due_frames(now)
+            traffic.extend((now, can_id, payload, direction) for can_id, payload, direction in frames)
+        return traffic
+
+    def encode_stream(self, traffic: List[tuple]) -> bytes:
+        """Serial bytes for generate() output (ASCII or binary, as configured)"""
+        return b''.join(self._encode(can_id, payload, direction, t)
+                        for t, can_id, payload, direction in traffic)
+
+    def get_statistics(self) -> dict:
+        elapsed = max(time.monotonic() - self._t0, 1e-9)
+        return {
+            'port': self.port_name,
+            'frames_sent': self.frames_sent,
+            'frames_per_s': round(self.frames_sent / elapsed, 1),
+            'bytes_sent': self.bytes_sent,
+            'bytes_dropped': self.bytes_dropped,
+            'commands_received': self.commands_received,
+        }
+
+
+def _parse_rate(text: str):
+    """"0x611=50" -> (0x611, 0.05 s)"""
+    can_id, _, period_ms = text.partition('=')
+    return int(can_id, 16), float(period_ms) / 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Charger + gateway simulator on a pseudo-terminal")
+    parser.add_argument('--overdrive', type=float, default=1.0, help="multiply every rate by N")
+    parser.add_argument('--rate', action='append', type=_parse_rate, default=[],
+                        metavar="ID=MS", help="period override, e.g. 0x611=20 (0 = off)")
+    parser.add_argument('--binary', action='store_true', help="binary COBS frames instead of ASCII")
+    parser.add_argument('--noise', type=float, default=0.0, help="random-payload frames/s")
+    parser.add_argument('--duration', type=float, default=None)
+    parser.add_argument('--link', default=None, help="symlink to the pty, e.g. /tmp/ttyEVO")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    periods = dict(DEFAULT_PERIODS)
+    periods.update(args.rate)
+    sim = GatewaySimulator(periods, args.overdrive, args.binary, args.noise, args.seed)
+    print(f"Simulator on {sim.open(args.link)}  (Ctrl+C to stop)")
+    try:
+        sim.run(args.duration)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(sim.get_statistics())
+        if args.link and os.path.islink(args.link):
+            os.unlink(args.link)
+        sim.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,25 @@ from PyQt6.QtCore import Qt
 from .widgets import (ParameterDisplay, BooleanIndicator, GroupPanel, 
                       MessageInfoPanel, FaultListWidget, RawDataDisplay)
 from .can_decoder import *
+from .faults import FaultSet
+
+
+# Max temperature summary: stylesheet per colour band, built once (set only when the band changes)
+_TEMP_STATUS_QSS = {color: f"color: white; padding: 5px 10px; background-color: {color}; "
+                           f"border-radius: 3px; font-weight: bold;"
+                    for color in ("#4CAF50", "#FF9800", "#f44336")}
+
+
+def apply_flag_changes(indicators: dict, packet, changes):
+    """set_state only on the flags that changed; all of them without delta info (changes=None)"""
+    if changes is None:
+        for name, indicator in indicators.items():
+            indicator.set_state(getattr(packet, name))
+        return
+    for change in changes:
+        indicator = indicators.get(change.signal)
+        if indicator is not None:
+            indicator.set_state(change.new)
 
 
 class Level1Tab(QWidget):
@@ -80,6 +99,8 @@ class Level1Tab(QWidget):
         self.stat_warning_hv = BooleanIndicator("HV Warning", "orange", "gray")
         self.stat_bulks = BooleanIndicator("Bulk Error", "red", "gray")
         self.stat_raw = RawDataDisplay()
+        self.stat_flags = {name: getattr(self, f'stat_{name}') for name in (
+            'power_enable', 'error_latch', 'warn_limit', 'lim_temp', 'warning_hv', 'bulks')}
         
         # Info label for errorLatch
         self.error_latch_info = QLabel("INFO: When 'Failure Occurred' is active, check Level 2 tab for fault details")
@@ -149,6 +170,9 @@ class Level1Tab(QWidget):
         self.tst1_cooling_fail = BooleanIndicator("Cooling Fault", "red", "gray")
         
         self.tst1_raw = RawDataDisplay()
+        self.tst1_flags = {name: getattr(self, f'tst1_{name}') for name in (
+            'ack', 'pr_compl', 'pwr_ok', 'vout_ok', 'ovp', 'conn_open', 'rx618_fail',
+            'bulk1_fail', 'bulk2_fail', 'bulk3_fail', 'pump_on', 'fan_on', 'cooling_fail')}
         
         self.tst1_panel.add_widget(self.tst1_info)
         self.tst1_panel.add_separator()
@@ -200,15 +224,10 @@ class Level1Tab(QWidget):
         self.act1_iout.set_value(packet.iout_A)
         self.act1_raw.update_data(raw_data)
     
-    def update_stat(self, packet: StatPacket, can_id: int, raw_data: list):
+    def update_stat(self, packet: StatPacket, can_id: int, raw_data: list, changes=None):
         """Update STAT display"""
         self.stat_info.update_info(can_id, "STAT - Status")
-        self.stat_power_enable.set_state(packet.power_enable)
-        self.stat_error_latch.set_state(packet.error_latch)
-        self.stat_warn_limit.set_state(packet.warn_limit)
-        self.stat_lim_temp.set_state(packet.lim_temp)
-        self.stat_warning_hv.set_state(packet.warning_hv)
-        self.stat_bulks.set_state(packet.bulks)
+        apply_flag_changes(self.stat_flags, packet, changes)
         self.stat_raw.update_data(raw_data)
         
         # Show/hide info message based on errorLatch state
@@ -223,22 +242,10 @@ class Level1Tab(QWidget):
         self.act2_pilot_limit.set_value(packet.pilot_limit_A)
         self.act2_raw.update_data(raw_data)
     
-    def update_tst1(self, packet: Tst1Packet, can_id: int, raw_data: list):
+    def update_tst1(self, packet: Tst1Packet, can_id: int, raw_data: list, changes=None):
         """Update TST1 display"""
         self.tst1_info.update_info(can_id, "TST1 - Test/Diagnostic")
-        self.tst1_ack.set_state(packet.ack)
-        self.tst1_pr_compl.set_state(packet.pr_compl)
-        self.tst1_pwr_ok.set_state(packet.pwr_ok)
-        self.tst1_vout_ok.set_state(packet.vout_ok)
-        self.tst1_ovp.set_state(packet.ovp)
-        self.tst1_conn_open.set_state(packet.conn_open)
-        self.tst1_rx618_fail.set_state(packet.rx618_fail)
-        self.tst1_bulk1_fail.set_state(packet.bulk1_fail)
-        self.tst1_bulk2_fail.set_state(packet.bulk2_fail)
-        self.tst1_bulk3_fail.set_state(packet.bulk3_fail)
-        self.tst1_pump_on.set_state(packet.pump_on)
-        self.tst1_fan_on.set_state(packet.fan_on)
-        self.tst1_cooling_fail.set_state(packet.cooling_fail)
+        apply_flag_changes(self.tst1_flags, packet, changes)
         self.tst1_raw.update_data(raw_data)
 
 ########################################################################################################
@@ -251,6 +258,7 @@ class Level2Tab(QWidget):
         self.total_faults = 0
         self.active_faults = 0
         self.passive_faults = 0
+        self.fault_sets = {}    # can_id -> last FaultSet (FLTA/FLTP)
         self.setup_ui()
     
     def setup_ui(self):
@@ -390,28 +398,27 @@ class Level2Tab(QWidget):
         self.setLayout(main_layout)
     
     def update_fault(self, packet: FaultPacket, can_id: int, raw_data: list):
-        """Update Fault display"""
+        """Update Fault frame info (the list changes once per complete set: update_fault_set)"""
         is_active = can_id == 0x61D
         msg_name = "FLTA - Active Fault" if is_active else "FLTP - Passive Fault"
         self.fault_info.update_info(can_id, msg_name)
-        
-        if packet:  # Non "No Fault Detected"
-            fault_name = self.get_fault_name(packet.fault_code)
-            level_str = packet.failure_level.name
-            
-            self.fault_list.add_fault(
-                packet.fault_code,
-                fault_name,
-                packet.occurrence,
-                level_str,
-                packet.last_time_h
-            )
-        else:
-            self.fault_list.clear_faults()
-        
         self.fault_raw.update_data(raw_data)
+
+    def update_fault_set(self, fault_set: FaultSet):
+        """Replace the faults of one channel (active/passive) with a reassembled set"""
+        previous = self.fault_sets.get(fault_set.can_id)
+        if previous is not None and previous.faults == fault_set.faults:
+            return      # same answer as last time: nothing to redraw
+        self.fault_sets[fault_set.can_id] = fault_set
+
+        # Only the rows that changed are redrawn (FaultTableModel)
+        self.fault_list.set_faults(fault_set.is_active, [
+            (fault.fault_code, self.get_fault_name(fault.fault_code), fault.failure_level.name,
+             fault.occurrence, fault.last_time_h)
+            for fault in fault_set.faults
+        ])
         self._update_fault_counters()
-    
+
     def update_software(self, packet: SoftwarePacket, can_id: int, raw_data: list):
         """Update Software Version display"""
         self.sw_version_value.setText(f"v{packet.version}")
@@ -442,6 +449,7 @@ class Level2Tab(QWidget):
         
         if reply == QMessageBox.StandardButton.Yes:
             self.fault_list.clear_faults()
+            self.fault_sets.clear()
             self._update_fault_counters()
             QMessageBox.information(
                 self,
@@ -504,6 +512,7 @@ class Level2Tab(QWidget):
 class Level3Tab(QWidget):
     def __init__(self):
         super().__init__()
+        self.temp_status_color = None   # colour band applied to temp_status_label
         self.setup_ui()
     
     def setup_ui(self):
@@ -606,6 +615,9 @@ class Level3Tab(QWidget):
         self.stst1_cooling_fail2 = BooleanIndicator("Cooling Fail Stage 2", "red", "gray")
         self.stst1_cooling_fail3 = BooleanIndicator("Cooling Fail Stage 3", "red", "gray")
         self.stst1_raw = RawDataDisplay()
+        self.stst1_flags = {name: getattr(self, f'stst1_{name}') for name in (
+            'pfc_enable', 'log_temp_high', 'log_temp_low', 'bulk1_fail', 'bulk2_fail', 'bulk3_fail',
+            'cooling_fail1', 'cooling_fail2', 'cooling_fail3')}
         
         self.stst1_panel.add_widget(self.stst1_info)
         self.stst1_panel.add_separator()
@@ -671,20 +683,14 @@ class Level3Tab(QWidget):
         # Update summary with color coding
         temp_color = "#4CAF50" if max_temp < 60 else "#FF9800" if max_temp < 80 else "#f44336"
         self.temp_status_label.setText(f"Max Temp: {max_temp:.1f}°C")
-        self.temp_status_label.setStyleSheet(f"color: white; padding: 5px 10px; background-color: {temp_color}; border-radius: 3px; font-weight: bold;")
+        if temp_color != self.temp_status_color:
+            self.temp_status_color = temp_color
+            self.temp_status_label.setStyleSheet(_TEMP_STATUS_QSS[temp_color])
     
-    def update_stst1(self, packet: Stst1Packet, can_id: int, raw_data: list):
+    def update_stst1(self, packet: Stst1Packet, can_id: int, raw_data: list, changes=None):
         """Update STST1 display"""
         self.stst1_info.update_info(can_id, "STST1 - Real Time Diagnostic")
-        self.stst1_pfc_enable.set_state(packet.pfc_enable)
-        self.stst1_log_temp_high.set_state(packet.log_temp_high)
-        self.stst1_log_temp_low.set_state(packet.log_temp_low)
-        self.stst1_bulk1_fail.set_state(packet.bulk1_fail)
-        self.stst1_bulk2_fail.set_state(packet.bulk2_fail)
-        self.stst1_bulk3_fail.set_state(packet.bulk3_fail)
-        self.stst1_cooling_fail1.set_state(packet.cooling_fail1)
-        self.stst1_cooling_fail2.set_state(packet.cooling_fail2)
-        self.stst1_cooling_fail3.set_state(packet.cooling_fail3)
+        apply_flag_changes(self.stst1_flags, packet, changes)
         self.stst1_raw.update_data(raw_data)
     
     def update_act4(self, packet: Act4Packet, can_id: int, raw_data: list):
@@ -0,0 +1,205 @@
+"""
+Bounded transmit queue drained by a dedicated writer thread.
+
+put_frame() / put_line() never touch the port: they enqueue and return at
+once, so a stalled USB-serial adapter blocks only the writer thread, never
+the GUI or the CTL scheduler. The writer sends in priority order:
+
+    PRIORITY_CTL    CTL (0x618): the charger watchdog depends on it
+    PRIORITY_LINE   other frames and raw command lines
+    PRIORITY_BULK   REQ (0x61B) diagnostic requests
+
+A setpoint not yet written is superseded by a newer one with the same CAN
+ID (only the latest CTL matters); an identical REQ already queued is not
+queued twice. When the queue is full new entries are dropped and counted,
+except CTL, which always replaces its pending frame.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+from .can_decoder import CANDecoder
+from .metrics import LatencyStats
+from .parser import format_can_line
+
+
+PRIORITY_CTL = 0
+PRIORITY_LINE = 1
+PRIORITY_BULK = 2
+
+FRAME_PRIORITY = {CANDecoder.CAN_ID_CTL: PRIORITY_CTL, CANDecoder.CAN_ID_REQ: PRIORITY_BULK}
+SUPERSEDED_IDS = frozenset({CANDecoder.CAN_ID_CTL})     # latest payload wins
+
+TX_QUEUE_SIZE = 64
+
+
+class _Entry:
+    """One line waiting to be written (payload replaced when superseded)"""
+
+    __slots__ = ('line', 'key', 'enqueued')
+
+    def __init__(self, line: bytes, key, enqueued: float):
+        self.line = line
+        self.key = key
+        self.enqueued = enqueued
+
+
+class TxQueue:
+    """Priority TX queue; write(bytes) runs only in the writer thread"""
+
+    def __init__(self, write: Callable[[bytes], None], maxsize: int = TX_QUEUE_SIZE,
+                 on_error: Optional[Callable[[str], None]] = None):
+        self.write = write
+        self.maxsize = maxsize
+        self.on_error = on_error
+
+        self._cond = threading.Condition()
+        self._queues = (deque(), deque(), deque())      # one per priority
+        self._keyed: Dict[object, _Entry] = {}
+        self._size = 0
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._writing = False
+        self.reset_statistics()
+
+    # ------------------------------------------------------------------
+    # Producers (any thread)
+    # ------------------------------------------------------------------
+    def put_frame(self, can_id: int, data: bytes) -> bool:
+        """Queue one CAN frame. Return False if dropped (queue full)"""
+        line = f"{format_can_line(can_id, data)}\n".encode()
+        if can_id in SUPERSEDED_IDS:
+            key = can_id
+        elif can_id == CANDecoder.CAN_ID_REQ:
+            key = (can_id, bytes(data))
+        else:
+            key = None
+        return self._put(line, FRAME_PRIORITY.get(can_id, PRIORITY_LINE), key)
+
+    def put_line(self, message: str) -> bool:
+        """Queue one raw command line (no newline)"""
+        return self._put(f"{message}\n".encode(), PRIORITY_LINE, None)
+
+    def _put(self, line: bytes, priority: int, key) -> bool:
+        now = time.perf_counter()
+        with self._cond:
+            entry = self._keyed.get(key) if key is not None else None
+            if entry is not None:
+                # Not written yet: the new payload takes its place in the queue
+                entry.line = line
+                self.coalesced += 1
+                return True
+            if self._size >= self.maxsize and priority != PRIORITY_CTL:
+                self.dropped += 1
+                return False
+            entry = _Entry(line, key, now)
+            self._queues[priority].append(entry)
+            if key is not None:
+                self._keyed[key] = entry
+            self._size += 1
+            self.max_depth = max(self.max_depth, self._size)
+            self._cond.notify()
+            return True
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+    def _pop(self) -> Optional[_Entry]:
+        """Highest-priority entry, waiting for one; None when stopped (lock held)"""
+        while self._running:
+            for queue in self._queues:
+                if queue:
+                    entry = queue.popleft()
+                    if entry.key is not None:
+                        del self._keyed[entry.key]
+                    self._size -= 1
+                    return entry
+            self._cond.wait()
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()     # flush()
+                entry = self._pop()
+                if entry is None:
+                    break
+                self._writing = True
+            start = time.perf_counter()
+            try:
+                self.write(entry.line)
+            except OSError as e:    # serial.SerialException, SerialTimeoutException
+                self.write_errors += 1
+                if self.on_error is not None:
+                    self.on_error(f"Errore invio: {e}")
+                continue
+            end = time.perf_counter()
+            self.frames_written += 1
+            self.write_latency.add(end - start)
+            self.queue_latency.add(end - entry.enqueued)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="tx-writer", daemon=True)
+        self._thread.start()
+
+    def flush(self, timeout: float = 1.0) -> bool:
+        """Wait until everything queued has been written. Return False on timeout"""
+        with self._cond:
+            if not self.running:
+                return self._size == 0
+            return self._cond.wait_for(lambda: not self._size and not self._writing, timeout)
+
+    def stop(self, timeout: float = 1.0):
+        """Stop the writer (a write in progress finishes or times out) and drop what is queued"""
+        with self._cond:
+            self._running = False
+            self.clear()
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def clear(self):
+        with self._cond:
+            for queue in self._queues:
+                queue.clear()
+            self._keyed.clear()
+            self._size = 0
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+    @property
+    def depth(self) -> int:
+        return self._size
+
+    def reset_statistics(self):
+        self.frames_written = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self.max_depth = 0
+        self.write_latency = LatencyStats()     # time inside serial write()
+        self.queue_latency = LatencyStats()     # put -> written
+
+    def get_statistics(self) -> dict:
+        return {
+            'tx_queue_depth': self._size,
+            'tx_queue_max_depth': self.max_depth,
+            'tx_frames_written': self.frames_written,
+            'tx_coalesced': self.coalesced,
+            'tx_dropped': self.dropped,
+            'tx_write_errors': self.write_errors,
+            'tx_write_latency': str(self.write_latency),
+            'tx_queue_latency': str(self.queue_latency),
+        }
@@ -1,18 +1,60 @@
 from PyQt6.QtWidgets import (QWidget, QLabel, QVBoxLayout, QHBoxLayout,
-                              QGroupBox, QGridLayout, QFrame)
-from PyQt6.QtCore import Qt, pyqtSignal
+                              QGroupBox, QGridLayout, QFrame, QTableView, QAbstractItemView)
+from PyQt6.QtCore import Qt, pyqtSignal, QAbstractTableModel, QModelIndex
 from PyQt6.QtGui import QFont, QColor, QPalette
 from datetime import datetime
+from typing import Dict, List, Tuple
+
+
+class UpdateCounter:
+    """Updates applied / skipped because the widget already showed that state"""
+
+    __slots__ = ('applied', 'skipped')
+
+    def __init__(self):
+        self.applied = 0
+        self.skipped = 0
+
+    def __str__(self):
+        return f"{self.applied} applied, {self.skipped} skipped"
+
+
+def widget_update_statistics() -> dict:
+    """Per widget class: updates that reached Qt vs redundant ones skipped"""
+    return {f"{cls.__name__}_updates": str(cls.counter)
+            for cls in (ParameterDisplay, BooleanIndicator, MessageInfoPanel, RawDataDisplay)}
+
+
+def reset_widget_update_statistics():
+    for cls in (ParameterDisplay, BooleanIndicator, MessageInfoPanel, RawDataDisplay):
+        cls.counter = UpdateCounter()
+
+
+# LED colour -> QPalette, built once: set_state swaps palettes instead of parsing a stylesheet
+_LED_PALETTES = {}
+
+
+def led_palette(color: str, base: QPalette) -> QPalette:
+    palette = _LED_PALETTES.get(color)
+    if palette is None:
+        palette = QPalette(base)
+        palette.setColor(QPalette.ColorRole.WindowText, QColor(color))
+        _LED_PALETTES[color] = palette
+    return palette
 
 
 class ParameterDisplay(QWidget):
     """Widget per visualizzare un singolo parametro con label e valore"""
+
+    counter = UpdateCounter()
     
     def __init__(self, name: str, unit: str = "", decimals: int = 1):
         super().__init__()
         self.name = name
         self.unit = unit
         self.decimals = decimals
+        self._value = None      # last value shown (None = "---")
+        self._text = "---"
         
         self.setup_ui()
     
@@ -39,29 +81,41 @@ class ParameterDisplay(QWidget):
         self.setLayout(layout)
     
     def set_value(self, value: float):
-        """Aggiorna il valore visualizzato"""
+        """Aggiorna il valore visualizzato (solo se cambia il testo)"""
+        if value == self._value:
+            self.counter.skipped += 1
+            return
+        self._value = value
         if self.unit:
             text = f"{value:.{self.decimals}f} {self.unit}"
         else:
             text = f"{value:.{self.decimals}f}"
-        
+        if text == self._text:
+            self.counter.skipped += 1   # same after rounding
+            return
+        self._text = text
+        self.counter.applied += 1
         self.value_label.setText(text)
     
     def clear(self):
         """Reset del valore"""
+        self._value = None
+        self._text = "---"
         self.value_label.setText("---")
         self.value_label.setStyleSheet("")
 
 
 class BooleanIndicator(QWidget):
     """Widget per visualizzare uno stato booleano con LED colorato (x flags)"""
+
+    counter = UpdateCounter()
     
     def __init__(self, name: str, true_color: str = "green", false_color: str = "gray"):
         super().__init__()
         self.name = name
         self.true_color = true_color
         self.false_color = false_color
-        self.state = False
+        self.state = None       # nothing drawn yet
         
         self.setup_ui()
     
@@ -84,12 +138,18 @@ class BooleanIndicator(QWidget):
         layout.addStretch()
         
         self.setLayout(layout)
+        self._palettes = (led_palette(self.false_color, self.led.palette()),
+                          led_palette(self.true_color, self.led.palette()))
         self.set_state(False)
     
     def set_state(self, state: bool):
+        state = bool(state)
+        if state is self.state:
+            self.counter.skipped += 1
+            return
         self.state = state
-        color = self.true_color if state else self.false_color
-        self.led.setStyleSheet(f"color: {color};")
+        self.counter.applied += 1
+        self.led.setPalette(self._palettes[state])
     
     def clear(self):
         self.set_state(False)
@@ -132,9 +192,13 @@ class GroupPanel(QGroupBox):
 
 class MessageInfoPanel(QWidget):
     """Pannello per visualizzare info generali sul messaggio"""
+
+    counter = UpdateCounter()
     
     def __init__(self):
         super().__init__()
+        self._message = None    # (can_id, message_name) shown
+        self._time_text = ""
         self.setup_ui()
     
     def setup_ui(self):
@@ -154,21 +218,137 @@ class MessageInfoPanel(QWidget):
         self.setLayout(layout)
     
     def update_info(self, can_id: int, message_name: str):
-        self.timestamp_label.setText(f"Last Update: {datetime.now().strftime('%H:%M:%S.%f')[:-3]}")
+        time_text = datetime.now().strftime('%H:%M:%S.%f')[:-3]
+        if time_text != self._time_text:
+            self._time_text = time_text
+            self.timestamp_label.setText(f"Last Update: {time_text}")
+        if (can_id, message_name) == self._message:
+            self.counter.skipped += 1   # only the time changed
+            return
+        self._message = (can_id, message_name)
+        self.counter.applied += 1
         self.can_id_label.setText(f"CAN ID: 0x{can_id:03X} - {message_name}")
     
     def reset(self):
+        self._message = None
+        self._time_text = ""
         self.timestamp_label.setText("Last Update: ---")
         self.can_id_label.setText("CAN ID: ---")
 
 
+class FaultTableModel(QAbstractTableModel):
+    """
+    Faults as table rows, indexed by (channel, code).
+
+    upsert() is O(1) for a known fault and emits dataChanged for its row
+    only; active faults are kept above passive ones. Counters are kept up to
+    date at every insert/remove, not recounted.
+    """
+
+    COLUMNS = ("Channel", "Code", "Fault", "Level", "Occurrences", "Last")
+    LEVEL_COLORS = {'HARD': QColor("red"), 'SOFT': QColor("orange")}
+    OTHER_COLOR = QColor("#C8A400")     # yellow, readable on white
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: List[list] = []     # [is_active, code, name, level, occurrence, last_time_h]
+        self._index: Dict[Tuple[bool, int], int] = {}   # (is_active, code) -> row
+        self.active_count = 0
+        self.updates = UpdateCounter()
+
+    # -- Qt model interface ----------------------------------------------
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        is_active, code, name, level, occurrence, last_time_h = self._rows[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return ("Active" if is_active else "Passive", f"0x{code:02X}", name, level,
+                    occurrence, f"{last_time_h}h ago")[column]
+        if role == Qt.ItemDataRole.ForegroundRole and column == 3:
+            return self.LEVEL_COLORS.get(level.upper(), self.OTHER_COLOR)
+        return None
+
+    # -- Updates ----------------------------------------------------------
+    def upsert(self, is_active: bool, code: int, name: str, level: str,
+               occurrence: int, last_time_h: int):
+        """Add the fault or update its row (dataChanged on that row only if something changed)"""
+        key = (is_active, code)
+        record = [is_active, code, name, level, occurrence, last_time_h]
+        row = self._index.get(key)
+        if row is not None:
+            if self._rows[row] == record:
+                self.updates.skipped += 1
+                return
+            self._rows[row] = record
+            self.updates.applied += 1
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.COLUMNS) - 1))
+            return
+
+        # New fault: active ones at the end of the active block, passive ones at the end
+        row = self.active_count if is_active else len(self._rows)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._rows.insert(row, record)
+        self._shift_index(row, +1)
+        self._index[key] = row
+        if is_active:
+            self.active_count += 1
+        self.endInsertRows()
+        self.updates.applied += 1
+
+    def remove(self, is_active: bool, code: int):
+        row = self._index.pop((is_active, code), None)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        self._shift_index(row + 1, -1)
+        if is_active:
+            self.active_count -= 1
+        self.endRemoveRows()
+
+    def _shift_index(self, from_row: int, delta: int):
+        """Rows from from_row moved by delta (structural changes only)"""
+        for key, row in self._index.items():
+            if row >= from_row:
+                self._index[key] = row + delta
+
+    def set_channel(self, is_active: bool, faults: List[tuple]):
+        """Make the channel contain exactly `faults` = [(code, name, level, occurrence, last_time_h)]"""
+        codes = {fault[0] for fault in faults}
+        for key in [key for key in self._index if key[0] == is_active and key[1] not in codes]:
+            self.remove(*key)
+        for code, name, level, occurrence, last_time_h in faults:
+            self.upsert(is_active, code, name, level, occurrence, last_time_h)
+
+    def clear(self):
+        self.beginResetModel()
+        self._rows.clear()
+        self._index.clear()
+        self.active_count = 0
+        self.endResetModel()
+
+    def codes(self, is_active: bool) -> List[int]:
+        return [code for (active, code) in self._index if active == is_active]
+
+
 class FaultListWidget(QWidget):
-    """Widget per visualizzare lista di fault correnti"""
+    """Widget per visualizzare lista di fault correnti (tabella su FaultTableModel)"""
     
     def __init__(self):
         super().__init__()
-        self.faults = []
-        self.fault_info = []  # Store fault metadata
+        self.model = FaultTableModel(self)
         self.setup_ui()
     
     def setup_ui(self):
@@ -181,109 +361,65 @@ class FaultListWidget(QWidget):
         font.setPointSize(11)
         title.setFont(font)
         
-        # Fault area
-        self.fault_container = QVBoxLayout()
-        
         # Label "no faults"
         self.no_fault_label = QLabel("No faults detected")
         self.no_fault_label.setStyleSheet("color: green; font-style: italic;")
-        self.fault_container.addWidget(self.no_fault_label)
+
+        # Fault table
+        self.view = QTableView()
+        self.view.setModel(self.model)
+        self.view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.view.verticalHeader().setVisible(False)
+        self.view.horizontalHeader().setStretchLastSection(True)
+        self.view.setMinimumHeight(150)
+        self.view.hide()
+        self.model.rowsInserted.connect(self._update_placeholder)
+        self.model.rowsRemoved.connect(self._update_placeholder)
+        self.model.modelReset.connect(self._update_placeholder)
         
         layout.addWidget(title)
-        layout.addLayout(self.fault_container)
-        layout.addStretch()
+        layout.addWidget(self.no_fault_label)
+        layout.addWidget(self.view)
         
         self.setLayout(layout)
+
+    def _update_placeholder(self, *args):
+        empty = self.model.rowCount() == 0
+        self.no_fault_label.setVisible(empty)
+        self.view.setVisible(not empty)
     
     def add_fault(self, fault_code: int, fault_name: str, occurrence: int, 
-                  failure_level: str, last_time_h: int):
+                  failure_level: str, last_time_h: int, is_active: bool = None):
+        # FLTA/FLTP channel when known, otherwise assume HARD = active
+        if is_active is None:
+            is_active = 'HARD' in failure_level.upper()
+        self.model.upsert(is_active, fault_code, fault_name, failure_level, occurrence, last_time_h)
 
-        if self.no_fault_label.parent():
-            self.fault_container.removeWidget(self.no_fault_label)
-            self.no_fault_label.hide()
-        
-        # Store fault metadata (check if already exists)
-        fault_key = (fault_code, fault_name)
-        existing_index = None
-        for i, info in enumerate(self.fault_info):
-            if (info['code'], info['name']) == fault_key:
-                existing_index = i
-                break
-        
-        if existing_index is not None:
-            # Update existing fault
-            self.fault_info[existing_index].update({
-                'occurrence': occurrence,
-                'level': failure_level,
-                'last_time_h': last_time_h
-            })
-            # Update widget display
-            fault_widget = self.faults[existing_index]
-            fault_widget.setTitle(f"Fault 0x{fault_code:02X}: {fault_name}")
-            details_label = fault_widget.findChild(QLabel)
-            if details_label:
-                details_label.setText(
-                    f"Occurrences: {occurrence}\n"
-                    f"Level: {failure_level}\n"
-                    f"Last: {last_time_h}h ago"
-                )
-        else:
-            # Add new fault
-            self.fault_info.append({
-                'code': fault_code,
-                'name': fault_name,
-                'occurrence': occurrence,
-                'level': failure_level,
-                'last_time_h': last_time_h,
-                'is_active': 'HARD' in failure_level.upper()  # Assume HARD = active
-            })
-            
-            fault_widget = QGroupBox(f"Fault 0x{fault_code:02X}: {fault_name}")
-            fault_layout = QVBoxLayout()
-
-            details = QLabel(
-                f"Occurrences: {occurrence}\n"
-                f"Level: {failure_level}\n"
-                f"Last: {last_time_h}h ago"
-            )
-
-            if "HARD" in failure_level.upper():
-                fault_widget.setStyleSheet("border: 2px solid red;")
-            elif "SOFT" in failure_level.upper():
-                fault_widget.setStyleSheet("border: 2px solid orange;")
-            else:
-                fault_widget.setStyleSheet("border: 2px solid yellow;")
-            
-            fault_layout.addWidget(details)
-            fault_widget.setLayout(fault_layout)
-            
-            self.fault_container.addWidget(fault_widget)
-            self.faults.append(fault_widget)
+    def set_faults(self, is_active: bool, faults: List[tuple]):
+        """Replace one channel: [(code, name, level, occurrence, last_time_h)]"""
+        self.model.set_channel(is_active, faults)
     
     def clear_faults(self):
-        for fault in self.faults:
-            self.fault_container.removeWidget(fault)
-            fault.deleteLater()
-        
-        self.faults.clear()
-        self.fault_info.clear()
-        self.no_fault_label.show()
-        self.fault_container.addWidget(self.no_fault_label)
+        self.model.clear()
     
     def get_fault_count(self) -> int:
         """Return the total number of faults"""
-        return len(self.fault_info)
+        return self.model.rowCount()
     
     def get_active_fault_count(self) -> int:
-        """Return the number of active (HARD) faults"""
-        return sum(1 for fault in self.fault_info if fault.get('is_active', False))
+        """Return the number of active faults"""
+        return self.model.active_count
 
 
 class RawDataDisplay(QWidget):
     """Widget per visualizzare i dati grezzo del messaggio CAN (valore pacchetto)"""
+
+    counter = UpdateCounter()
     
     def __init__(self):
         super().__init__()
+        self._data = None       # payload shown
         self.setup_ui()
     
     def setup_ui(self):
@@ -303,9 +439,15 @@ class RawDataDisplay(QWidget):
         self.setLayout(layout)
     
     def update_data(self, data: list):
-        hex_str = ' '.join(f'{b:02X}' for b in data)
-        self.data_label.setText(f"[{hex_str}]")
+        data = bytes(data)
+        if data == self._data:
+            self.counter.skipped += 1
+            return
+        self._data = data
+        self.counter.applied += 1
+        self.data_label.setText(f"[{data.hex(' ').upper()}]")
     
     def clear(self):
         """Reset dei dati"""
+        self._data = None
         self.data_label.setText("---")
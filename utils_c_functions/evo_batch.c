@@ -0,0 +1,207 @@
+/* =============================================================================
+ *  FILE: evo_batch.c
+ * =============================================================================
+ *
+ *  Batch entry point over the CanBus_DecodePacket_* routines of the level
+ *  files, for the optional accelerator (charger_gui/accel.py, ctypes).
+ *
+ *  The level files are included as they are: their example main() is
+ *  renamed, nothing else changes. Build (done by python -m charger_gui.accel --build):
+ *      cc -O2 -shared -fPIC -o charger_gui/_evo_batch.so utils_c_functions/evo_batch.c
+ *
+ * =============================================================================
+ */
+
+#include <stddef.h>
+
+#define main evo_example_main_level1
+#include "utils_canBus_charger_level1.c"
+#undef main
+#define main evo_example_main_level2
+#include "utils_canBus_charger_level2.c"
+#undef main
+#define main evo_example_main_level3
+#include "utils_canBus_charger_level3.c"
+#undef main
+#define main evo_example_main_level4
+#include "utils_canBus_charger_level4.c"
+#undef main
+
+#if defined(_WIN32)
+#define EVO_EXPORT __declspec(dllexport)
+#else
+#define EVO_EXPORT
+#endif
+
+/* Packet struct layout, read by Python to build the numpy dtype
+ * kind: 'b' bool, 'u' unsigned int, 'e' enum (signed int), 'f' float, 's' char[] */
+typedef struct {
+    const char *name;
+    uint32_t offset;
+    uint32_t size;
+    char kind;
+} EVO_Field_t;
+
+#define FIELD(T, f, kind) { #f, (uint32_t)offsetof(T, f), (uint32_t)sizeof(((T *)0)->f), kind }
+
+static const EVO_Field_t STAT_FIELDS[] = {
+    FIELD(CanPacket_Stat_t, power_enable, 'b'), FIELD(CanPacket_Stat_t, error_latch, 'b'),
+    FIELD(CanPacket_Stat_t, warn_limit, 'b'),   FIELD(CanPacket_Stat_t, lim_temp, 'b'),
+    FIELD(CanPacket_Stat_t, warning_hv, 'b'),   FIELD(CanPacket_Stat_t, bulks, 'b'),
+};
+
+static const EVO_Field_t ACT1_FIELDS[] = {
+    FIELD(CanPacket_Act1_t, iac_A, 'f'),  FIELD(CanPacket_Act1_t, temp_C, 'f'),
+    FIELD(CanPacket_Act1_t, vout_V, 'f'), FIELD(CanPacket_Act1_t, iout_A, 'f'),
+};
+
+static const EVO_Field_t ACT2_FIELDS[] = {
+    FIELD(CanPacket_Act2_t, temp_loglv_C, 'f'), FIELD(CanPacket_Act2_t, ac_power_kW, 'f'),
+    FIELD(CanPacket_Act2_t, prox_limit_A, 'f'), FIELD(CanPacket_Act2_t, pilot_limit_A, 'f'),
+};
+
+static const EVO_Field_t TST1_FIELDS[] = {
+    FIELD(CanPacket_Tst1_t, ack, 'b'),          FIELD(CanPacket_Tst1_t, pr_compl, 'b'),
+    FIELD(CanPacket_Tst1_t, pwr_ok, 'b'),       FIELD(CanPacket_Tst1_t, vout_ok, 'b'),
+    FIELD(CanPacket_Tst1_t, neutral, 'b'),      FIELD(CanPacket_Tst1_t, led3, 'b'),
+    FIELD(CanPacket_Tst1_t, led618, 'b'),       FIELD(CanPacket_Tst1_t, ovp, 'b'),
+    FIELD(CanPacket_Tst1_t, conn_open, 'b'),    FIELD(CanPacket_Tst1_t, ther_fail, 'b'),
+    FIELD(CanPacket_Tst1_t, rx618_fail, 'b'),   FIELD(CanPacket_Tst1_t, bulk1_fail, 'b'),
+    FIELD(CanPacket_Tst1_t, bulk2_fail, 'b'),   FIELD(CanPacket_Tst1_t, bulk3_fail, 'b'),
+    FIELD(CanPacket_Tst1_t, pump_on, 'b'),      FIELD(CanPacket_Tst1_t, fan_on, 'b'),
+    FIELD(CanPacket_Tst1_t, hv_rx_fail, 'b'),   FIELD(CanPacket_Tst1_t, cooling_fail, 'b'),
+    FIELD(CanPacket_Tst1_t, rx619_fail, 'b'),   FIELD(CanPacket_Tst1_t, neutro1, 'b'),
+    FIELD(CanPacket_Tst1_t, neutro2, 'b'),      FIELD(CanPacket_Tst1_t, three_phase, 'b'),
+    FIELD(CanPacket_Tst1_t, iac_fail, 'b'),     FIELD(CanPacket_Tst1_t, ignition, 'b'),
+    FIELD(CanPacket_Tst1_t, lv_battery_np, 'b'), FIELD(CanPacket_Tst1_t, prox_ok, 'b'),
+    FIELD(CanPacket_Tst1_t, pilot_ok, 'b'),     FIELD(CanPacket_Tst1_t, s2_ok, 'b'),
+    FIELD(CanPacket_Tst1_t, cnt_hours, 'u'),
+};
+
+static const EVO_Field_t FAULT_FIELDS[] = {
+    FIELD(CanPacket_Fault_t, frame_type, 'e'),   FIELD(CanPacket_Fault_t, total_errors, 'u'),
+    FIELD(CanPacket_Fault_t, frame_number, 'u'), FIELD(CanPacket_Fault_t, fault_code, 'u'),
+    FIELD(CanPacket_Fault_t, occurrence, 'u'),   FIELD(CanPacket_Fault_t, failure_level, 'e'),
+    FIELD(CanPacket_Fault_t, first_time_h, 'u'), FIELD(CanPacket_Fault_t, last_time_h, 'u'),
+};
+
+static const EVO_Field_t SW_FIELDS[] = { FIELD(CanPacket_Software_t, version, 's') };
+static const EVO_Field_t SN_FIELDS[] = { FIELD(CanPacket_SerialNumber_t, serial, 's') };
+
+static const EVO_Field_t ACT3_FIELDS[] = {
+    FIELD(CanPacket_Act3_t, fan_voltage_V, 'f'), FIELD(CanPacket_Act3_t, iacm1_A, 'f'),
+    FIELD(CanPacket_Act3_t, iacm2_A, 'f'),       FIELD(CanPacket_Act3_t, iacm3_A, 'f'),
+};
+
+static const EVO_Field_t TEMP_FIELDS[] = {
+    FIELD(CanPacket_Temp_t, temp_loghv_C, 'f'),  FIELD(CanPacket_Temp_t, temp_power1_C, 'f'),
+    FIELD(CanPacket_Temp_t, temp_power2_C, 'f'), FIELD(CanPacket_Temp_t, temp_power3_C, 'f'),
+};
+
+static const EVO_Field_t ACT4_FIELDS[] = {
+    FIELD(CanPacket_Act4_t, temp_logfan_C, 'f'), FIELD(CanPacket_Act4_t, iout1_raw, 'u'),
+    FIELD(CanPacket_Act4_t, iout2_raw, 'u'),     FIELD(CanPacket_Act4_t, iout3_raw, 'u'),
+};
+
+static const EVO_Field_t STST1_FIELDS[] = {
+    FIELD(CanPacket_Stst1_t, pfc_enable, 'b'),    FIELD(CanPacket_Stst1_t, log_temp_high, 'b'),
+    FIELD(CanPacket_Stst1_t, log_temp_low, 'b'),  FIELD(CanPacket_Stst1_t, uvlo_log, 'b'),
+    FIELD(CanPacket_Stst1_t, ther_low_fail, 'b'), FIELD(CanPacket_Stst1_t, rx618_fail, 'b'),
+    FIELD(CanPacket_Stst1_t, bulk1_fail, 'b'),    FIELD(CanPacket_Stst1_t, bulk2_fail, 'b'),
+    FIELD(CanPacket_Stst1_t, bulk3_fail, 'b'),    FIELD(CanPacket_Stst1_t, cooling_fail1, 'b'),
+    FIELD(CanPacket_Stst1_t, cooling_fail2, 'b'), FIELD(CanPacket_Stst1_t, cooling_fail3, 'b'),
+    FIELD(CanPacket_Stst1_t, uvlo_log_lv, 'b'),   FIELD(CanPacket_Stst1_t, bat_over, 'b'),
+    FIELD(CanPacket_Stst1_t, bat_under, 'b'),
+};
+
+static const EVO_Field_t TST2_FIELDS[] = {
+    FIELD(CanPacket_Tst2_t, baudrate, 'e'),       FIELD(CanPacket_Tst2_t, id_type, 'e'),
+    FIELD(CanPacket_Tst2_t, iac_control, 'e'),    FIELD(CanPacket_Tst2_t, range, 'e'),
+    FIELD(CanPacket_Tst2_t, three_phase, 'b'),    FIELD(CanPacket_Tst2_t, slave, 'b'),
+    FIELD(CanPacket_Tst2_t, evc_model, 'e'),      FIELD(CanPacket_Tst2_t, id_setting, 'e'),
+    FIELD(CanPacket_Tst2_t, air_cooler, 'b'),     FIELD(CanPacket_Tst2_t, parallel_ctrl, 'b'),
+    FIELD(CanPacket_Tst2_t, iacm_max_set_A, 'f'), FIELD(CanPacket_Tst2_t, vout_max_set_V, 'f'),
+    FIELD(CanPacket_Tst2_t, iout_max_set_A, 'f'), FIELD(CanPacket_Tst2_t, password, 'u'),
+};
+
+#define COUNT(a) (sizeof(a) / sizeof((a)[0]))
+
+/**
+ * @brief Layout of the packet struct decoded for can_id
+ * @param size  struct size in bytes (output)
+ * @param count number of fields (output)
+ * @return field table, NULL if there is no C decoder for can_id
+ */
+EVO_EXPORT const EVO_Field_t *EVO_PacketLayout(uint16_t can_id, uint32_t *size, uint32_t *count) {
+    switch (can_id) {
+    case CAN_ID_STAT:  *size = sizeof(CanPacket_Stat_t);  *count = COUNT(STAT_FIELDS);  return STAT_FIELDS;
+    case CAN_ID_ACT1:  *size = sizeof(CanPacket_Act1_t);  *count = COUNT(ACT1_FIELDS);  return ACT1_FIELDS;
+    case CAN_ID_ACT2:  *size = sizeof(CanPacket_Act2_t);  *count = COUNT(ACT2_FIELDS);  return ACT2_FIELDS;
+    case CAN_ID_TST1:  *size = sizeof(CanPacket_Tst1_t);  *count = COUNT(TST1_FIELDS);  return TST1_FIELDS;
+    case CAN_ID_FLTA:
+    case CAN_ID_FLTP:  *size = sizeof(CanPacket_Fault_t); *count = COUNT(FAULT_FIELDS); return FAULT_FIELDS;
+    case CAN_ID_SW:    *size = sizeof(CanPacket_Software_t); *count = COUNT(SW_FIELDS); return SW_FIELDS;
+    case CAN_ID_SN:    *size = sizeof(CanPacket_SerialNumber_t); *count = COUNT(SN_FIELDS); return SN_FIELDS;
+    case CAN_ID_ACT3:  *size = sizeof(CanPacket_Act3_t);  *count = COUNT(ACT3_FIELDS);  return ACT3_FIELDS;
+    case CAN_ID_TEMP:  *size = sizeof(CanPacket_Temp_t);  *count = COUNT(TEMP_FIELDS);  return TEMP_FIELDS;
+    case CAN_ID_ACT4:  *size = sizeof(CanPacket_Act4_t);  *count = COUNT(ACT4_FIELDS);  return ACT4_FIELDS;
+    case CAN_ID_STST1: *size = sizeof(CanPacket_Stst1_t); *count = COUNT(STST1_FIELDS); return STST1_FIELDS;
+    case CAN_ID_TST2:  *size = sizeof(CanPacket_Tst2_t);  *count = COUNT(TST2_FIELDS);  return TST2_FIELDS;
+    default:
+        *size = 0;
+        *count = 0;
+        return NULL;
+    }
+}
+
+#define DECODE_ALL(T, decode)                                   \
+    do {                                                        \
+        T *packets = (T *)out;                                  \
+        for (size_t i = 0; i < count; i++) {                    \
+            memset(&packets[i], 0, sizeof(T));                  \
+            decode(payloads + i * stride, &packets[i]);         \
+        }                                                       \
+    } while (0)
+
+/**
+ * @brief Decodifica `count` payload della stessa CAN ID in un array di struct
+ *
+ * @param can_id   CAN ID of every payload
+ * @param payloads count payloads of 8 bytes, `stride` bytes apart
+ * @param stride   distance between two payloads (8 for a packed (N, 8) array)
+ * @param count    number of payloads
+ * @param out      count structs of the size given by EVO_PacketLayout
+ * @return number of decoded packets, -1 if there is no C decoder for can_id
+ */
+EVO_EXPORT long EVO_DecodeBatch(uint16_t can_id, const uint8_t *payloads, size_t stride,
+                                size_t count, void *out) {
+    switch (can_id) {
+    case CAN_ID_STAT:  DECODE_ALL(CanPacket_Stat_t, CanBus_DecodePacket_Stat); break;
+    case CAN_ID_ACT1:  DECODE_ALL(CanPacket_Act1_t, CanBus_DecodePacket_Act1); break;
+    case CAN_ID_ACT2:  DECODE_ALL(CanPacket_Act2_t, CanBus_DecodePacket_Act2); break;
+    case CAN_ID_TST1:  DECODE_ALL(CanPacket_Tst1_t, CanBus_DecodePacket_Tst1); break;
+    case CAN_ID_FLTA:
+    case CAN_ID_FLTP: {
+        DECODE_ALL(CanPacket_Fault_t, CanBus_DecodePacket_Fault);
+        /* Level bits 01 are left unset by CanBus_DecodePacket_Fault:
+         * same table as the Python decoder (00 and 01 -> Warning) */
+        CanPacket_Fault_t *faults = (CanPacket_Fault_t *)out;
+        for (size_t i = 0; i < count; i++) {
+            if ((payloads[i * stride + 3] & 0x03) == 0x01) {
+                faults[i].failure_level = FAILURE_WARNING;
+            }
+        }
+        break;
+    }
+    case CAN_ID_SW:    DECODE_ALL(CanPacket_Software_t, CanBus_DecodePacket_Software); break;
+    case CAN_ID_SN:    DECODE_ALL(CanPacket_SerialNumber_t, CanBus_DecodePacket_SerialNumber); break;
+    case CAN_ID_ACT3:  DECODE_ALL(CanPacket_Act3_t, CanBus_DecodePacket_Act3); break;
+    case CAN_ID_TEMP:  DECODE_ALL(CanPacket_Temp_t, CanBus_DecodePacket_Temp); break;
+    case CAN_ID_ACT4:  DECODE_ALL(CanPacket_Act4_t, CanBus_DecodePacket_Act4); break;
+    case CAN_ID_STST1: DECODE_ALL(CanPacket_Stst1_t, CanBus_DecodePacket_Stst1); break;
+    case CAN_ID_TST2:  DECODE_ALL(CanPacket_Tst2_t, CanBus_DecodePacket_Tst2); break;
+    default:
+        return -1;
+    }
+    return (long)count;
+}
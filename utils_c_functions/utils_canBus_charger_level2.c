@@ -174,7 +174,7 @@ bool CanBus_Request_SerialNumber(uint8_t data[8]) {
  * 
  * Formato: 8 byte
  * D0: Frame type (bit 7-6) + Total errors (bit 5-0)
- * D1: Frame number (bit 7-2)
+ * D1: Frame number (bit 5-0)
  * D2: Fault code (8 bit)
  * D3: Occurrence (bit 7-2) + Failure level (bit 1-0)
  * D4-D5: First time (16-bit, Big Endian)
@@ -191,8 +191,8 @@ bool CanBus_DecodePacket_Fault(const uint8_t data[8], CanPacket_Fault_t *fault)
     fault->frame_type = (FrameType_t)((data[0] >> 6) & 0x03);
     fault->total_errors = data[0] & 0x3F;  /* 6 bit: 0-63 */
     
-    /* D1: Frame number (bit 7-2) - Note: inizia da 1, non da 0 */
-    fault->frame_number = (data[1] >> 2) & 0x3F;  /* 6 bit: 1-63 */
+    /* D1: Frame number (bit 5-0) - Note: inizia da 1, non da 0 */
+    fault->frame_number = data[1] & 0x3F;  /* 6 bit: 1-63 */
     
     /* D2: Fault code */
     fault->fault_code = data[2];
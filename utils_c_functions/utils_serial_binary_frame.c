@@ -0,0 +1,221 @@
+/* =============================================================================
+ *  FILE: utils_serial_binary_frame.c
+ * =============================================================================
+ *
+ *  Gateway STM32 → PC - Framing seriale binario (COBS + CRC16)
+ *  Alternativa compatta al formato ASCII "CanBus Rx 0x611 12 34 ..."
+ *
+ *  La GUI riconosce automaticamente il formato (charger_gui/framing.py):
+ *  il formato ASCII non contiene mai il byte 0x00, ogni frame binario
+ *  termina con 0x00.
+ *
+ * =============================================================================
+ */
+
+
+#include <stdio.h>
+#include <stdint.h>
+#include <stdbool.h>
+#include <string.h>
+
+
+#define SERIAL_FRAME_FLAG_TX      0x80  /* Bit 7 flags: 1 = Tx (PC/BMS → CAN), 0 = Rx */
+#define SERIAL_FRAME_MAX_DLC      8
+#define SERIAL_FRAME_HEADER_LEN   7     /* Flags + ID (2) + Timestamp (4) */
+#define SERIAL_FRAME_RAW_MAX      (SERIAL_FRAME_HEADER_LEN + SERIAL_FRAME_MAX_DLC + 2)
+#define SERIAL_FRAME_ENCODED_MAX  (SERIAL_FRAME_RAW_MAX + 2)   /* + COBS overhead + delimiter */
+
+
+/**
+ * @brief Calcola CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF, no reflection)
+ *
+ * Stesso algoritmo di binascii.crc_hqx(data, 0xFFFF) lato Python.
+ *
+ * @param data Buffer di ingresso
+ * @param len Numero di byte
+ * @return CRC a 16 bit
+ */
+uint16_t SerialFrame_Crc16(const uint8_t *data, size_t len) {
+    uint16_t crc = 0xFFFF;
+    for (size_t i = 0; i < len; i++) {
+        crc ^= (uint16_t)data[i] << 8;
+        for (int bit = 0; bit < 8; bit++) {
+            if (crc & 0x8000) {
+                crc = (uint16_t)((crc << 1) ^ 0x1021);
+            } else {
+                crc = (uint16_t)(crc << 1);
+            }
+        }
+    }
+    return crc;
+}
+
+/**
+ * @brief Codifica COBS (Consistent Overhead Byte Stuffing)
+ *
+ * Elimina tutti i byte 0x00 dal buffer, così 0x00 può essere usato come
+ * delimitatore di frame. Overhead: 1 byte ogni 254 byte.
+ *
+ * @param in Buffer da codificare
+ * @param len Lunghezza del buffer
+ * @param out Buffer di uscita (almeno len + len/254 + 1 byte)
+ * @return Numero di byte scritti in out (senza delimitatore)
+ */
+size_t SerialFrame_CobsEncode(const uint8_t *in, size_t len, uint8_t *out) {
+    size_t read_index = 0;
+    size_t write_index = 1;
+    size_t code_index = 0;
+    uint8_t code = 1;
+
+    while (read_index < len) {
+        if (in[read_index] == 0) {
+            out[code_index] = code;
+            code = 1;
+            code_index = write_index++;
+            read_index++;
+        } else {
+            out[write_index++] = in[read_index++];
+            code++;
+            if (code == 0xFF) {
+                out[code_index] = code;
+                code = 1;
+                code_index = write_index++;
+            }
+        }
+    }
+    out[code_index] = code;
+    return write_index;
+}
+
+/**
+ * @brief Crea un frame seriale binario da un frame CAN
+ *
+ * Formato frame prima della codifica COBS (Big Endian):
+ * ┌───────┬────────┬────────┬───────────────┬─────────────┬─────────┬─────────┐
+ * │ Flags │ ID MSB │ ID LSB │ Timestamp (4) │ Dati (DLC)  │ CRC MSB │ CRC LSB │
+ * └───────┴────────┴────────┴───────────────┴─────────────┴─────────┴─────────┘
+ *
+ * Flags: Bit 7 = direzione (1 = Tx, 0 = Rx), Bit 3-0 = DLC (0-8)
+ * Timestamp: tempo del gateway in ms (uint32, es. HAL_GetTick())
+ * CRC: CRC-16/CCITT-FALSE calcolato da Flags a fine Dati
+ *
+ * Il frame viene codificato COBS e terminato con 0x00.
+ * Un frame CAN da 8 byte occupa 19 byte (contro ~40 del formato ASCII).
+ *
+ * @param can_id ID CAN (11 bit)
+ * @param is_tx true se il frame è trasmesso dal BMS, false se ricevuto
+ * @param data Dati CAN
+ * @param dlc Numero di byte (0-8)
+ * @param timestamp_ms Tempo del gateway in ms
+ * @param out Buffer di uscita (almeno SERIAL_FRAME_ENCODED_MAX byte)
+ * @return Numero di byte da inviare sulla seriale, 0 se errore
+ */
+size_t SerialFrame_Encode(uint16_t can_id, bool is_tx, const uint8_t *data, uint8_t dlc,
+                          uint32_t timestamp_ms, uint8_t out[SERIAL_FRAME_ENCODED_MAX]) {
+    uint8_t raw[SERIAL_FRAME_RAW_MAX];
+
+    if (out == NULL || dlc > SERIAL_FRAME_MAX_DLC || (dlc > 0 && data == NULL)) {
+        return 0;
+    }
+
+    /* Flags */
+    raw[0] = dlc & 0x0F;
+    if (is_tx) {
+        raw[0] |= SERIAL_FRAME_FLAG_TX;
+    }
+
+    /* ID (MSB first) */
+    raw[1] = (uint8_t)((can_id >> 8) & 0xFF);
+    raw[2] = (uint8_t)(can_id & 0xFF);
+
+    /* Timestamp (MSB first) */
+    raw[3] = (uint8_t)((timestamp_ms >> 24) & 0xFF);
+    raw[4] = (uint8_t)((timestamp_ms >> 16) & 0xFF);
+    raw[5] = (uint8_t)((timestamp_ms >> 8) & 0xFF);
+    raw[6] = (uint8_t)(timestamp_ms & 0xFF);
+
+    /* Dati */
+    if (dlc > 0) {
+        memcpy(&raw[SERIAL_FRAME_HEADER_LEN], data, dlc);
+    }
+
+    /* CRC (MSB first) */
+    size_t raw_len = SERIAL_FRAME_HEADER_LEN + dlc;
+    uint16_t crc = SerialFrame_Crc16(raw, raw_len);
+    raw[raw_len++] = (uint8_t)((crc >> 8) & 0xFF);
+    raw[raw_len++] = (uint8_t)(crc & 0xFF);
+
+    /* COBS + delimitatore */
+    size_t out_len = SerialFrame_CobsEncode(raw, raw_len, out);
+    out[out_len++] = 0x00;
+
+    return out_len;
+}
+
+
+/* ============================================================================
+ * DEBUG FUNCTIONS
+ * ============================================================================ */
+
+/**
+ * @brief Stampa un frame seriale codificato
+ */
+void SerialFrame_Debug_Print(const uint8_t *frame, size_t len) {
+    printf("  Serial frame (%u bytes): [", (unsigned)len);
+    for (size_t i = 0; i < len; i++) {
+        printf("%02X", frame[i]);
+        if (i < len - 1) printf(" ");
+    }
+    printf("]\n");
+}
+
+
+/* ============================================================================
+ * EXAMPLES
+ * ============================================================================ */
+
+/**
+ * ESEMPIO 1: Inoltro di un frame ACT1 ricevuto dal charger
+ */
+void Example_EncodeAct1(void) {
+    /* ACT1: Iac 16A, Temp 25°C, Vout 360V, Iout 17A */
+    uint8_t act1_data[8] = {0x00, 0xA0, 0x30, 0xF7, 0x0E, 0x10, 0x00, 0xAA};
+    uint8_t frame[SERIAL_FRAME_ENCODED_MAX];
+
+    size_t len = SerialFrame_Encode(0x611, false, act1_data, 8, 123456, frame);
+
+    printf("\n\r=== ENCODE ACT1 (Rx) ===\n");
+    SerialFrame_Debug_Print(frame, len);
+    /* Risultato atteso:
+     * [04 08 06 11 04 01 E2 40 06 A0 30 F7 0E 10 04 AA 80 97 00] */
+
+    /* Invio su seriale */
+    // HAL_UART_Transmit(&huart2, frame, len, 10);
+}
+
+/**
+ * ESEMPIO 2: Eco di un frame CTL trasmesso dal BMS
+ */
+void Example_EncodeCtlEcho(void) {
+    uint8_t ctl_data[8] = {0x80, 0x00, 0xA0, 0x0E, 0x10, 0x00, 0xAA, 0x00};
+    uint8_t frame[SERIAL_FRAME_ENCODED_MAX];
+
+    size_t len = SerialFrame_Encode(0x618, true, ctl_data, 8, 123500, frame);
+
+    printf("\n\r=== ENCODE CTL (Tx) ===\n");
+    SerialFrame_Debug_Print(frame, len);
+}
+
+
+int main(void) {
+    printf("\n\r========================================\n");
+    printf("  Gateway - Serial Binary Frame Test\n");
+    printf("========================================\n");
+
+    Example_EncodeAct1();
+    printf("\n\r###########################\n");
+
+    Example_EncodeCtlEcho();
+
+    return 0;
+}